@@ -0,0 +1,237 @@
+"""
+ベンチマーク用の Azure OpenAI / Blob Storage スタブサーバー
+
+Azure OpenAI Realtime のセッション作成と、音声アップロードで使う Blob Storage API
+（Azurite と同じパス形式: /{account}/{container}/{blob}）の最小限の実装です。
+応答の遅延やエラー率を指定して、上流の状態に対するプロキシの挙動を計測できます。
+
+単体で起動する場合:
+    python benchmarks/fake_azure.py --port 10000 --latency-ms 50
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from email.utils import formatdate
+from typing import Dict, Optional
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+# Azurite の既定アカウント（公開されている開発用キー）
+ACCOUNT_NAME = "devstoreaccount1"
+ACCOUNT_KEY = "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw=="
+
+
+class FakeAzureState:
+    """スタブサーバーの設定と保存内容"""
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, blob_latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.blob_latency_ms = blob_latency_ms
+        self.containers = set()
+        # blob名 -> サイズ、未コミットのブロック: blob名 -> {block_id: サイズ}
+        self.blobs: Dict[str, int] = {}
+        self.blocks: Dict[str, Dict[str, int]] = {}
+        self.session_requests = 0
+
+
+STATE_KEY = web.AppKey("state", FakeAzureState)
+
+
+def _blob_headers(status_extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    headers = {
+        "ETag": f'"0x{uuid.uuid4().hex[:16].upper()}"',
+        "Last-Modified": formatdate(usegmt=True),
+        "Date": formatdate(usegmt=True),
+        "x-ms-request-id": str(uuid.uuid4()),
+        "x-ms-version": "2025-01-05"
+    }
+    if status_extra:
+        headers.update(status_extra)
+    return headers
+
+
+async def create_session(request: web.Request) -> web.Response:
+    """POST /openai/realtimeapi/sessions"""
+    state = request.app[STATE_KEY]
+    state.session_requests += 1
+    body = await request.json()
+    if state.latency_ms:
+        await asyncio.sleep(state.latency_ms / 1000)
+    if state.error_rate and random.random() < state.error_rate:
+        return web.json_response(
+            {"error": {"message": "Service unavailable", "code": "server_error"}},
+            status=503
+        )
+    expires_at = int(time.time()) + 60
+    return web.json_response({
+        "id": f"sess_{uuid.uuid4().hex[:20]}",
+        "object": "realtime.session",
+        "model": body.get("model", "gpt-4o-realtime-preview"),
+        "expires_at": expires_at,
+        "client_secret": {"value": f"ek_{uuid.uuid4().hex}", "expires_at": expires_at}
+    })
+
+
+async def list_models(request: web.Request) -> web.Response:
+    """GET /openai/models（ヘルスチェック用）"""
+    return web.json_response({"data": [{"id": "gpt-4o-realtime-preview"}]})
+
+
+async def realtime_sdp(request: web.Request) -> web.Response:
+    """POST /openai/realtime（WebRTC SDP 交換）"""
+    offer = await request.text()
+    state = request.app[STATE_KEY]
+    if state.latency_ms:
+        await asyncio.sleep(state.latency_ms / 1000)
+    answer = offer.replace("a=setup:actpass", "a=setup:active") or "v=0\r\n"
+    return web.Response(text=answer, content_type="application/sdp", status=201)
+
+
+def _block_list_xml(blocks: Dict[str, int], committed: Dict[str, int]) -> str:
+    def entries(items: Dict[str, int]) -> str:
+        return "".join(
+            f"<Block><Name>{escape(name)}</Name><Size>{size}</Size></Block>" for name, size in items.items()
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><BlockList>'
+        f"<CommittedBlocks>{entries(committed)}</CommittedBlocks>"
+        f"<UncommittedBlocks>{entries(blocks)}</UncommittedBlocks></BlockList>"
+    )
+
+
+async def blob_storage(request: web.Request) -> web.StreamResponse:
+    """/{account}/{container}[/{blob}] の Blob Storage API"""
+    state = request.app[STATE_KEY]
+    container = request.match_info["container"]
+    blob = request.match_info.get("blob")
+    query = request.query
+    if state.blob_latency_ms:
+        await asyncio.sleep(state.blob_latency_ms / 1000)
+
+    if not blob:
+        if query.get("restype") == "container":
+            if request.method == "PUT":
+                if container in state.containers:
+                    return web.Response(status=409, headers={"x-ms-error-code": "ContainerAlreadyExists"})
+                state.containers.add(container)
+                return web.Response(status=201, headers=_blob_headers())
+            if request.method in ("GET", "HEAD"):
+                if query.get("comp") == "list":
+                    return _list_blobs(state, container, query.get("prefix", ""))
+                if container not in state.containers:
+                    return web.Response(status=404, headers={"x-ms-error-code": "ContainerNotFound"})
+                return web.Response(status=200, headers=_blob_headers())
+        return web.Response(status=400)
+
+    key = f"{container}/{blob}"
+    comp = query.get("comp")
+    if request.method == "PUT" and comp == "block":
+        data = await request.read()
+        state.blocks.setdefault(key, {})[query["blockid"]] = len(data)
+        return web.Response(status=201, headers=_blob_headers())
+    if request.method == "PUT" and comp == "blocklist":
+        body = await request.text()
+        staged = state.blocks.pop(key, {})
+        size = sum(size for block_id, size in staged.items() if block_id in body)
+        state.blobs[key] = size
+        return web.Response(status=201, headers=_blob_headers())
+    if request.method == "GET" and comp == "blocklist":
+        xml = _block_list_xml(state.blocks.get(key, {}), {})
+        return web.Response(
+            text=xml,
+            content_type="application/xml",
+            headers=_blob_headers({"x-ms-blob-content-length": str(state.blobs.get(key, 0))})
+        )
+    if request.method == "PUT":
+        size = 0
+        async for chunk in request.content.iter_chunked(1024 * 1024):
+            size += len(chunk)
+        state.blobs[key] = size
+        return web.Response(
+            status=201,
+            headers=_blob_headers({"x-ms-request-server-encrypted": "true"})
+        )
+    if request.method == "DELETE":
+        if state.blobs.pop(key, None) is None and state.blocks.pop(key, None) is None:
+            return web.Response(status=404, headers={"x-ms-error-code": "BlobNotFound"})
+        return web.Response(status=202, headers=_blob_headers())
+    if request.method in ("GET", "HEAD"):
+        if key not in state.blobs:
+            return web.Response(status=404, headers={"x-ms-error-code": "BlobNotFound"})
+        size = state.blobs[key]
+        headers = _blob_headers({"x-ms-blob-type": "BlockBlob", "Content-Length": str(size)})
+        if request.method == "HEAD":
+            return web.Response(status=200, headers=headers)
+        return web.Response(body=b"\0" * size, status=200, headers=headers)
+    return web.Response(status=400)
+
+
+def _list_blobs(state: FakeAzureState, container: str, prefix: str) -> web.Response:
+    names = sorted(
+        key.split("/", 1)[1] for key in state.blobs
+        if key.startswith(f"{container}/{prefix}")
+    )
+    blobs = "".join(
+        f"<Blob><Name>{escape(name)}</Name><Properties>"
+        f"<Content-Length>{state.blobs[f'{container}/{name}']}</Content-Length>"
+        f"<BlobType>BlockBlob</BlobType></Properties></Blob>"
+        for name in names
+    )
+    xml = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        f'<EnumerationResults ContainerName="{escape(container)}"><Prefix>{escape(prefix)}</Prefix>'
+        f"<Blobs>{blobs}</Blobs><NextMarker /></EnumerationResults>"
+    )
+    return web.Response(text=xml, content_type="application/xml", headers=_blob_headers())
+
+
+def create_fake_azure_app(state: FakeAzureState) -> web.Application:
+    """スタブサーバーのアプリケーションを作成"""
+    app = web.Application(client_max_size=1024 ** 3)
+    app[STATE_KEY] = state
+    app.router.add_post("/openai/realtimeapi/sessions", create_session)
+    app.router.add_get("/openai/models", list_models)
+    app.router.add_post("/openai/realtime", realtime_sdp)
+    app.router.add_route("*", f"/{ACCOUNT_NAME}/{{container}}", blob_storage)
+    app.router.add_route("*", f"/{ACCOUNT_NAME}/{{container}}/{{blob:.+}}", blob_storage)
+    return app
+
+
+async def start_fake_azure(state: FakeAzureState, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, int]:
+    """スタブサーバーを起動し、(runner, ポート番号) を返す"""
+    runner = web.AppRunner(create_fake_azure_app(state), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, bound_port
+
+
+def blob_endpoint(port: int, host: str = "127.0.0.1") -> str:
+    """AZURE_STORAGE_BLOB_ENDPOINT に設定する URL"""
+    return f"http://{host}:{port}/{ACCOUNT_NAME}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Azure OpenAI / Blob Storage stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=10000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Azure OpenAI の応答遅延")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="セッション作成が 503 になる割合")
+    parser.add_argument("--blob-latency-ms", type=float, default=0.0, help="Blob Storage の応答遅延")
+    args = parser.parse_args()
+
+    state = FakeAzureState(args.latency_ms, args.error_rate, args.blob_latency_ms)
+    print(f"AZURE_OPENAI_ENDPOINT=http://{args.host}:{args.port}")
+    print(f"AZURE_STORAGE_ACCOUNT_NAME={ACCOUNT_NAME}")
+    print(f"AZURE_STORAGE_ACCOUNT_KEY={ACCOUNT_KEY}")
+    print(f"AZURE_STORAGE_BLOB_ENDPOINT={blob_endpoint(args.port, args.host)}")
+    web.run_app(create_fake_azure_app(state), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
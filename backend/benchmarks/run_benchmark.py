@@ -0,0 +1,396 @@
+"""
+プロキシサーバーの負荷試験
+
+Azure OpenAI / Blob Storage のスタブサーバー（fake_azure.py）を起動し、そこに接続する
+プロキシサーバーを別プロセスで起動して /sessions/・/webrtc/session・/audio/upload に
+並列でリクエストを送ります。スループット・レイテンシ（p50/p95/p99）・ステータス別の件数・ワーカーごとの
+最大RSSを出力し、保存済みのベースラインとの比較で性能の劣化を検出します。
+
+使い方（backend ディレクトリで実行）:
+    python benchmarks/run_benchmark.py --scenario sessions --concurrency 32 --requests 2000
+    python benchmarks/run_benchmark.py --output benchmarks/baselines/local.json
+    python benchmarks/run_benchmark.py --baseline benchmarks/baselines/local.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_azure import ACCOUNT_KEY, ACCOUNT_NAME, FakeAzureState, blob_endpoint, start_fake_azure  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("sessions", "webrtc", "upload")
+
+# webrtc シナリオで送る SDP Offer（スタブは内容を検証しない）
+SAMPLE_SDP_OFFER = "v=0\r\no=- 4611731400430051336 2 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\na=setup:actpass\r\n"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """最近順位法によるパーセンタイル"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _process_tree(pid: int) -> List[int]:
+    """プロセスとその子孫のPID（Linux の /proc を参照）"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm に空白が含まれ得るため、最後の ")" 以降を解析
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler:
+    """サーバープロセス（ワーカーを含む）の最大RSSを定期的に記録"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> None:
+        if not os.path.isdir("/proc"):
+            return
+        for pid in _process_tree(self.pid):
+            rss = _rss_mb(pid)
+            if rss is not None:
+                self.peak[pid] = max(self.peak.get(pid, 0.0), rss)
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.sample()
+        return {str(pid): round(rss, 1) for pid, rss in sorted(self.peak.items())}
+
+
+def start_proxy(port: int, fake_port: int, workers: int, data_dir: str, extra_env: Dict[str, str]) -> subprocess.Popen:
+    """スタブサーバーに接続するプロキシサーバーを起動"""
+    env = dict(os.environ)
+    env.update({
+        "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{fake_port}",
+        "AZURE_OPENAI_API_KEY": "benchmark-key",
+        "AZURE_STORAGE_ACCOUNT_NAME": ACCOUNT_NAME,
+        "AZURE_STORAGE_ACCOUNT_KEY": ACCOUNT_KEY,
+        "AZURE_STORAGE_BLOB_ENDPOINT": blob_endpoint(fake_port),
+        "AUDIO_INDEX_DB_PATH": os.path.join(data_dir, "audio_index.db"),
+        "RATE_LIMIT_DB_PATH": os.path.join(data_dir, "rate_limit.db"),
+        # 負荷試験ではクライアントが1つのため、クライアント単位の制限は無効にする
+        "RATE_LIMIT_CLIENT_PER_SECOND": "0",
+        "LOG_LEVEL": "WARNING",
+        "PYTHONPATH": os.path.join(BACKEND_DIR, "src")
+    })
+    env.update(extra_env)
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(workers),
+        "--no-access-log",
+        "--log-level", "warning"
+    ]
+    return subprocess.Popen(command, cwd=os.path.join(BACKEND_DIR, "src"), env=env)
+
+
+async def wait_until_ready(session: aiohttp.ClientSession, base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{base_url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Proxy did not become ready within {timeout}s")
+
+
+def _sample_audio(size_bytes: int, audio_format: str) -> bytes:
+    """アップロードする音声データ（mp4 以外は ffmpeg で生成）"""
+    if audio_format in ("mp4", "m4a"):
+        # ヘッダー判定を通る ftyp と、ファイル末尾までの mdat（中身はランダム）
+        header = struct.pack(">I4s4sI4s", 20, b"ftyp", b"isom", 0x200, b"isom") + struct.pack(">I4s", 0, b"mdat")
+        return header + random.randbytes(max(0, size_bytes - len(header)))
+    seconds = max(1, size_bytes // 16000)
+    result = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+            "-c:a", "libopus" if audio_format == "webm" else "pcm_s16le",
+            "-f", audio_format, "pipe:1"
+        ],
+        capture_output=True,
+        check=True
+    )
+    return result.stdout
+
+
+async def run_scenario(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    scenario: str,
+    concurrency: int,
+    total_requests: int,
+    upload_size: int,
+    upload_format: str
+) -> Dict:
+    """1つのシナリオを実行して集計"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    issued = 0
+    sample = _sample_audio(upload_size, upload_format) if scenario == "upload" else b""
+
+    async def one_request() -> int:
+        if scenario == "sessions":
+            async with session.post(
+                f"{base_url}/sessions/",
+                json={"model": "gpt-4o-realtime-preview", "voice": "alloy"}
+            ) as response:
+                await response.read()
+                return response.status
+
+        if scenario == "webrtc":
+            # セッション作成と SDP 交換を1回のリクエストで実行
+            async with session.post(
+                f"{base_url}/webrtc/session",
+                json={"model": "gpt-4o-realtime-preview", "voice": "alloy", "sdp": SAMPLE_SDP_OFFER}
+            ) as response:
+                await response.read()
+                return response.status
+
+        # 重複排除に当たらないよう、毎回異なる内容を送る
+        payload = sample + os.urandom(16)
+        form = aiohttp.FormData()
+        form.add_field("audio_file", payload, filename=f"bench.{upload_format}", content_type=f"audio/{upload_format}")
+        async with session.post(
+            f"{base_url}/audio/upload",
+            data=form,
+            headers={"session-id": "benchmark"}
+        ) as response:
+            await response.read()
+            return response.status
+
+    async def worker() -> None:
+        nonlocal issued
+        while issued < total_requests:
+            issued += 1
+            started = time.perf_counter()
+            try:
+                status = await one_request()
+                statuses[str(status)] += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                errors[type(e).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    to_ms = lambda seconds: round(seconds * 1000, 2)  # noqa: E731
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": to_ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+            "p50": to_ms(percentile(latencies, 0.50)),
+            "p95": to_ms(percentile(latencies, 0.95)),
+            "p99": to_ms(percentile(latencies, 0.99)),
+            "max": to_ms(latencies[-1]) if latencies else 0.0
+        },
+        "status_counts": dict(statuses),
+        "client_errors": dict(errors)
+    }
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """ベースラインとの比較（許容を超えて悪化した項目を返す）"""
+    regressions = []
+    for scenario, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None:
+            continue
+        checks = [
+            (f"{scenario} p95", current["latency_ms"]["p95"], previous["latency_ms"]["p95"], True),
+            (f"{scenario} p99", current["latency_ms"]["p99"], previous["latency_ms"]["p99"], True),
+            (f"{scenario} throughput", current["throughput_rps"], previous["throughput_rps"], False)
+        ]
+        for name, now, before, lower_is_better in checks:
+            if not before:
+                continue
+            change = (now - before) / before
+            print(f"  {name}: {before} -> {now} ({change:+.1%})")
+            worse = change > max_regression if lower_is_better else change < -max_regression
+            if worse:
+                regressions.append(f"{name} regressed {change:+.1%} (limit {max_regression:.0%})")
+    return regressions
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    state = FakeAzureState(args.azure_latency_ms, args.azure_error_rate, args.blob_latency_ms)
+    runner, fake_port = await start_fake_azure(state)
+    proxy_port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{proxy_port}"
+    extra_env = dict(item.split("=", 1) for item in args.env)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        proxy = start_proxy(proxy_port, fake_port, args.workers, data_dir, extra_env)
+        sampler = RssSampler(proxy.pid)
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=args.timeout)
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                await wait_until_ready(session, base_url)
+                sampler.start()
+                results = {
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "host": {
+                        "platform": platform.platform(),
+                        "python": platform.python_version(),
+                        "cpus": os.cpu_count()
+                    },
+                    "config": {
+                        "workers": args.workers,
+                        "concurrency": args.concurrency,
+                        "requests": args.requests,
+                        "azure_latency_ms": args.azure_latency_ms,
+                        "azure_error_rate": args.azure_error_rate,
+                        "blob_latency_ms": args.blob_latency_ms,
+                        "upload_size_bytes": args.upload_size_kb * 1024,
+                        "upload_format": args.upload_format,
+                        "env": extra_env
+                    },
+                    "scenarios": {}
+                }
+                scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+                for scenario in scenarios:
+                    # 接続確立・遅延初期化の影響を除くためのウォームアップ
+                    await run_scenario(
+                        session, base_url, scenario, args.concurrency, min(args.requests, args.concurrency * 2),
+                        args.upload_size_kb * 1024, args.upload_format
+                    )
+                    summary = await run_scenario(
+                        session, base_url, scenario, args.concurrency, args.requests,
+                        args.upload_size_kb * 1024, args.upload_format
+                    )
+                    results["scenarios"][scenario] = summary
+                    latency = summary["latency_ms"]
+                    print(
+                        f"{scenario}: {summary['throughput_rps']} req/s, "
+                        f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms, "
+                        f"status={summary['status_counts']} errors={summary['client_errors']}"
+                    )
+                results["rss_mb"] = await sampler.stop()
+                print(f"peak RSS (MB) per process: {results['rss_mb']}")
+        finally:
+            proxy.send_signal(signal.SIGTERM)
+            try:
+                proxy.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proxy.kill()
+            await runner.cleanup()
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"comparison with {args.baseline}:")
+        regressions = compare_with_baseline(results, baseline, args.max_regression)
+        if regressions:
+            for regression in regressions:
+                print(f"REGRESSION: {regression}")
+            return 1
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Proxy load test against a local Azure stand-in")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000, help="シナリオごとのリクエスト数")
+    parser.add_argument("--workers", type=int, default=1, help="プロキシのワーカープロセス数")
+    parser.add_argument("--port", type=int, default=0, help="プロキシのポート（0 は空きポート）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="1リクエストのタイムアウト秒数")
+    parser.add_argument("--azure-latency-ms", type=float, default=50.0, help="スタブの Azure OpenAI 応答遅延")
+    parser.add_argument("--azure-error-rate", type=float, default=0.0, help="スタブが 503 を返す割合")
+    parser.add_argument("--blob-latency-ms", type=float, default=5.0, help="スタブの Blob Storage 応答遅延")
+    parser.add_argument("--upload-size-kb", type=int, default=256)
+    parser.add_argument("--upload-format", default="mp4", help="mp4（変換なし）/ webm / wav（ffmpeg で変換）")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="プロキシに渡す環境変数")
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    parser.add_argument("--baseline", help="比較するベースラインのJSONファイル")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="許容する悪化の割合")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_async(parse_args())))
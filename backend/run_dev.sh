@@ -18,4 +18,4 @@ uv pip install -e ".[dev]"
 # アプリケーションの起動
 echo "Starting FastAPI application..."
 cd src
-python main.py
+APP_ENV=development python main.py
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -15,6 +15,16 @@ class AudioMetadata(BaseModel):
     language: str = "ja-JP"
 
 
+class AudioAnalysis(BaseModel):
+    """サーバー側で算出した音声の解析結果"""
+    duration: float = Field(..., description="保存した音声の長さ（秒）")
+    rms_dbfs: float = Field(..., description="平均音量（dBFS）")
+    peak_dbfs: float = Field(..., description="最大音量（dBFS）")
+    clipping_ratio: float = Field(..., description="クリッピングしたサンプルの割合")
+    peaks_per_second: float = Field(..., description="peaks の1秒あたりの区間数")
+    peaks: List[int] = Field(..., description="波形表示用の区間ごとの最小値・最大値（-127〜127、min/max交互）")
+
+
 class AudioUploadResponse(BaseModel):
     """音声アップロードレスポンスモデル"""
     audio_id: str
@@ -26,3 +36,63 @@ class AudioUploadResponse(BaseModel):
     size_bytes: int
     metadata: AudioMetadata
     uploaded_at: datetime
+    analysis: Optional[AudioAnalysis] = None
+
+
+class AudioStreamChunkResponse(BaseModel):
+    """分割アップロードのチャンク受信レスポンスモデル"""
+    session_id: str
+    sequence: int
+    size_bytes: int
+
+
+class AudioStreamCompleteRequest(BaseModel):
+    """分割アップロードの完了リクエストモデル"""
+    total_chunks: int = Field(..., ge=1, description="送信したチャンク数（sequence は 0 から total_chunks-1）")
+    format: str = Field("webm", description="録音形式の拡張子")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="音声メタデータ")
+
+
+class AudioSasResponse(BaseModel):
+    """音声ファイルのSAS URLレスポンスモデル"""
+    audio_id: str
+    blob_url: str
+    sas_url: str
+    sas_expires_at: datetime
+
+
+class AudioSasBatchItem(BaseModel):
+    """SAS URL一括発行の対象"""
+    audio_id: str
+    session_id: Optional[str] = Field(None, description="アップロード時のセッションID")
+
+
+class AudioSasBatchRequest(BaseModel):
+    """SAS URL一括発行リクエストモデル"""
+    items: List[AudioSasBatchItem] = Field(..., min_length=1, max_length=500)
+    expire_minutes: int = Field(60, ge=1, le=1440, description="SAS URLの有効期間（分）")
+
+
+class AudioSasBatchResponse(BaseModel):
+    """SAS URL一括発行レスポンスモデル"""
+    items: List[AudioSasResponse]
+    not_found: List[str]
+
+
+class AudioRecordingInfo(BaseModel):
+    """保存済み音声ファイルの情報"""
+    audio_id: str
+    session_id: Optional[str]
+    blob_url: str
+    size_bytes: int
+    duration: Optional[float]
+    format: str
+    original_format: Optional[str]
+    audio_type: Optional[str]
+    uploaded_at: datetime
+
+
+class AudioRecordingListResponse(BaseModel):
+    """保存済み音声ファイル一覧レスポンスモデル"""
+    items: List[AudioRecordingInfo]
+    next_cursor: Optional[str] = Field(None, description="次のページを取得するためのカーソル（最終ページではNone）")
@@ -2,7 +2,12 @@
 Azure プロキシサービスインターフェース
 """
 from abc import ABC, abstractmethod
-from presentation.dto.proxy_dto import SessionCreateRequest, SessionCreateResponse
+from presentation.dto.proxy_dto import (
+    SessionCreateRequest,
+    SessionCreateResponse,
+    WebRTCSessionCreateRequest,
+    WebRTCSessionCreateResponse
+)
 
 
 class IAzureProxyService(ABC):
@@ -22,3 +27,35 @@ class IAzureProxyService(ABC):
             HTTPException: プロキシ処理中のエラー
         """
         pass
+    
+    @abstractmethod
+    async def webrtc_sdp_proxy(self, model: str, ephemeral_key: str, sdp_offer: str) -> str:
+        """WebRTC の SDP Offer をAzure OpenAI APIにプロキシ
+        
+        Args:
+            model: デプロイメント名
+            ephemeral_key: セッション作成で発行されたエフェメラルキー
+            sdp_offer: クライアントの SDP Offer
+            
+        Returns:
+            Azure OpenAI APIからの SDP Answer
+            
+        Raises:
+            HTTPException: プロキシ処理中のエラー
+        """
+        pass
+    
+    @abstractmethod
+    async def create_session_with_sdp(self, request: WebRTCSessionCreateRequest) -> WebRTCSessionCreateResponse:
+        """セッション作成と SDP 交換をまとめて実行
+        
+        Args:
+            request: セッション作成の内容と SDP Offer
+            
+        Returns:
+            作成したセッションと SDP Answer
+            
+        Raises:
+            HTTPException: プロキシ処理中のエラー
+        """
+        pass
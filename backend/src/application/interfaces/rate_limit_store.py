@@ -0,0 +1,44 @@
+"""
+レート制限の状態ストアインターフェース
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class TokenBucketRule:
+    """トークンバケットの設定
+    
+    Attributes:
+        rate: 毎秒補充されるトークン数
+        burst: バケットの容量（連続して許可するリクエスト数）
+    """
+    rate: float
+    burst: float
+
+
+class IRateLimitStore(ABC):
+    """トークンバケットの状態を保持するストア
+    
+    プロセス内で完結する実装のほか、複数ワーカーで状態を共有する実装に差し替えられます。
+    """
+    
+    @abstractmethod
+    async def try_acquire(self, buckets: List[Tuple[str, TokenBucketRule]], tokens: float = 1.0) -> float:
+        """全てのバケットからトークンを取得する
+        
+        いずれかのバケットが不足する場合はどのバケットからも取得しません。
+        
+        Args:
+            buckets: バケットのキーと設定の一覧
+            tokens: 取得するトークン数
+        
+        Returns:
+            取得できた場合は 0.0、できない場合は全バケットにトークンが揃うまでの秒数
+        """
+        pass
+    
+    def close(self) -> None:
+        """ストアを閉じる"""
+        pass
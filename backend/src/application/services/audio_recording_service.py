@@ -0,0 +1,108 @@
+import asyncio
+import base64
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from application.dto.audio_dto import AudioRecordingInfo, AudioRecordingListResponse
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient
+from infrastructure.storage.audio_metadata_index import AudioMetadataIndex, AudioRecord
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 500
+
+
+class AudioRecordingService:
+    """保存済み音声ファイルの検索サービス（メタデータインデックスを使用）"""
+    
+    def __init__(self, blob_storage_client: AudioBlobStorageClient, metadata_index: AudioMetadataIndex):
+        self.blob_storage_client = blob_storage_client
+        self.metadata_index = metadata_index
+    
+    @staticmethod
+    def encode_cursor(record: AudioRecord) -> str:
+        """ページの最後のエントリからカーソルを生成"""
+        raw = f"{record.uploaded_at.isoformat(timespec='microseconds')}|{record.audio_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """カーソルを (uploaded_at, audio_id) に変換"""
+        try:
+            uploaded_at, audio_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+            return datetime.fromisoformat(uploaded_at), audio_id
+        except (ValueError, UnicodeError):
+            raise ValueError("Invalid cursor")
+    
+    @staticmethod
+    def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+        """インデックスはUTCのnaive datetimeで保存しているため揃える"""
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    def _to_info(self, record: AudioRecord) -> AudioRecordingInfo:
+        return AudioRecordingInfo(
+            audio_id=record.audio_id,
+            session_id=record.session_id,
+            blob_url=self.blob_storage_client.get_blob_url(record.blob_name),
+            size_bytes=record.size_bytes,
+            duration=record.duration,
+            format=record.format,
+            original_format=record.original_format,
+            audio_type=record.audio_type,
+            uploaded_at=record.uploaded_at
+        )
+    
+    async def get_recording(self, audio_id: str) -> Optional[AudioRecordingInfo]:
+        """
+        音声IDで音声ファイルの情報を取得します
+        
+        Args:
+            audio_id: 音声ID
+        
+        Returns:
+            音声ファイルの情報（見つからない場合はNone）
+        """
+        record = await asyncio.to_thread(self.metadata_index.get, audio_id)
+        return self._to_info(record) if record else None
+    
+    async def list_recordings(
+        self,
+        session_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> AudioRecordingListResponse:
+        """
+        音声ファイルをアップロード順に一覧します
+        
+        Args:
+            session_id: セッションIDで絞り込み
+            start: この時刻以降にアップロードされたもの
+            end: この時刻より前にアップロードされたもの
+            limit: 1ページの件数
+            cursor: 前のページの next_cursor
+        
+        Returns:
+            AudioRecordingListResponse: 音声ファイルの一覧と次ページのカーソル
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after = self.decode_cursor(cursor) if cursor else None
+        
+        # 1件多く取得して次ページの有無を判定
+        records = await asyncio.to_thread(
+            self.metadata_index.query,
+            session_id,
+            self._to_naive_utc(start),
+            self._to_naive_utc(end),
+            limit + 1,
+            after
+        )
+        next_cursor = self.encode_cursor(records[limit - 1]) if len(records) > limit else None
+        return AudioRecordingListResponse(
+            items=[self._to_info(record) for record in records[:limit]],
+            next_cursor=next_cursor
+        )
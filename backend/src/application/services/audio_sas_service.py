@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import uuid
+from functools import partial
+from typing import List, Optional
+from application.dto.audio_dto import AudioSasBatchItem, AudioSasBatchResponse, AudioSasResponse
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient, get_blocking_executor
+from infrastructure.storage.audio_metadata_index import AudioMetadataIndex
+
+logger = logging.getLogger(__name__)
+
+
+class AudioNotFoundError(Exception):
+    """指定された音声ファイルが見つからない場合のエラー"""
+    pass
+
+
+class AudioSasService:
+    """既存の音声ファイルにSAS URLを発行するサービス
+    
+    SAS トークンはアカウントキーでローカルに署名し、同じBlob・有効期間の
+    URLは有効期間の大半が残っている間は再利用します。
+    """
+    
+    def __init__(
+        self,
+        blob_storage_client: AudioBlobStorageClient,
+        metadata_index: Optional[AudioMetadataIndex] = None
+    ):
+        self.blob_storage_client = blob_storage_client
+        self.metadata_index = metadata_index
+    
+    @staticmethod
+    def _validate_audio_id(audio_id: str) -> None:
+        """audio_id を検証（Blob名の検索に使うため UUID のみ許可）"""
+        try:
+            uuid.UUID(audio_id)
+        except ValueError:
+            raise ValueError(f"Invalid audio_id: {audio_id}")
+    
+    async def _resolve(self, audio_id: str, session_id: Optional[str]) -> Optional[str]:
+        """audio_id からBlob名を解決（メモリ → メタデータインデックス → Blob一覧の順）"""
+        blob_name = self.blob_storage_client.get_cached_audio_blob(audio_id)
+        if blob_name is not None:
+            return blob_name
+        if self.metadata_index is not None:
+            record = await asyncio.to_thread(self.metadata_index.get, audio_id)
+            if record is not None:
+                self.blob_storage_client.remember_audio_blob(audio_id, record.blob_name)
+                return record.blob_name
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_blocking_executor(),
+            partial(self.blob_storage_client.find_audio_blob, audio_id, session_id)
+        )
+    
+    def _sign(self, audio_id: str, blob_name: str, expire_minutes: int) -> AudioSasResponse:
+        sas_url, expires_at = self.blob_storage_client.generate_blob_sas_url(
+            blob_name,
+            expire_seconds=expire_minutes * 60
+        )
+        return AudioSasResponse(
+            audio_id=audio_id,
+            blob_url=self.blob_storage_client.get_blob_url(blob_name),
+            sas_url=sas_url,
+            sas_expires_at=expires_at
+        )
+    
+    async def get_sas(
+        self,
+        audio_id: str,
+        session_id: Optional[str] = None,
+        expire_minutes: int = 60
+    ) -> AudioSasResponse:
+        """
+        音声ファイルのSAS URLを発行します
+        
+        Args:
+            audio_id: 音声ID
+            session_id: アップロード時のセッションID
+            expire_minutes: 有効期間（分）
+        
+        Returns:
+            AudioSasResponse: SAS URL
+        
+        Raises:
+            AudioNotFoundError: 音声ファイルが見つからない場合
+        """
+        self._validate_audio_id(audio_id)
+        blob_name = await self._resolve(audio_id, session_id)
+        if blob_name is None:
+            raise AudioNotFoundError(f"Audio not found: {audio_id}")
+        return self._sign(audio_id, blob_name, expire_minutes)
+    
+    async def get_sas_batch(
+        self,
+        items: List[AudioSasBatchItem],
+        expire_minutes: int = 60
+    ) -> AudioSasBatchResponse:
+        """
+        複数の音声ファイルのSAS URLを一括で発行します
+        
+        Args:
+            items: 対象の音声IDとセッションID
+            expire_minutes: 有効期間（分）
+        
+        Returns:
+            AudioSasBatchResponse: 発行したSAS URLと見つからなかった音声ID
+        """
+        for item in items:
+            self._validate_audio_id(item.audio_id)
+        
+        blob_names = await asyncio.gather(*[
+            self._resolve(item.audio_id, item.session_id) for item in items
+        ])
+        
+        results = []
+        not_found = []
+        for item, blob_name in zip(items, blob_names):
+            if blob_name is None:
+                not_found.append(item.audio_id)
+            else:
+                results.append(self._sign(item.audio_id, blob_name, expire_minutes))
+        
+        logger.info(f"Issued {len(results)} SAS URLs ({len(not_found)} not found)")
+        return AudioSasBatchResponse(items=results, not_found=not_found)
@@ -0,0 +1,148 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from application.dto.audio_dto import AudioStreamChunkResponse, AudioUploadResponse
+from application.services.audio_upload_service import AudioUploadService, MAX_AUDIO_FILE_SIZE_BYTES
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient, get_blocking_executor
+
+logger = logging.getLogger(__name__)
+
+# 1チャンクの最大サイズ（AUDIO_STREAM_MAX_CHUNK_MB で変更可能、既定16MB）
+MAX_STREAM_CHUNK_SIZE_BYTES = int(os.getenv("AUDIO_STREAM_MAX_CHUNK_MB", "16")) * 1024 * 1024
+
+# 1録音あたりのチャンク数の上限（Block Blob のブロック数上限）
+MAX_STREAM_CHUNKS = 50000
+
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class AudioStreamService:
+    """録音中の音声をチャンク単位で受け付ける分割アップロードサービス
+    
+    チャンクはセッションごとのステージングBlobに未コミットのブロックとして保存し、
+    完了時に sequence 順にコミットしてから通常のアップロードと同じ変換・保存処理を
+    行います。同じ sequence の再送は上書きとなるため、クライアントは安全に再試行できます。
+    """
+    
+    def __init__(self, blob_storage_client: AudioBlobStorageClient, audio_upload_service: AudioUploadService):
+        self.blob_storage_client = blob_storage_client
+        self.audio_upload_service = audio_upload_service
+    
+    async def _run_blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Blob SDK の同期処理を共有ワーカーで実行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_blocking_executor(), partial(contextvars.copy_context().run, fn, *args))
+    
+    def _validate_session_id(self, session_id: str) -> None:
+        """セッションIDを検証（Blob名の一部になるため使用可能文字を制限）"""
+        if not _SESSION_ID_RE.match(session_id):
+            raise ValueError("session_id must be 1-128 characters of letters, digits, '-' or '_'")
+    
+    async def append_chunk(self, session_id: str, sequence: int, data: bytes) -> AudioStreamChunkResponse:
+        """
+        録音チャンクを受け付けます
+        
+        Args:
+            session_id: セッションID
+            sequence: チャンクの連番（0始まり）
+            data: チャンクのバイト列
+        
+        Returns:
+            AudioStreamChunkResponse: 受信結果
+        """
+        self._validate_session_id(session_id)
+        if not 0 <= sequence < MAX_STREAM_CHUNKS:
+            raise ValueError(f"sequence must be between 0 and {MAX_STREAM_CHUNKS - 1}")
+        if not data:
+            raise ValueError("Chunk is empty")
+        if len(data) > MAX_STREAM_CHUNK_SIZE_BYTES:
+            raise ValueError(f"Chunk size ({len(data)} bytes) exceeds maximum limit ({MAX_STREAM_CHUNK_SIZE_BYTES} bytes)")
+        
+        await self._run_blocking(self.blob_storage_client.stage_stream_chunk, session_id, sequence, data)
+        logger.debug(f"Staged chunk {sequence} for stream {session_id} ({len(data)} bytes)")
+        
+        return AudioStreamChunkResponse(session_id=session_id, sequence=sequence, size_bytes=len(data))
+    
+    async def complete(
+        self,
+        session_id: str,
+        total_chunks: int,
+        audio_format: str = "webm",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AudioUploadResponse:
+        """
+        受信済みチャンクを結合し、変換・保存します
+        
+        変換やアップロードに失敗した場合もチャンクは残るため、完了リクエストを
+        再送できます（コミット済みの場合は再コミットしません）。
+        
+        Args:
+            session_id: セッションID
+            total_chunks: 送信したチャンク数
+            audio_format: 録音形式の拡張子
+            metadata: 音声メタデータ
+        
+        Returns:
+            AudioUploadResponse: アップロード結果
+        """
+        self._validate_session_id(session_id)
+        if not 1 <= total_chunks <= MAX_STREAM_CHUNKS:
+            raise ValueError(f"total_chunks must be between 1 and {MAX_STREAM_CHUNKS}")
+        
+        sequences = list(range(total_chunks))
+        committed, uncommitted = await self._run_blocking(self.blob_storage_client.get_stream_chunks, session_id)
+        
+        if sorted(committed) == sequences and not uncommitted:
+            # 前回の完了リクエストでコミット済み
+            chunks = committed
+        else:
+            # 未コミットのチャンクにコミット済みの内容も含めて結合する
+            chunks = {**committed, **uncommitted}
+            missing = [sequence for sequence in sequences if sequence not in chunks]
+            if missing:
+                raise ValueError(f"Missing chunks: {missing[:20]}{'...' if len(missing) > 20 else ''}")
+            unexpected = sorted(set(chunks) - set(sequences))
+            if unexpected:
+                raise ValueError(f"Received chunks beyond total_chunks: {unexpected[:20]}")
+        
+        size_bytes = sum(chunks[sequence] for sequence in sequences)
+        if size_bytes > MAX_AUDIO_FILE_SIZE_BYTES:
+            raise ValueError(f"File size ({size_bytes} bytes) exceeds maximum limit ({MAX_AUDIO_FILE_SIZE_BYTES} bytes)")
+        
+        if chunks is not committed:
+            await self._run_blocking(self.blob_storage_client.commit_stream, session_id, sequences)
+        
+        audio_file = await self._run_blocking(self.blob_storage_client.download_stream, session_id)
+        try:
+            result = await self.audio_upload_service.upload_audio(
+                audio_file=audio_file,
+                filename=f"recording.{audio_format}",
+                metadata_json=json.dumps(metadata) if metadata else None,
+                session_id=session_id,
+                size_bytes=size_bytes
+            )
+        finally:
+            audio_file.close()
+        
+        try:
+            await self.abort(session_id)
+        except Exception as e:
+            # 保存は完了しているため失敗扱いにしない（未使用のブロックは Azure 側で期限切れになる）
+            logger.warning(f"Failed to delete staging blob for stream {session_id}: {e}")
+        logger.info(f"Completed stream {session_id}: {total_chunks} chunks, {size_bytes} bytes")
+        return result
+    
+    async def abort(self, session_id: str) -> None:
+        """
+        受信済みチャンクを破棄します
+        
+        Args:
+            session_id: セッションID
+        """
+        self._validate_session_id(session_id)
+        await self._run_blocking(self.blob_storage_client.delete_stream, session_id)
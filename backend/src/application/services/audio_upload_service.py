@@ -1,52 +1,129 @@
+import asyncio
 import json
 import logging
-from typing import Optional
+import os
+from typing import BinaryIO, Optional
 from datetime import datetime
 from application.dto.audio_dto import AudioMetadata, AudioUploadResponse
 from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient
+from infrastructure.audio.transcoding_pool import TranscodingQueueFullError, TranscodingTimeoutError
+from application.services.upload_deduplicator import UploadDeduplicator, hash_audio_stream
+from infrastructure.storage.audio_metadata_index import AudioMetadataIndex, AudioRecord
+from shared.monitoring.metrics import DEFAULT_SIZE_BUCKETS, metrics
+from shared.utils.logging import set_log_context
 
 logger = logging.getLogger(__name__)
 
+# 音声ファイルの最大サイズ（MAX_AUDIO_FILE_SIZE_MB で変更可能、既定100MB）
+MAX_AUDIO_FILE_SIZE_BYTES = int(os.getenv("MAX_AUDIO_FILE_SIZE_MB", "100")) * 1024 * 1024
+
+UPLOAD_SIZE_BYTES = metrics.histogram(
+    "audio_upload_size_bytes",
+    "Size of uploaded audio files before transcoding",
+    buckets=DEFAULT_SIZE_BUCKETS
+)
+
 
 class AudioUploadService:
     """音声アップロードサービス"""
     
-    def __init__(self, blob_storage_client: AudioBlobStorageClient):
+    def __init__(
+        self,
+        blob_storage_client: AudioBlobStorageClient,
+        deduplicator: Optional[UploadDeduplicator] = None,
+        metadata_index: Optional[AudioMetadataIndex] = None
+    ):
         self.blob_storage_client = blob_storage_client
+        self.deduplicator = deduplicator
+        self.metadata_index = metadata_index
     
     async def upload_audio(
         self,
-        audio_data: bytes,
+        audio_file: BinaryIO,
         filename: str,
         metadata_json: Optional[str] = None,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+        idempotency_key: Optional[str] = None
     ) -> AudioUploadResponse:
         """
         音声ファイルをアップロードします
         
+        重複排除が有効な場合、同じ内容（または同じ Idempotency-Key）の再送には
+        変換・アップロードを行わず既存の結果を返します。
+        
         Args:
-            audio_data: 音声ファイルのバイナリデータ
+            audio_file: 音声ファイルのストリーム（シーク可能なファイルオブジェクト）
             filename: ファイル名
             metadata_json: メタデータのJSON文字列
             session_id: セッションID
-            
+            size_bytes: ファイルサイズ（省略時はストリームから算出）
+            idempotency_key: クライアントが指定した冪等キー
+        
         Returns:
             AudioUploadResponse: アップロード結果
+        
+        Raises:
+            IdempotencyKeyConflictError: Idempotency-Key が異なる内容で再利用された場合
         """
+        if session_id:
+            set_log_context(session_id=session_id)
+        
+        def upload():
+            return self._upload_audio(audio_file, filename, metadata_json, session_id, size_bytes)
+        
+        if self.deduplicator is None:
+            return await upload()
+        
+        content_hash = await asyncio.to_thread(hash_audio_stream, audio_file)
+        key = self.deduplicator.make_key(
+            content_hash,
+            session_id,
+            self._extract_format(filename),
+            idempotency_key
+        )
+        response, deduplicated = await self.deduplicator.run(key, content_hash, upload)
+        if not deduplicated:
+            return response
+        
+        # 既存の結果のSAS URLは期限切れの可能性があるため再発行
+        sas_url, sas_expires_at = self.blob_storage_client.generate_sas_url(
+            blob_url=response.blob_url,
+            expire_hours=1
+        )
+        return response.model_copy(update={"sas_url": sas_url, "sas_expires_at": sas_expires_at})
+    
+    async def _upload_audio(
+        self,
+        audio_file: BinaryIO,
+        filename: str,
+        metadata_json: Optional[str],
+        session_id: Optional[str],
+        size_bytes: Optional[int]
+    ) -> AudioUploadResponse:
+        """変換・アップロード・SAS URL発行を実行"""
         try:
+            if size_bytes is None:
+                size_bytes = audio_file.seek(0, os.SEEK_END)
+                audio_file.seek(0)
+            
             # ファイル形式を抽出
             audio_format = self._extract_format(filename)
+            UPLOAD_SIZE_BYTES.observe(size_bytes)
             
             # メタデータを解析
             metadata = self._parse_metadata(metadata_json)
             
             # Blob Storageにアップロード
             try:
-                audio_id, blob_url = self.blob_storage_client.upload_audio_file(
-                    audio_data=audio_data,
+                audio_id, blob_url, analysis = await self.blob_storage_client.upload_audio_file_async(
+                    audio_file=audio_file,
                     session_id=session_id,
                     audio_format=audio_format
                 )
+            except (TranscodingQueueFullError, TranscodingTimeoutError):
+                # Backpressure / ffmpeg timeout: let the caller answer 503 / 504
+                raise
             except ValueError as ve:
                 # Audio file validation or conversion failed
                 logger.error(f"Audio file processing failed: {ve}")
@@ -56,6 +133,10 @@ class AudioUploadService:
                 logger.error(f"Audio upload failed: {e}")
                 raise RuntimeError(f"Failed to upload audio file: {e}")
             
+            # サーバー側で測定した長さがあればクライアントの申告値より優先
+            if analysis is not None:
+                metadata.duration = analysis.duration
+            
             # SAS URLを生成
             sas_url, sas_expires_at = self.blob_storage_client.generate_sas_url(
                 blob_url=blob_url,
@@ -70,21 +151,44 @@ class AudioUploadService:
                 blob_url=blob_url,
                 sas_url=sas_url,
                 sas_expires_at=sas_expires_at,
-                size_bytes=len(audio_data),
+                size_bytes=size_bytes,
                 metadata=metadata,
-                uploaded_at=datetime.utcnow()
+                uploaded_at=datetime.utcnow(),
+                analysis=analysis
             )
             
+            if self.metadata_index is not None:
+                await self._index_recording(response, audio_format)
+            
             logger.info(f"Successfully uploaded audio: {audio_id}")
             return response
-            
-        except (ValueError, RuntimeError):
+        
+        except (ValueError, RuntimeError, TranscodingQueueFullError, TranscodingTimeoutError):
             # Re-raise specific errors
             raise
         except Exception as e:
             logger.error(f"Unexpected error uploading audio: {e}")
             raise RuntimeError(f"Audio upload service error: {e}")
     
+    async def _index_recording(self, response: AudioUploadResponse, original_format: str) -> None:
+        """アップロード結果をメタデータインデックスに登録（失敗してもアップロードは成功扱い）"""
+        blob_name = self.blob_storage_client.blob_name_from_url(response.blob_url)
+        record = AudioRecord(
+            audio_id=response.audio_id,
+            session_id=response.session_id,
+            blob_name=blob_name,
+            size_bytes=response.size_bytes,
+            duration=response.metadata.duration,
+            format=self._extract_format(blob_name),  # 保存ポリシーにより mp4 または ogg
+            original_format=original_format,
+            audio_type=response.audio_type,
+            uploaded_at=response.uploaded_at
+        )
+        try:
+            await asyncio.to_thread(self.metadata_index.add, record)
+        except Exception as e:
+            logger.warning(f"Failed to index audio {response.audio_id}: {e}")
+    
     def _extract_format(self, filename: str) -> str:
         """ファイル名から形式を抽出"""
         if '.' in filename:
@@ -126,8 +230,8 @@ class AudioUploadService:
     
     def validate_audio_file(self, content_type: str, file_size: int) -> None:
         """音声ファイルを検証"""
-        # ファイルサイズチェック (100MB制限)
-        max_size = 100 * 1024 * 1024  # 100MB
+        # ファイルサイズチェック (既定100MB制限)
+        max_size = MAX_AUDIO_FILE_SIZE_BYTES
         if file_size > max_size:
             raise ValueError(f"File size ({file_size} bytes) exceeds maximum limit ({max_size} bytes)")
         
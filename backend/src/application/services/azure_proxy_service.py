@@ -1,12 +1,49 @@
 """
 Azure プロキシサービス実装
 """
+import math
+import time
+from typing import Optional
 from fastapi import HTTPException
 from application.interfaces.azure_proxy_service import IAzureProxyService
-from infrastructure.azure.azure_openai_client import IAzureOpenAIClient, AzureOpenAIException
-from presentation.dto.proxy_dto import SessionCreateRequest, SessionCreateResponse
+from infrastructure.azure.azure_openai_client import (
+    CIRCUIT_OPEN_ERROR_CODE,
+    IAzureOpenAIClient,
+    AzureOpenAIException
+)
+from presentation.dto.proxy_dto import (
+    SessionCreateRequest,
+    SessionCreateResponse,
+    WebRTCSessionCreateRequest,
+    WebRTCSessionCreateResponse
+)
 from application.dto.azure_dto import AzureSessionRequest
-from shared.utils.logging import get_logger
+from application.services.session_warm_pool import SessionWarmPool
+from shared.monitoring.metrics import metrics
+from shared.utils.logging import get_logger, set_log_context
+
+SESSION_UPSTREAM_SECONDS = metrics.histogram(
+    "session_proxy_upstream_seconds",
+    "Time spent waiting for Azure OpenAI session creation (including retries)"
+)
+SESSION_OVERHEAD_SECONDS = metrics.histogram(
+    "session_proxy_overhead_seconds",
+    "Local processing time of session creation excluding the Azure OpenAI call"
+)
+SESSION_RESPONSES = metrics.counter(
+    "session_proxy_responses_total",
+    "Session creation results by HTTP status returned to the client",
+    ["status"]
+)
+SDP_UPSTREAM_SECONDS = metrics.histogram(
+    "sdp_proxy_upstream_seconds",
+    "Time spent waiting for the Azure OpenAI WebRTC SDP answer"
+)
+SDP_RESPONSES = metrics.counter(
+    "sdp_proxy_responses_total",
+    "WebRTC SDP exchange results by HTTP status returned to the client",
+    ["status"]
+)
 
 
 class AzureProxyService(IAzureProxyService):
@@ -16,19 +53,27 @@ class AzureProxyService(IAzureProxyService):
     エラーハンドリング、レスポンス変換、ログ記録を含みます。
     """
     
-    def __init__(self, azure_client: IAzureOpenAIClient):
+    def __init__(
+        self,
+        azure_client: IAzureOpenAIClient,
+        session_pool: Optional[SessionWarmPool] = None
+    ):
         """初期化
         
         Args:
             azure_client: Azure OpenAI クライアント
+            session_pool: セッション事前作成プール（省略時は毎回Azureに問い合わせ）
         """
         self.azure_client = azure_client
+        self.session_pool = session_pool
         self.logger = get_logger("azure_proxy_service")
     
     async def create_session_proxy(self, request: SessionCreateRequest) -> SessionCreateResponse:
         """セッション作成リクエストをAzure OpenAI APIにプロキシ"""
+        started_at = time.perf_counter()
+        upstream_seconds = 0.0
         try:
-            self.logger.info(f"Proxying session creation for model: {request.model}")
+            self.logger.info("Proxying session creation for model: %s", request.model)
             
             # フロントエンドのリクエストをAzure API形式に変換
             azure_request = AzureSessionRequest(
@@ -39,8 +84,19 @@ class AzureProxyService(IAzureProxyService):
                 tools=request.tools
             )
             
-            # Azure OpenAI APIを呼び出し
-            azure_response = await self.azure_client.create_session(azure_request)
+            # 事前作成済みのセッションがあれば即座に払い出し
+            azure_response = None
+            if self.session_pool is not None:
+                azure_response = self.session_pool.acquire(azure_request)
+            
+            # プールが空の場合はAzure OpenAI APIを呼び出し
+            if azure_response is None:
+                upstream_started_at = time.perf_counter()
+                try:
+                    azure_response = await self.azure_client.create_session(azure_request)
+                finally:
+                    upstream_seconds = time.perf_counter() - upstream_started_at
+                    SESSION_UPSTREAM_SECONDS.observe(upstream_seconds)
             
             # レスポンスをフロントエンド形式に変換
             response = SessionCreateResponse(
@@ -51,24 +107,111 @@ class AzureProxyService(IAzureProxyService):
                 client_secret=azure_response.client_secret  # client_secretを含める
             )
             
-            self.logger.info(f"Session proxy completed successfully: {response.id}")
+            set_log_context(session_id=response.id)
+            self.logger.info("Session proxy completed successfully: %s", response.id)
+            SESSION_RESPONSES.inc(status="200")
             return response
             
         except AzureOpenAIException as e:
             self.logger.error(f"Azure OpenAI error during session creation: {str(e)}")
-            
-            # Azure APIエラーをHTTPエラーにマッピング
-            if e.status_code == 400:
-                raise HTTPException(status_code=400, detail="Invalid request parameters")
-            elif e.status_code == 401:
-                raise HTTPException(status_code=502, detail="Azure OpenAI authentication failed")
-            elif e.status_code == 429:
-                raise HTTPException(status_code=429, detail="Rate limit exceeded")
-            elif e.status_code and 500 <= e.status_code < 600:
-                raise HTTPException(status_code=502, detail="Azure OpenAI service unavailable")
-            else:
-                raise HTTPException(status_code=502, detail="Azure OpenAI API error")
-                
+            error = self._to_http_exception(e)
+            SESSION_RESPONSES.inc(status=str(error.status_code))
+            raise error
+        
         except Exception as e:
             self.logger.error(f"Unexpected error during session proxy: {str(e)}", exc_info=True)
+            SESSION_RESPONSES.inc(status="500")
+            raise HTTPException(status_code=500, detail="Internal server error")
+        
+        finally:
+            SESSION_OVERHEAD_SECONDS.observe(time.perf_counter() - started_at - upstream_seconds)
+    
+    async def webrtc_sdp_proxy(self, model: str, ephemeral_key: str, sdp_offer: str) -> str:
+        """WebRTC の SDP Offer をAzure OpenAI APIにプロキシ"""
+        if not ephemeral_key or not ephemeral_key.startswith("ek_"):
+            SDP_RESPONSES.inc(status="400")
+            raise HTTPException(status_code=400, detail="Invalid ephemeral key format")
+        self._validate_sdp_offer(sdp_offer)
+        
+        started_at = time.perf_counter()
+        try:
+            self.logger.info("Proxying WebRTC SDP exchange for model: %s", model)
+            sdp_answer = await self.azure_client.proxy_webrtc_sdp(model, ephemeral_key, sdp_offer)
+        
+        except AzureOpenAIException as e:
+            self.logger.error(f"Azure OpenAI error during SDP exchange: {str(e)}")
+            error = self._to_http_exception(e, client_credentials=True)
+            SDP_RESPONSES.inc(status=str(error.status_code))
+            raise error
+        
+        except Exception as e:
+            self.logger.error(f"Unexpected error during SDP proxy: {str(e)}", exc_info=True)
+            SDP_RESPONSES.inc(status="500")
             raise HTTPException(status_code=500, detail="Internal server error")
+        
+        finally:
+            SDP_UPSTREAM_SECONDS.observe(time.perf_counter() - started_at)
+        
+        self.logger.info("SDP exchange completed successfully")
+        SDP_RESPONSES.inc(status="201")
+        return sdp_answer
+    
+    async def create_session_with_sdp(self, request: WebRTCSessionCreateRequest) -> WebRTCSessionCreateResponse:
+        """セッション作成と SDP 交換をまとめて実行
+        
+        クライアントからの往復が1回で済み、エフェメラルキーもクライアントに渡しません。
+        """
+        # Offer が不正な場合はセッションを作成しない
+        self._validate_sdp_offer(request.sdp)
+        
+        session = await self.create_session_proxy(request)
+        ephemeral_key = (session.client_secret or {}).get("value")
+        if not ephemeral_key:
+            self.logger.error(f"Session {session.id} has no client secret for the SDP exchange")
+            raise HTTPException(status_code=502, detail="Azure OpenAI did not return an ephemeral key")
+        
+        sdp_answer = await self.webrtc_sdp_proxy(request.model, ephemeral_key, request.sdp)
+        return WebRTCSessionCreateResponse(
+            id=session.id,
+            object=session.object,
+            model=session.model,
+            expires_at=session.expires_at,
+            sdp=sdp_answer
+        )
+    
+    @staticmethod
+    def _validate_sdp_offer(sdp_offer: str) -> None:
+        """SDP の最低限の形式確認"""
+        if not sdp_offer or "v=0" not in sdp_offer:
+            SDP_RESPONSES.inc(status="400")
+            raise HTTPException(status_code=400, detail="Invalid SDP format")
+    
+    @staticmethod
+    def _to_http_exception(e: AzureOpenAIException, client_credentials: bool = False) -> HTTPException:
+        """Azure APIエラーをHTTPエラーにマッピング
+        
+        Args:
+            e: Azure OpenAI API 例外
+            client_credentials: クライアントが送ったエフェメラルキーで認証した呼び出しか
+                （401 はサーバーの設定不備ではなくクライアントのキーの問題として返す）
+        """
+        # Retry-After はクライアントにも伝える（即時の再送による負荷集中を防ぐ）
+        retry_headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after is not None else None
+        
+        if e.error_code == CIRCUIT_OPEN_ERROR_CODE:
+            return HTTPException(
+                status_code=503,
+                detail="Azure OpenAI is temporarily unavailable",
+                headers=retry_headers
+            )
+        if e.status_code == 400:
+            return HTTPException(status_code=400, detail="Invalid request parameters")
+        if e.status_code == 401:
+            if client_credentials:
+                return HTTPException(status_code=401, detail="Ephemeral key is invalid or expired")
+            return HTTPException(status_code=502, detail="Azure OpenAI authentication failed")
+        if e.status_code == 429:
+            return HTTPException(status_code=429, detail="Rate limit exceeded", headers=retry_headers)
+        if e.status_code and 500 <= e.status_code < 600:
+            return HTTPException(status_code=502, detail="Azure OpenAI service unavailable")
+        return HTTPException(status_code=502, detail="Azure OpenAI API error")
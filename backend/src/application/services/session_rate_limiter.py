@@ -0,0 +1,153 @@
+"""
+セッション作成のレート制限（アドミッション制御）
+"""
+import asyncio
+import ipaddress
+from typing import Dict, List, Optional, Sequence, Tuple
+from application.interfaces.rate_limit_store import IRateLimitStore, TokenBucketRule
+from shared.utils.logging import get_logger
+
+
+class RateLimitExceededError(Exception):
+    """レート制限を超えたためリクエストを受け付けなかった場合のエラー"""
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SessionRateLimiter:
+    """セッション作成のレート制限
+    
+    クライアントごと・全体（Azure のクォータに合わせる）・モデルごとのトークンバケットで
+    制限します。トークンが max_wait_seconds 以内に揃う場合は待機してから許可し、
+    それ以上かかる場合や待機中のリクエストが max_waiters を超える場合は即座に拒否します。
+    
+    クライアントIDはリクエスト元が自由に変えられるため、trusted_client_id_sources
+    （認証を行うゲートウェイ等）からのリクエストの場合のみ使い、それ以外はIPアドレスで識別します。
+    """
+    
+    def __init__(
+        self,
+        store: IRateLimitStore,
+        client_rule: Optional[TokenBucketRule] = None,
+        global_rule: Optional[TokenBucketRule] = None,
+        model_rules: Optional[Dict[str, TokenBucketRule]] = None,
+        max_wait_seconds: float = 2.0,
+        max_waiters: int = 100,
+        trusted_client_id_sources: Optional[Sequence[str]] = None
+    ):
+        """初期化
+        
+        Args:
+            store: バケットの状態ストア
+            client_rule: クライアントごとの制限（省略時は制限なし）
+            global_rule: 全体の制限（省略時は制限なし）
+            model_rules: モデルごとの全体制限
+            max_wait_seconds: トークンが揃うまで待機する最大秒数
+            max_waiters: 同時に待機できるリクエスト数
+            trusted_client_id_sources: クライアントIDを信頼する送信元のIPアドレス・CIDR
+        
+        Raises:
+            ValueError: trusted_client_id_sources に不正なアドレスが含まれる場合
+        """
+        self.store = store
+        self.client_rule = client_rule
+        self.global_rule = global_rule
+        self.model_rules = model_rules or {}
+        self.max_wait_seconds = max_wait_seconds
+        self.max_waiters = max_waiters
+        self.trusted_client_id_sources = [
+            ipaddress.ip_network(source.strip(), strict=False)
+            for source in trusted_client_id_sources or []
+            if source.strip()
+        ]
+        self.logger = get_logger("session_rate_limiter")
+        self._waiters = 0
+        self.admitted = 0
+        self.delayed = 0
+        self.rejected = 0
+    
+    def client_key(self, client_host: Optional[str], client_id: Optional[str] = None) -> str:
+        """レート制限に使うクライアントの識別子を決定する
+        
+        Args:
+            client_host: リクエスト元のIPアドレス
+            client_id: リクエストで指定されたクライアントID（X-Client-Id）
+        
+        Returns:
+            信頼できる送信元からのクライアントID、それ以外はIPアドレスによる識別子
+        """
+        if client_id and client_host and self._is_trusted_source(client_host):
+            return f"id:{client_id}"
+        return f"ip:{client_host or 'unknown'}"
+    
+    def _is_trusted_source(self, client_host: str) -> bool:
+        try:
+            address = ipaddress.ip_address(client_host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_client_id_sources)
+    
+    def _buckets(self, client_key: str, model: Optional[str]) -> List[Tuple[str, TokenBucketRule]]:
+        buckets = []
+        if self.client_rule is not None:
+            buckets.append((f"client:{client_key}", self.client_rule))
+        if self.global_rule is not None:
+            buckets.append(("global", self.global_rule))
+        if model in self.model_rules:
+            buckets.append((f"model:{model}", self.model_rules[model]))
+        return buckets
+    
+    def _reject(self, client_key: str, retry_after: float) -> RateLimitExceededError:
+        self.rejected += 1
+        self.logger.warning(f"Session creation rate limited: client={client_key}, retry_after={retry_after:.1f}s")
+        return RateLimitExceededError("Rate limit exceeded", retry_after=retry_after)
+    
+    async def acquire(self, client_key: str, model: Optional[str] = None) -> None:
+        """セッション作成の許可を取得する
+        
+        Args:
+            client_key: クライアントの識別子（クライアントIDまたはIPアドレス）
+            model: 作成するセッションのモデル
+        
+        Raises:
+            RateLimitExceededError: 制限を超えた場合
+        """
+        buckets = self._buckets(client_key, model)
+        if not buckets:
+            return
+        
+        wait = await self.store.try_acquire(buckets)
+        if wait == 0:
+            self.admitted += 1
+            return
+        
+        if wait > self.max_wait_seconds or self._waiters >= self.max_waiters:
+            raise self._reject(client_key, wait)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_seconds
+        self._waiters += 1
+        try:
+            while True:
+                await asyncio.sleep(wait)
+                wait = await self.store.try_acquire(buckets)
+                if wait == 0:
+                    self.admitted += 1
+                    self.delayed += 1
+                    return
+                # 他のリクエストに先を越された場合も期限までは待機を続ける
+                if loop.time() + wait > deadline:
+                    raise self._reject(client_key, wait)
+        finally:
+            self._waiters -= 1
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """統計情報"""
+        return {
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "waiting": self._waiters
+        }
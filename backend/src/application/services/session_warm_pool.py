@@ -0,0 +1,234 @@
+"""
+セッション事前作成（ウォーム）プール
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+from application.dto.azure_dto import AzureSessionRequest, AzureSessionResponse
+from infrastructure.azure.azure_openai_client import IAzureOpenAIClient
+from shared.utils.logging import get_logger
+
+# (model, voice, instructions, modalities, tools)
+PoolKey = Tuple[str, str, Optional[str], Tuple[str, ...], str]
+
+
+@dataclass
+class _PooledSession:
+    """プール内のセッションエントリ"""
+    session: AzureSessionResponse
+    discard_at: float
+
+
+@dataclass
+class _KeyState:
+    """プールキーごとの状態"""
+    request: AzureSessionRequest
+    sessions: Deque[_PooledSession]
+    last_used_at: float
+    refilling: bool = False
+
+
+class SessionWarmPool:
+    """ephemeral key の事前作成プール
+    
+    (model, voice, instructions, modalities, tools) の組み合わせごとにセッションを
+    事前作成しておき、リクエスト時は即座に払い出します。払い出し後はバックグラウンドで
+    補充し、client_secret の有効期限が近いエントリは払い出し前に破棄します。
+    キーは最初のリクエストで登録され、一定時間利用がなければプールから外れます。
+    """
+    
+    def __init__(
+        self,
+        azure_client: IAzureOpenAIClient,
+        pool_size: int = 2,
+        expiry_margin_seconds: float = 15.0,
+        default_ttl_seconds: float = 60.0,
+        keep_warm_seconds: float = 300.0,
+        max_keys: int = 16,
+        maintenance_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """初期化
+        
+        Args:
+            azure_client: Azure OpenAI クライアント
+            pool_size: キーごとに保持するセッション数
+            expiry_margin_seconds: 有効期限の何秒前に破棄するか
+            default_ttl_seconds: 有効期限がレスポンスに含まれない場合の想定TTL
+            keep_warm_seconds: 最後の利用からキーを保温し続ける秒数
+            max_keys: 保持するキーの最大数（超過時は最も古いキーを破棄）
+            maintenance_interval_seconds: 期限切れ破棄と補充を行う間隔
+            clock: 現在時刻（UNIX秒）を返す関数
+        """
+        self.azure_client = azure_client
+        self.pool_size = pool_size
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.default_ttl_seconds = default_ttl_seconds
+        self.keep_warm_seconds = keep_warm_seconds
+        self.max_keys = max_keys
+        self.maintenance_interval_seconds = maintenance_interval_seconds
+        self._clock = clock
+        self.logger = get_logger("session_warm_pool")
+        
+        self._keys: "OrderedDict[PoolKey, _KeyState]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # メトリクス
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+    
+    @staticmethod
+    def make_key(request: AzureSessionRequest) -> PoolKey:
+        """リクエストからプールキーを生成"""
+        tools = json.dumps(request.tools, sort_keys=True, ensure_ascii=False) if request.tools else ""
+        return (
+            request.model,
+            request.voice,
+            request.instructions,
+            tuple(request.modalities or ()),
+            tools
+        )
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """プールの利用状況"""
+        return {
+            "keys": len(self._keys),
+            "pooled_sessions": sum(len(state.sessions) for state in self._keys.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded
+        }
+    
+    def start(self) -> None:
+        """期限切れ破棄・補充のバックグラウンド処理を開始"""
+        if self._closed or (self._maintenance_task and not self._maintenance_task.done()):
+            return
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+    
+    async def close(self) -> None:
+        """バックグラウンド処理を停止し、プールを破棄"""
+        self._closed = True
+        tasks = list(self._tasks)
+        if self._maintenance_task is not None:
+            tasks.append(self._maintenance_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._maintenance_task = None
+        self._keys.clear()
+    
+    def acquire(self, request: AzureSessionRequest) -> Optional[AzureSessionResponse]:
+        """プールからセッションを払い出す
+        
+        プールが空の場合は None を返します（呼び出し元が直接作成します）。
+        いずれの場合もバックグラウンドで補充をスケジュールします。
+        
+        Args:
+            request: セッション作成リクエスト
+        
+        Returns:
+            事前作成済みのセッション、またはNone
+        """
+        key = self.make_key(request)
+        state = self._touch(key, request)
+        now = self._clock()
+        
+        session = None
+        while state.sessions:
+            entry = state.sessions.popleft()
+            if entry.discard_at > now:
+                session = entry.session
+                break
+            self.discarded += 1
+        
+        if session is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        
+        self.start()
+        self._schedule_refill(key)
+        return session
+    
+    def _touch(self, key: PoolKey, request: AzureSessionRequest) -> _KeyState:
+        """キーを登録・更新（LRU順を維持）"""
+        state = self._keys.get(key)
+        if state is None:
+            while len(self._keys) >= self.max_keys:
+                _, evicted = self._keys.popitem(last=False)
+                self.discarded += len(evicted.sessions)
+            state = _KeyState(request=request, sessions=deque(), last_used_at=self._clock())
+            self._keys[key] = state
+        else:
+            self._keys.move_to_end(key)
+            state.last_used_at = self._clock()
+        return state
+    
+    def _discard_at(self, session: AzureSessionResponse) -> float:
+        """エントリを破棄すべき時刻を算出"""
+        expires_at = None
+        if session.client_secret:
+            expires_at = session.client_secret.get("expires_at")
+        if expires_at is None:
+            expires_at = self._clock() + self.default_ttl_seconds
+        return float(expires_at) - self.expiry_margin_seconds
+    
+    def _schedule_refill(self, key: PoolKey) -> None:
+        """補充タスクをスケジュール（キーごとに同時実行は1つ）"""
+        state = self._keys.get(key)
+        if self._closed or state is None or state.refilling:
+            return
+        if len(state.sessions) >= self.pool_size:
+            return
+        
+        state.refilling = True
+        task = asyncio.create_task(self._refill(key, state))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _refill(self, key: PoolKey, state: _KeyState) -> None:
+        """プールサイズまでセッションを事前作成"""
+        try:
+            while not self._closed and len(state.sessions) < self.pool_size:
+                session = await self.azure_client.create_session(state.request)
+                if self._keys.get(key) is not state:
+                    # 補充中にキーが破棄された
+                    return
+                state.sessions.append(
+                    _PooledSession(session=session, discard_at=self._discard_at(session))
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Session pool refill failed for model {key[0]}: {e}")
+        finally:
+            state.refilling = False
+    
+    def _evict_expired(self) -> None:
+        """期限切れエントリと保温期間を過ぎたキーを破棄"""
+        now = self._clock()
+        for key, state in list(self._keys.items()):
+            if now - state.last_used_at > self.keep_warm_seconds:
+                self.discarded += len(state.sessions)
+                del self._keys[key]
+                continue
+            
+            while state.sessions and state.sessions[0].discard_at <= now:
+                state.sessions.popleft()
+                self.discarded += 1
+    
+    async def _maintenance_loop(self) -> None:
+        """定期的に期限切れエントリを破棄し、保温中のキーを補充"""
+        while not self._closed:
+            await asyncio.sleep(self.maintenance_interval_seconds)
+            self._evict_expired()
+            for key in list(self._keys.keys()):
+                self._schedule_refill(key)
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, BinaryIO, Callable, Dict, Hashable, Optional, Tuple
+from application.dto.audio_dto import AudioUploadResponse
+from shared.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class IdempotencyKeyConflictError(Exception):
+    """同じ Idempotency-Key で異なる内容がアップロードされた場合のエラー"""
+    pass
+
+
+@dataclass
+class _DedupEntry:
+    """アップロード済みの結果"""
+    content_hash: str
+    response: AudioUploadResponse
+
+
+def hash_audio_stream(audio_file: BinaryIO) -> str:
+    """ストリームの SHA-256 を算出（チャンク単位で読み込み、先頭に戻す）"""
+    digest = hashlib.sha256()
+    audio_file.seek(0)
+    for chunk in iter(lambda: audio_file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    audio_file.seek(0)
+    return digest.hexdigest()
+
+
+class UploadDeduplicator:
+    """音声アップロードの重複排除
+    
+    内容のハッシュ（または Idempotency-Key）をキーに、直近のアップロード結果を
+    有効期限付きLRUキャッシュに保持します。再送されたアップロードは変換・
+    アップロードを行わずに既存の結果を返し、処理中の同一アップロードには
+    その完了を待って同じ結果を返します。
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        """初期化
+        
+        Args:
+            max_entries: 保持する結果の最大数
+            ttl_seconds: 結果を保持する秒数
+        """
+        self._cache: TTLCache[_DedupEntry] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._in_flight: Dict[Hashable, Tuple[str, asyncio.Future]] = {}
+        
+        # メトリクス
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(
+        content_hash: str,
+        session_id: Optional[str],
+        audio_format: str,
+        idempotency_key: Optional[str] = None
+    ) -> Hashable:
+        """重複判定キーを生成"""
+        if idempotency_key:
+            return ("idempotency-key", session_id, idempotency_key)
+        return ("sha256", session_id, audio_format, content_hash)
+    
+    async def run(
+        self,
+        key: Hashable,
+        content_hash: str,
+        upload: Callable[[], Awaitable[AudioUploadResponse]]
+    ) -> Tuple[AudioUploadResponse, bool]:
+        """
+        重複でなければアップロードを実行
+        
+        Args:
+            key: make_key で生成したキー
+            content_hash: アップロード内容の SHA-256
+            upload: 実際のアップロード処理
+        
+        Returns:
+            (アップロード結果, 重複として既存の結果を返したか)
+        
+        Raises:
+            IdempotencyKeyConflictError: Idempotency-Key が異なる内容で再利用された場合
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._check_conflict(entry.content_hash, content_hash)
+            self.hits += 1
+            logger.info(f"Duplicate upload detected, returning existing audio: {entry.response.audio_id}")
+            return entry.response, True
+        
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            in_flight_hash, future = in_flight
+            self._check_conflict(in_flight_hash, content_hash)
+            self.joined += 1
+            logger.info("Duplicate upload in progress, waiting for its result")
+            return await asyncio.shield(future), True
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (content_hash, future)
+        try:
+            response = await upload()
+        except asyncio.CancelledError:
+            future.set_exception(RuntimeError("Original upload was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            # 失敗は記録しない（待機中の重複リクエストには同じエラーを返す）
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            self._cache.set(key, _DedupEntry(content_hash=content_hash, response=response))
+            future.set_result(response)
+            return response, False
+        finally:
+            del self._in_flight[key]
+    
+    @staticmethod
+    def _check_conflict(stored_hash: str, content_hash: str) -> None:
+        if stored_hash != content_hash:
+            raise IdempotencyKeyConflictError("Idempotency-Key was already used for a different audio file")
@@ -0,0 +1,123 @@
+from typing import Iterable, List, Optional, Tuple
+from application.dto.audio_dto import AudioAnalysis
+from infrastructure.audio.pcm_decoder import DecodedPcm, np
+
+# Samples at or above this level count as clipped (full scale of 16-bit PCM)
+CLIPPING_LEVEL = 32767 / 32768
+
+# Floor for dBFS values of silent input
+MIN_DBFS = -120.0
+
+# Waveform peaks are quantized to signed 8-bit values
+PEAK_SCALE = 127
+
+
+def _to_dbfs(value: float) -> float:
+    return round(max(MIN_DBFS, 20.0 * float(np.log10(max(value, 1e-12)))), 2)
+
+
+def _analyze_chunks(
+    chunks: Iterable["np.ndarray"],
+    sample_count: int,
+    sample_rate: int,
+    peak_buckets: int
+) -> AudioAnalysis:
+    """
+    Accumulate the statistics chunk by chunk
+    
+    The bucket boundaries are fixed from sample_count up front, so the peaks are
+    the same as for a single pass over the concatenated samples.
+    """
+    duration = sample_count / sample_rate
+    if sample_count == 0:
+        return AudioAnalysis(
+            duration=0.0,
+            rms_dbfs=MIN_DBFS,
+            peak_dbfs=MIN_DBFS,
+            clipping_ratio=0.0,
+            peaks_per_second=0.0,
+            peaks=[]
+        )
+    
+    buckets = min(peak_buckets, sample_count)
+    boundaries = (np.arange(buckets, dtype=np.int64) * sample_count) // buckets
+    minimums = np.full(buckets, np.inf, dtype=np.float32)
+    maximums = np.full(buckets, -np.inf, dtype=np.float32)
+    sum_squares = 0.0
+    peak = 0.0
+    clipped = 0
+    position = 0
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        magnitude = np.abs(chunk)
+        sum_squares += float(np.square(chunk, dtype=np.float64).sum())
+        peak = max(peak, float(magnitude.max()))
+        clipped += int(np.count_nonzero(magnitude >= CLIPPING_LEVEL))
+        
+        # Buckets overlapping this chunk and where each starts within it
+        first = int(np.searchsorted(boundaries, position, side='right')) - 1
+        last = int(np.searchsorted(boundaries, position + len(chunk), side='left'))
+        starts = np.maximum(boundaries[first:last] - position, 0)
+        minimums[first:last] = np.minimum(minimums[first:last], np.minimum.reduceat(chunk, starts))
+        maximums[first:last] = np.maximum(maximums[first:last], np.maximum.reduceat(chunk, starts))
+        position += len(chunk)
+    
+    peaks = np.empty(buckets * 2, dtype=np.int32)
+    peaks[0::2] = np.round(minimums * PEAK_SCALE)
+    peaks[1::2] = np.round(maximums * PEAK_SCALE)
+    
+    return AudioAnalysis(
+        duration=round(duration, 3),
+        rms_dbfs=_to_dbfs(float(np.sqrt(sum_squares / sample_count))),
+        peak_dbfs=_to_dbfs(peak),
+        clipping_ratio=round(clipped / sample_count, 6),
+        peaks_per_second=round(buckets / duration, 3) if duration else 0.0,
+        peaks=np.clip(peaks, -PEAK_SCALE, PEAK_SCALE).tolist()
+    )
+
+
+def analyze_pcm(samples: "np.ndarray", sample_rate: int, peak_buckets: int = 500) -> AudioAnalysis:
+    """
+    Compute duration, loudness, clipping and waveform peaks of decoded PCM
+    
+    The peaks are the min/max of peak_buckets equally sized ranges (fewer for very
+    short input).
+    
+    Args:
+        samples: Mono float PCM in [-1.0, 1.0]
+        sample_rate: Sample rate of the PCM
+        peak_buckets: Number of min/max pairs in the waveform
+    
+    Returns:
+        AudioAnalysis
+    """
+    return _analyze_chunks([samples], len(samples), sample_rate, peak_buckets)
+
+
+def analyze_decoded_pcm(
+    pcm: DecodedPcm,
+    keep: Optional[List[Tuple[float, float]]] = None,
+    peak_buckets: int = 500
+) -> AudioAnalysis:
+    """
+    Analyze spooled PCM without loading it into memory
+    
+    Args:
+        pcm: Decoded PCM
+        keep: (start, end) ranges in seconds to analyze as one recording (None = all)
+        peak_buckets: Number of min/max pairs in the waveform
+    
+    Returns:
+        AudioAnalysis of the kept ranges
+    """
+    if keep is None:
+        ranges = [(0, pcm.sample_count)]
+    else:
+        ranges = [
+            (int(start * pcm.sample_rate), min(int(end * pcm.sample_rate), pcm.sample_count))
+            for start, end in keep
+        ]
+    sample_count = sum(max(0, end - start) for start, end in ranges)
+    chunks = (chunk for start, end in ranges for chunk in pcm.chunks(start, end))
+    return _analyze_chunks(chunks, sample_count, pcm.sample_rate, peak_buckets)
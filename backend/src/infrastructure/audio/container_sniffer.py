@@ -0,0 +1,542 @@
+import os
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Bytes read from the start of an upload (enough for the headers of streaming-friendly files)
+SNIFF_BYTES = 64 * 1024
+
+# Formats the sniffer recognizes; an upload declared as one of these must match its signature
+SNIFFED_FORMATS = frozenset({"webm", "ogg", "wav", "mp4", "m4a", "mp3", "flac"})
+
+
+class InvalidAudioError(ValueError):
+    """The upload is not a readable audio file"""
+
+
+class _Truncated(Exception):
+    """The header continues beyond the sniffed bytes"""
+
+
+@dataclass
+class ContainerInfo:
+    """Container and first audio stream as read from the file header"""
+    format: str
+    codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    duration: Optional[float] = None
+    
+    @property
+    def is_complete(self) -> bool:
+        """Whether the header was enough to validate the stream without ffprobe"""
+        return self.codec is not None and bool(self.sample_rate) and bool(self.channels)
+
+
+def sniff_audio_file(audio_file: BinaryIO) -> Optional[ContainerInfo]:
+    """
+    Identify an upload from its first bytes without running ffmpeg
+    
+    The stream position is restored afterwards.
+    
+    Args:
+        audio_file: Seekable audio stream
+    
+    Returns:
+        ContainerInfo, or None if the data matches none of the sniffed formats
+    
+    Raises:
+        InvalidAudioError: If the file is empty or a recognized header is corrupt
+    """
+    position = audio_file.tell()
+    try:
+        total_size = audio_file.seek(0, os.SEEK_END)
+        audio_file.seek(0)
+        header = audio_file.read(SNIFF_BYTES)
+        if header[:3] == b'ID3' and len(header) >= 10:
+            # MP3 frames follow the ID3v2 tag, which may be larger than the sniffed bytes
+            tag_size = 10 + _syncsafe(header[6:10]) + (10 if header[5] & 0x10 else 0)
+            audio_file.seek(tag_size)
+            info = _parse_mp3(audio_file.read(SNIFF_BYTES), max(0, total_size - tag_size))
+            return info or ContainerInfo(format="mp3")
+        return sniff_container(header, total_size)
+    finally:
+        audio_file.seek(position)
+
+
+def sniff_container(header: bytes, total_size: Optional[int] = None) -> Optional[ContainerInfo]:
+    """
+    Identify the container from its magic bytes and parse the stream header
+    
+    Args:
+        header: First bytes of the upload (SNIFF_BYTES, or the whole file if smaller)
+        total_size: Size of the whole upload (used for MP3 duration estimates)
+    
+    Returns:
+        ContainerInfo, or None if the data matches none of the sniffed formats
+    
+    Raises:
+        InvalidAudioError: If the file is empty or a recognized header is corrupt
+    """
+    if not header:
+        raise InvalidAudioError("Audio file is empty")
+    whole_file = len(header) < SNIFF_BYTES if total_size is None else len(header) >= total_size
+    
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        name, parser = "webm", _parse_matroska
+    elif header.startswith(b'OggS'):
+        name, parser = "ogg", _parse_ogg
+    elif header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        name, parser = "wav", _parse_wav
+    elif header[4:8] in _MP4_TOP_LEVEL_BOXES:
+        name, parser = "mp4", _parse_mp4
+    elif header.startswith(b'fLaC'):
+        name, parser = "flac", _parse_flac
+    else:
+        return _parse_mp3(header, total_size)
+    
+    try:
+        return parser(header)
+    except _Truncated:
+        if whole_file:
+            raise InvalidAudioError(f"Truncated {name} header")
+        return ContainerInfo(format=name)
+    except struct.error:
+        raise InvalidAudioError(f"Corrupt {name} header")
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _require(data: bytes, end: int) -> None:
+    if end > len(data):
+        raise _Truncated()
+
+
+# --- WAV ---------------------------------------------------------------------
+
+def _wav_codec(tag: int, bits: int) -> Optional[str]:
+    if tag == 1:
+        return {8: 'pcm_u8', 16: 'pcm_s16le', 24: 'pcm_s24le', 32: 'pcm_s32le'}.get(bits)
+    if tag == 3:
+        return {32: 'pcm_f32le', 64: 'pcm_f64le'}.get(bits)
+    return {6: 'pcm_alaw', 7: 'pcm_mulaw', 0x55: 'mp3'}.get(tag)
+
+
+def _parse_wav(data: bytes) -> ContainerInfo:
+    info = ContainerInfo(format="wav")
+    byte_rate = None
+    offset = 12
+    while True:
+        _require(data, offset + 8)
+        chunk_id, size = struct.unpack_from('<4sI', data, offset)
+        body = offset + 8
+        if chunk_id == b'fmt ':
+            if size < 16:
+                raise InvalidAudioError("Corrupt WAV fmt chunk")
+            _require(data, body + 16)
+            tag, channels, sample_rate, byte_rate, _, bits = struct.unpack_from('<HHIIHH', data, body)
+            if tag == 0xFFFE and size >= 26:
+                # WAVE_FORMAT_EXTENSIBLE: the format tag starts the sub-format GUID
+                _require(data, body + 26)
+                tag = struct.unpack_from('<H', data, body + 24)[0]
+            if channels == 0 or sample_rate == 0:
+                raise InvalidAudioError("WAV header declares no audio")
+            info.codec = _wav_codec(tag, bits)
+            info.channels = channels
+            info.sample_rate = sample_rate
+        elif chunk_id == b'data':
+            if byte_rate is None:
+                raise InvalidAudioError("WAV data chunk precedes the fmt chunk")
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF
+            if byte_rate and size not in (0, 0xFFFFFFFF):
+                info.duration = size / byte_rate
+            return info
+        offset = body + size + (size & 1)
+
+
+# --- Ogg / FLAC --------------------------------------------------------------
+
+def _flac_streaminfo(block: bytes) -> Tuple[int, int, Optional[float]]:
+    """Sample rate, channels and duration from a FLAC STREAMINFO block"""
+    _require(block, 18)
+    value = int.from_bytes(block[10:18], 'big')
+    sample_rate = value >> 44
+    channels = ((value >> 41) & 0x7) + 1
+    total_samples = value & ((1 << 36) - 1)
+    duration = total_samples / sample_rate if sample_rate and total_samples else None
+    return sample_rate, channels, duration
+
+
+def _parse_flac(data: bytes) -> ContainerInfo:
+    # "fLaC" + metadata block header; STREAMINFO is always the first block
+    if len(data) >= 5 and data[4] & 0x7F != 0:
+        raise InvalidAudioError("FLAC stream does not start with STREAMINFO")
+    sample_rate, channels, duration = _flac_streaminfo(data[8:])
+    if sample_rate == 0:
+        raise InvalidAudioError("FLAC header declares no sample rate")
+    return ContainerInfo(format="flac", codec="flac", sample_rate=sample_rate, channels=channels, duration=duration)
+
+
+def _parse_ogg(data: bytes) -> ContainerInfo:
+    info = ContainerInfo(format="ogg")
+    _require(data, 27)
+    if data[4] != 0:
+        raise InvalidAudioError("Unsupported Ogg page version")
+    table_end = 27 + data[26]
+    _require(data, table_end)
+    packet = data[table_end:table_end + sum(data[27:table_end])]
+    
+    if packet.startswith(b'OpusHead'):
+        _require(packet, 19)
+        # Opus always decodes at 48 kHz; the header carries the original rate only as a hint
+        info.codec, info.channels, info.sample_rate = "opus", packet[9], 48000
+    elif packet.startswith(b'\x01vorbis'):
+        _require(packet, 16)
+        info.codec, info.channels = "vorbis", packet[11]
+        info.sample_rate = struct.unpack_from('<I', packet, 12)[0]
+    elif packet.startswith(b'\x7fFLAC'):
+        info.codec = "flac"
+        info.sample_rate, info.channels, info.duration = _flac_streaminfo(packet[17:])
+    elif packet.startswith(b'Speex   '):
+        _require(packet, 52)
+        info.codec = "speex"
+        info.sample_rate = struct.unpack_from('<I', packet, 36)[0]
+        info.channels = struct.unpack_from('<I', packet, 48)[0]
+    else:
+        return info
+    
+    if not info.channels or not info.sample_rate:
+        raise InvalidAudioError(f"Ogg {info.codec} header declares no audio")
+    return info
+
+
+# --- Matroska / WebM ---------------------------------------------------------
+
+_EBML_HEADER = 0x1A45DFA3
+_EBML_DOC_TYPE = 0x4282
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_TYPE = 0x83
+_CODEC_ID = 0x86
+_AUDIO = 0xE1
+_SAMPLING_FREQUENCY = 0xB5
+_CHANNELS = 0x9F
+_CLUSTER = 0x1F43B675
+
+_TRACK_TYPE_AUDIO = 2
+
+_MATROSKA_CODECS = {
+    'A_OPUS': 'opus',
+    'A_VORBIS': 'vorbis',
+    'A_MPEG/L3': 'mp3',
+    'A_MPEG/L2': 'mp2',
+    'A_FLAC': 'flac',
+    'A_AC3': 'ac3',
+    'A_EAC3': 'eac3'
+}
+
+
+def _read_vint(data: bytes, offset: int, keep_marker: bool = False) -> Tuple[Optional[int], int]:
+    """Read an EBML variable-length integer (None for the reserved "unknown size")"""
+    _require(data, offset + 1)
+    first = data[offset]
+    if first == 0:
+        raise InvalidAudioError("Corrupt EBML element")
+    length = 9 - first.bit_length()
+    _require(data, offset + length)
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+
+def _iter_ebml(data: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield (element ID, body start, body end) of the elements in [start, end)"""
+    offset = start
+    while offset < end:
+        element_id, id_length = _read_vint(data, offset, keep_marker=True)
+        size, size_length = _read_vint(data, offset + id_length)
+        body = offset + id_length + size_length
+        if size is None:
+            # Unknown size (live recordings): the element runs to the end of its parent
+            yield element_id, body, end
+            return
+        yield element_id, body, body + size
+        offset = body + size
+
+
+def _ebml_uint(data: bytes, start: int, end: int) -> int:
+    _require(data, end)
+    return int.from_bytes(data[start:end], 'big')
+
+
+def _ebml_float(data: bytes, start: int, end: int) -> float:
+    _require(data, end)
+    if end - start == 4:
+        return struct.unpack_from('>f', data, start)[0]
+    if end - start == 8:
+        return struct.unpack_from('>d', data, start)[0]
+    raise InvalidAudioError("Corrupt EBML float")
+
+
+def _parse_matroska(data: bytes) -> ContainerInfo:
+    info = ContainerInfo(format="webm")
+    elements = _iter_ebml(data, 0, len(data))
+    element_id, body, body_end = next(elements)
+    _require(data, body_end)
+    doc_type = None
+    for child_id, start, end in _iter_ebml(data, body, body_end):
+        if child_id == _EBML_DOC_TYPE:
+            _require(data, end)
+            doc_type = data[start:end].rstrip(b'\0').decode('ascii', errors='replace')
+    if doc_type not in ('webm', 'matroska'):
+        raise InvalidAudioError(f"Unsupported EBML document type: {doc_type}")
+    
+    try:
+        for element_id, body, body_end in elements:
+            if element_id == _SEGMENT:
+                _parse_segment(data, body, min(body_end, len(data)), info)
+                break
+    except _Truncated:
+        # Keep whatever was read before the sniffed bytes ran out
+        pass
+    return info
+
+
+def _parse_segment(data: bytes, start: int, end: int, info: ContainerInfo) -> None:
+    timecode_scale = 1_000_000
+    duration = None
+    try:
+        for element_id, body, body_end in _iter_ebml(data, start, end):
+            if element_id == _INFO:
+                for child_id, child_start, child_end in _iter_ebml(data, body, min(body_end, end)):
+                    if child_id == _TIMECODE_SCALE:
+                        timecode_scale = _ebml_uint(data, child_start, child_end)
+                    elif child_id == _DURATION:
+                        duration = _ebml_float(data, child_start, child_end)
+            elif element_id == _TRACKS:
+                _parse_tracks(data, body, min(body_end, end), info)
+            elif element_id == _CLUSTER:
+                # Media data starts; all headers have been seen
+                break
+    finally:
+        if duration:
+            info.duration = duration * timecode_scale / 1e9
+
+
+def _parse_tracks(data: bytes, start: int, end: int, info: ContainerInfo) -> None:
+    for element_id, body, body_end in _iter_ebml(data, start, end):
+        if element_id != _TRACK_ENTRY:
+            continue
+        track_type = codec_id = None
+        # Defaults defined by the Matroska specification
+        sample_rate, channels = 8000.0, 1
+        for child_id, child_start, child_end in _iter_ebml(data, body, min(body_end, end)):
+            if child_id == _TRACK_TYPE:
+                track_type = _ebml_uint(data, child_start, child_end)
+            elif child_id == _CODEC_ID:
+                _require(data, child_end)
+                codec_id = data[child_start:child_end].rstrip(b'\0').decode('ascii', errors='replace')
+            elif child_id == _AUDIO:
+                for audio_id, audio_start, audio_end in _iter_ebml(data, child_start, min(child_end, end)):
+                    if audio_id == _SAMPLING_FREQUENCY:
+                        sample_rate = _ebml_float(data, audio_start, audio_end)
+                    elif audio_id == _CHANNELS:
+                        channels = _ebml_uint(data, audio_start, audio_end)
+        if track_type == _TRACK_TYPE_AUDIO or (codec_id or '').startswith('A_'):
+            info.codec = 'aac' if (codec_id or '').startswith('A_AAC') else _MATROSKA_CODECS.get(codec_id)
+            info.sample_rate = int(sample_rate)
+            info.channels = channels
+            return
+
+
+# --- MP4 ---------------------------------------------------------------------
+
+_MP4_TOP_LEVEL_BOXES = frozenset({b'ftyp', b'styp', b'moov', b'mdat', b'free', b'skip', b'wide'})
+
+_MP4_CODECS = {
+    b'mp4a': 'aac',
+    b'Opus': 'opus',
+    b'fLaC': 'flac',
+    b'alac': 'alac',
+    b'.mp3': 'mp3',
+    b'ac-3': 'ac3',
+    b'ec-3': 'eac3'
+}
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (box type, body start, box end) of the ISO BMFF boxes in [start, end)"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        header = 8
+        if size == 1:
+            _require(data, offset + 16)
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            # Box extends to the end of the file
+            size = end - offset
+        if size < header:
+            raise InvalidAudioError("Corrupt MP4 box")
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _parse_mp4(data: bytes) -> ContainerInfo:
+    info = ContainerInfo(format="mp4")
+    try:
+        for box_type, body, box_end in _iter_boxes(data, 0, len(data)):
+            if box_type == b'moov':
+                _parse_moov(data, body, min(box_end, len(data)), info)
+                break
+    except _Truncated:
+        pass
+    return info
+
+
+def _parse_moov(data: bytes, start: int, end: int, info: ContainerInfo) -> None:
+    for box_type, body, box_end in _iter_boxes(data, start, end):
+        if box_type == b'mvhd':
+            _require(data, body + 32)
+            if data[body] == 1:
+                timescale, duration = struct.unpack_from('>IQ', data, body + 20)
+            else:
+                timescale, duration = struct.unpack_from('>II', data, body + 12)
+            # Fragmented MP4 leaves the duration at 0
+            if timescale and duration:
+                info.duration = duration / timescale
+        elif box_type == b'trak' and info.codec is None:
+            _parse_trak(data, body, min(box_end, end), info)
+
+
+def _find_box(data: bytes, start: int, end: int, path: Tuple[bytes, ...]) -> Optional[Tuple[int, int]]:
+    for box_type, body, box_end in _iter_boxes(data, start, end):
+        if box_type == path[0]:
+            box_end = min(box_end, end)
+            return (body, box_end) if len(path) == 1 else _find_box(data, body, box_end, path[1:])
+    return None
+
+
+def _parse_trak(data: bytes, start: int, end: int, info: ContainerInfo) -> None:
+    handler = _find_box(data, start, end, (b'mdia', b'hdlr'))
+    if handler is None:
+        return
+    _require(data, handler[0] + 12)
+    if data[handler[0] + 8:handler[0] + 12] != b'soun':
+        return
+    
+    sample_descriptions = _find_box(data, start, end, (b'mdia', b'minf', b'stbl', b'stsd'))
+    if sample_descriptions is None:
+        return
+    # Version/flags and entry count precede the first sample entry
+    entry = sample_descriptions[0] + 8
+    _require(data, entry + 36)
+    entry_type = data[entry + 4:entry + 8]
+    channels, _ = struct.unpack_from('>HH', data, entry + 24)
+    sample_rate = struct.unpack_from('>I', data, entry + 32)[0] >> 16
+    info.codec = _MP4_CODECS.get(entry_type)
+    info.channels = channels
+    info.sample_rate = sample_rate
+
+
+# --- MP3 ---------------------------------------------------------------------
+
+_MP3_BITRATES = {
+    # (MPEG-1?, layer) -> kbps by bitrate index
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000)  # MPEG-2.5
+}
+
+
+@dataclass
+class _Mp3Frame:
+    layer: int
+    mpeg1: bool
+    bitrate: int
+    sample_rate: int
+    channels: int
+    length: int
+    samples: int
+
+
+def _parse_mp3_frame(data: bytes, offset: int) -> Optional[_Mp3Frame]:
+    if offset + 4 > len(data):
+        return None
+    header = int.from_bytes(data[offset:offset + 4], 'big')
+    if header >> 21 != 0x7FF:
+        return None
+    version = (header >> 19) & 0x3
+    layer = 4 - ((header >> 17) & 0x3)
+    bitrate_index = (header >> 12) & 0xF
+    sample_rate_index = (header >> 10) & 0x3
+    # Reserved values (also excludes AAC ADTS, whose layer bits are 00)
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][sample_rate_index]
+    padding = (header >> 9) & 0x1
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    else:
+        samples = 1152 if layer == 2 or mpeg1 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    channels = 1 if (header >> 6) & 0x3 == 3 else 2
+    return _Mp3Frame(layer, mpeg1, bitrate, sample_rate, channels, length, samples)
+
+
+def _parse_mp3(data: bytes, total_size: Optional[int]) -> Optional[ContainerInfo]:
+    """Find two consecutive MPEG audio frames and read the stream parameters"""
+    offset = data.find(b'\xff')
+    while offset != -1:
+        frame = _parse_mp3_frame(data, offset)
+        if frame is not None:
+            following = offset + frame.length
+            if following + 4 > len(data) or _parse_mp3_frame(data, following) is not None:
+                return ContainerInfo(
+                    format="mp3",
+                    codec={1: 'mp1', 2: 'mp2', 3: 'mp3'}[frame.layer],
+                    sample_rate=frame.sample_rate,
+                    channels=frame.channels,
+                    duration=_mp3_duration(data, offset, frame, total_size)
+                )
+        offset = data.find(b'\xff', offset + 1)
+    return None
+
+
+def _mp3_duration(data: bytes, offset: int, frame: _Mp3Frame, total_size: Optional[int]) -> Optional[float]:
+    # VBR files carry the frame count in a Xing/Info header in the first frame
+    if frame.mpeg1:
+        side_info = 17 if frame.channels == 1 else 32
+    else:
+        side_info = 9 if frame.channels == 1 else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b'Xing', b'Info') and xing + 12 <= len(data):
+        flags, frames = struct.unpack_from('>II', data, xing + 4)
+        if flags & 0x1:
+            return frames * frame.samples / frame.sample_rate
+    # Otherwise assume constant bitrate
+    if total_size:
+        return (total_size - offset) * 8 / frame.bitrate
+    return None
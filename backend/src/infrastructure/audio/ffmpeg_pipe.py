@@ -0,0 +1,198 @@
+import re
+import shutil
+import tempfile
+import threading
+import logging
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+import ffmpeg
+from infrastructure.audio.transcoding_pool import TranscodingTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Chunk size used when feeding ffmpeg stdin / draining stdout
+PIPE_CHUNK_SIZE = 256 * 1024
+
+# Transcoded output is kept in memory up to this size, then spilled to disk
+OUTPUT_SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+_INPUT_SECTION_RE = re.compile(r"^Input #0.*?(?=^Output #0|^Stream mapping|\Z)", re.S | re.M)
+_AUDIO_STREAM_RE = re.compile(r"Stream #0:\d+.*?: Audio: (\w+)[^,\n]*, (\d+) Hz, ([^,\n]+)")
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_PROGRESS_TIME_RE = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+@dataclass
+class AudioStreamInfo:
+    """Audio stream information reported by ffmpeg for the input"""
+    codec: str
+    sample_rate: int
+    channels: int
+    duration: Optional[float] = None
+
+
+@dataclass
+class FfmpegPipeResult:
+    """Result of an ffmpeg run over stdin/stdout"""
+    output: BinaryIO
+    output_size: int
+    input_info: Optional[AudioStreamInfo]
+    stderr: str
+
+
+def _parse_timestamp(match: Optional[re.Match]) -> Optional[float]:
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _parse_channels(layout: str) -> int:
+    layout = layout.strip()
+    if layout == "mono":
+        return 1
+    if layout == "stereo":
+        return 2
+    channel_match = re.match(r"(\d+) channels", layout)
+    if channel_match:
+        return int(channel_match.group(1))
+    layout_match = re.match(r"(\d+)\.(\d+)", layout)
+    if layout_match:
+        return int(layout_match.group(1)) + int(layout_match.group(2))
+    return 1
+
+
+def parse_input_audio_info(stderr: str) -> Optional[AudioStreamInfo]:
+    """
+    Extract the input audio stream information from ffmpeg's stderr
+    
+    Args:
+        stderr: ffmpeg stderr output (loglevel info)
+    
+    Returns:
+        AudioStreamInfo of the first input audio stream, or None if there is none
+    """
+    section_match = _INPUT_SECTION_RE.search(stderr)
+    if not section_match:
+        return None
+    section = section_match.group(0)
+    
+    stream_match = _AUDIO_STREAM_RE.search(section)
+    if not stream_match:
+        return None
+    
+    duration = _parse_timestamp(_DURATION_RE.search(section))
+    if duration is None:
+        # Piped inputs often report "Duration: N/A"; fall back to the final progress time
+        progress = _PROGRESS_TIME_RE.findall(stderr)
+        if progress:
+            hours, minutes, seconds = progress[-1]
+            duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    codec, sample_rate, layout = stream_match.groups()
+    return AudioStreamInfo(
+        codec=codec,
+        sample_rate=int(sample_rate),
+        channels=_parse_channels(layout),
+        duration=duration
+    )
+
+
+def run_ffmpeg_pipe(
+    stream_spec,
+    input_file: BinaryIO,
+    timeout: Optional[float] = None
+) -> FfmpegPipeResult:
+    """
+    Run an ffmpeg graph that reads from stdin (pipe:0) and writes to stdout (pipe:1)
+    
+    The input stream is fed in chunks from a writer thread while stdout is drained
+    into a spooled temporary file, so neither the input nor the output is held in
+    memory as a whole and no intermediate files are written for small outputs.
+    
+    Args:
+        stream_spec: ffmpeg-python output node using 'pipe:0' as input and 'pipe:1' as output
+        input_file: Seekable input stream
+        timeout: Seconds after which the ffmpeg process is killed (None = no limit)
+    
+    Returns:
+        FfmpegPipeResult (the caller owns and must close result.output)
+    
+    Raises:
+        ffmpeg.Error: If ffmpeg exits with a non-zero status
+        TranscodingTimeoutError: If the timeout expired
+    """
+    input_file.seek(0)
+    process = (
+        stream_spec
+        .global_args('-hide_banner', '-nostats')
+        .run_async(pipe_stdin=True, pipe_stdout=True, pipe_stderr=True)
+    )
+    
+    stderr_chunks: List[bytes] = []
+    
+    def feed_stdin() -> None:
+        try:
+            shutil.copyfileobj(input_file, process.stdin, PIPE_CHUNK_SIZE)
+        except (BrokenPipeError, ValueError):
+            # ffmpeg stopped reading (e.g. invalid input); the exit status reports why
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+    
+    def drain_stderr() -> None:
+        for chunk in iter(lambda: process.stderr.read(PIPE_CHUNK_SIZE), b''):
+            stderr_chunks.append(chunk)
+    
+    writer = threading.Thread(target=feed_stdin, daemon=True)
+    stderr_reader = threading.Thread(target=drain_stderr, daemon=True)
+    writer.start()
+    stderr_reader.start()
+    
+    timed_out = threading.Event()
+    
+    def kill_on_timeout() -> None:
+        timed_out.set()
+        process.kill()
+    
+    killer = threading.Timer(timeout, kill_on_timeout) if timeout else None
+    if killer is not None:
+        killer.daemon = True
+        killer.start()
+    
+    output = tempfile.SpooledTemporaryFile(max_size=OUTPUT_SPOOL_MAX_MEMORY)
+    try:
+        shutil.copyfileobj(process.stdout, output, PIPE_CHUNK_SIZE)
+        returncode = process.wait()
+        writer.join()
+        stderr_reader.join()
+    except BaseException:
+        process.kill()
+        process.wait()
+        output.close()
+        raise
+    finally:
+        if killer is not None:
+            killer.cancel()
+    
+    if timed_out.is_set():
+        output.close()
+        raise TranscodingTimeoutError(f"ffmpeg did not finish within {timeout} seconds")
+    
+    stderr = b''.join(stderr_chunks)
+    if returncode != 0:
+        output.close()
+        raise ffmpeg.Error('ffmpeg', b'', stderr)
+    
+    output_size = output.tell()
+    output.seek(0)
+    stderr_text = stderr.decode('utf-8', errors='replace')
+    return FfmpegPipeResult(
+        output=output,
+        output_size=output_size,
+        input_info=parse_input_audio_info(stderr_text),
+        stderr=stderr_text
+    )
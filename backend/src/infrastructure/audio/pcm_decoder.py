@@ -0,0 +1,146 @@
+import logging
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional
+import ffmpeg
+from infrastructure.audio.ffmpeg_pipe import run_ffmpeg_pipe
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency: PCM analysis stages are disabled without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Sample rate of the decoded PCM used for analysis (speech content is below 8 kHz)
+PCM_SAMPLE_RATE = 16000
+
+# Samples converted to float per read of the decoded PCM (10 s at PCM_SAMPLE_RATE)
+PCM_CHUNK_SAMPLES = 160000
+
+
+def numpy_available() -> bool:
+    """Whether numpy is installed (required by the PCM analysis stages)"""
+    return np is not None
+
+
+@dataclass
+class DecodedPcm:
+    """Mono 16-bit PCM spooled by ffmpeg, read back in float chunks
+    
+    The PCM stays in the spooled output of run_ffmpeg_pipe (in memory up to
+    OUTPUT_SPOOL_MAX_MEMORY, on disk beyond it), so long uploads are never held
+    in memory as a whole.
+    """
+    output: BinaryIO
+    sample_rate: int
+    sample_count: int
+    
+    @property
+    def duration(self) -> float:
+        return self.sample_count / self.sample_rate
+    
+    def chunks(
+        self,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_samples: int = PCM_CHUNK_SAMPLES
+    ) -> Iterator["np.ndarray"]:
+        """
+        Read samples [start, end) as float32 arrays of at most chunk_samples
+        
+        Args:
+            start: First sample index
+            end: Sample index to stop at (None = end of the PCM)
+            chunk_samples: Maximum length of each array
+        
+        Yields:
+            float32 arrays of samples in [-1.0, 1.0]
+        """
+        end = self.sample_count if end is None else min(end, self.sample_count)
+        position = max(0, start)
+        self.output.seek(position * 2)
+        while position < end:
+            count = min(chunk_samples, end - position)
+            data = self.output.read(count * 2)
+            if len(data) < count * 2:
+                break
+            position += count
+            yield np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    
+    def close(self) -> None:
+        self.output.close()
+    
+    def __enter__(self) -> "DecodedPcm":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_pcm(
+    audio_file: BinaryIO,
+    source_format: str,
+    sample_rate: int = PCM_SAMPLE_RATE,
+    timeout: Optional[float] = None
+) -> DecodedPcm:
+    """
+    Decode audio to mono 16-bit PCM through ffmpeg stdin/stdout
+    
+    Args:
+        audio_file: Seekable audio stream
+        source_format: Source audio format (webm, ogg, etc.)
+        sample_rate: Sample rate of the decoded PCM
+        timeout: Seconds after which ffmpeg is killed (None = no limit)
+    
+    Returns:
+        DecodedPcm (the caller owns it and must close it)
+    
+    Raises:
+        ValueError: If the audio cannot be decoded
+        TranscodingTimeoutError: If the timeout expired
+    """
+    if np is None:
+        raise RuntimeError("numpy is required to decode PCM")
+    
+    input_options = {'f': 'webm'} if source_format.lower() == 'webm' else {}
+    try:
+        result = run_ffmpeg_pipe(
+            ffmpeg.input('pipe:0', **input_options).output(
+                'pipe:1', vn=None, ac=1, ar=sample_rate, f='s16le', **{'c:a': 'pcm_s16le'}
+            ),
+            audio_file,
+            timeout=timeout
+        )
+    except ffmpeg.Error as e:
+        stderr_output = e.stderr.decode('utf-8', errors='replace') if e.stderr else 'No stderr available'
+        logger.debug(f"PCM decode failed: {stderr_output}")
+        raise ValueError(f"Invalid {source_format} audio file")
+    
+    # An odd trailing byte can only come from a truncated stream
+    return DecodedPcm(output=result.output, sample_rate=sample_rate, sample_count=result.output_size // 2)
+
+
+def decode_pcm(
+    audio_file: BinaryIO,
+    source_format: str,
+    sample_rate: int = PCM_SAMPLE_RATE,
+    timeout: Optional[float] = None
+) -> "np.ndarray":
+    """
+    Decode audio to mono PCM held in memory (see open_pcm for long audio)
+    
+    Args:
+        audio_file: Seekable audio stream
+        source_format: Source audio format (webm, ogg, etc.)
+        sample_rate: Sample rate of the decoded PCM
+        timeout: Seconds after which ffmpeg is killed (None = no limit)
+    
+    Returns:
+        float32 array of samples in [-1.0, 1.0]
+    
+    Raises:
+        ValueError: If the audio cannot be decoded
+        TranscodingTimeoutError: If the timeout expired
+    """
+    with open_pcm(audio_file, source_format, sample_rate, timeout) as pcm:
+        return np.concatenate([np.zeros(0, dtype=np.float32), *pcm.chunks()])
@@ -0,0 +1,160 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from infrastructure.audio.pcm_decoder import PCM_CHUNK_SAMPLES, DecodedPcm, np
+
+# (start, end) in seconds on the original timeline
+TimeRange = Tuple[float, float]
+
+# Removals shorter than this are not worth re-encoding for
+MIN_REMOVED_SECONDS = 0.25
+
+
+@dataclass
+class TrimPlan:
+    """Ranges of a recording to keep and to remove"""
+    duration: float
+    keep: List[TimeRange]
+    removed: List[TimeRange] = field(default_factory=list)
+    
+    @property
+    def removed_seconds(self) -> float:
+        return sum(end - start for start, end in self.removed)
+    
+    @property
+    def trims_anything(self) -> bool:
+        return bool(self.removed)
+    
+    @property
+    def is_contiguous(self) -> bool:
+        """Whether only leading/trailing silence is removed"""
+        return len(self.keep) == 1
+
+
+class SilenceTrimmer:
+    """Energy-based voice activity detection over decoded PCM
+    
+    The PCM is split into fixed-size frames and the RMS level of every frame is
+    computed in one vectorized pass per chunk. Frames above the threshold (widened
+    by the padding on both sides) are speech; leading and trailing silence is removed and,
+    if max_gap_ms is set, internal gaps longer than it are shortened to it.
+    """
+    
+    def __init__(
+        self,
+        threshold_db: float = -45.0,
+        frame_ms: int = 20,
+        padding_ms: int = 200,
+        max_gap_ms: Optional[int] = None
+    ):
+        """
+        Args:
+            threshold_db: Frame RMS level (dBFS) above which a frame counts as speech
+            frame_ms: Analysis frame length
+            padding_ms: Audio kept around speech so that word onsets/tails are not clipped
+            max_gap_ms: Internal silences longer than this are shortened to it (None = keep)
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for silence trimming")
+        self.threshold_db = threshold_db
+        self.frame_ms = frame_ms
+        self.padding_ms = padding_ms
+        self.max_gap_ms = max_gap_ms
+    
+    def frame_size(self, sample_rate: int) -> int:
+        """Number of samples in one analysis frame"""
+        return max(1, sample_rate * self.frame_ms // 1000)
+    
+    def frame_levels_db(self, samples: "np.ndarray", sample_rate: int) -> "np.ndarray":
+        """RMS level of each full frame in dBFS"""
+        frame_size = self.frame_size(sample_rate)
+        frame_count = len(samples) // frame_size
+        frames = samples[:frame_count * frame_size].reshape(frame_count, frame_size)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        return 20.0 * np.log10(np.maximum(rms, 1e-10))
+    
+    def plan(self, samples: "np.ndarray", sample_rate: int) -> TrimPlan:
+        """
+        Decide which parts of the recording to keep
+        
+        Args:
+            samples: Mono float PCM in [-1.0, 1.0]
+            sample_rate: Sample rate of the PCM
+        
+        Returns:
+            TrimPlan (keeps everything if no speech was detected)
+        """
+        return self._plan_levels(self.frame_levels_db(samples, sample_rate), len(samples) / sample_rate)
+    
+    def plan_pcm(self, pcm: DecodedPcm) -> TrimPlan:
+        """
+        Decide which parts of spooled PCM to keep, reading it chunk by chunk
+        
+        Args:
+            pcm: Decoded PCM
+        
+        Returns:
+            TrimPlan (keeps everything if no speech was detected)
+        """
+        frame_size = self.frame_size(pcm.sample_rate)
+        # Whole frames per chunk so that no frame spans two chunks
+        chunk_samples = max(1, PCM_CHUNK_SAMPLES // frame_size) * frame_size
+        levels = [self.frame_levels_db(chunk, pcm.sample_rate) for chunk in pcm.chunks(chunk_samples=chunk_samples)]
+        return self._plan_levels(np.concatenate([np.zeros(0), *levels]), pcm.duration)
+    
+    def _plan_levels(self, levels_db: "np.ndarray", duration: float) -> TrimPlan:
+        """Turn frame levels into kept/removed ranges"""
+        frame_seconds = self.frame_ms / 1000
+        voiced = levels_db > self.threshold_db
+        if not voiced.any():
+            # Never store an empty recording; keep silent uploads untouched
+            return TrimPlan(duration=duration, keep=[(0.0, duration)])
+        
+        padding_frames = self.padding_ms // self.frame_ms
+        if padding_frames:
+            kernel = np.ones(2 * padding_frames + 1, dtype=np.int32)
+            voiced = np.convolve(voiced.astype(np.int32), kernel, mode='same') > 0
+        
+        # Start/end frame indices of voiced runs
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+        starts, ends = edges[0::2], edges[1::2]
+        
+        if self.max_gap_ms is None:
+            split = np.zeros(len(starts) - 1, dtype=bool)
+            lead_in = tail_out = 0
+        else:
+            max_gap_frames = max(1, self.max_gap_ms // self.frame_ms)
+            split = (starts[1:] - ends[:-1]) > max_gap_frames
+            # A shortened gap keeps half of max_gap_ms after one run and half before the next
+            tail_out = max_gap_frames // 2
+            lead_in = max_gap_frames - tail_out
+        segment_starts = np.concatenate((starts[:1], starts[1:][split] - lead_in)) * frame_seconds
+        segment_ends = np.concatenate((ends[:-1][split] + tail_out, ends[-1:])) * frame_seconds
+        
+        keep = [(float(start), min(float(end), duration)) for start, end in zip(segment_starts, segment_ends)]
+        if ends[-1] == len(voiced):
+            # Speech runs into the partial frame at the end
+            keep[-1] = (keep[-1][0], duration)
+        return self._drop_small_removals(duration, keep)
+    
+    @staticmethod
+    def _drop_small_removals(duration: float, keep: List[TimeRange]) -> TrimPlan:
+        """Merge kept ranges separated by less than MIN_REMOVED_SECONDS and list the removals"""
+        merged: List[TimeRange] = []
+        previous_end = 0.0
+        for start, end in keep:
+            if start - previous_end < MIN_REMOVED_SECONDS:
+                start = merged.pop()[0] if merged else 0.0
+            merged.append((start, end))
+            previous_end = end
+        if duration - merged[-1][1] < MIN_REMOVED_SECONDS:
+            merged[-1] = (merged[-1][0], duration)
+        
+        removed: List[TimeRange] = []
+        previous_end = 0.0
+        for start, end in merged:
+            if start > previous_end:
+                removed.append((previous_end, start))
+            previous_end = end
+        if duration > previous_end:
+            removed.append((previous_end, duration))
+        return TrimPlan(duration=duration, keep=merged, removed=removed)
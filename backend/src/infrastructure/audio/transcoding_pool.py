@@ -0,0 +1,189 @@
+import os
+import math
+import time
+import asyncio
+import contextvars
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TranscodingQueueFullError(Exception):
+    """Raised when the transcoding queue is full (the caller should retry later)"""
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TranscodingTimeoutError(Exception):
+    """Raised when a transcoding job exceeds its timeout"""
+    pass
+
+
+class TranscodingPool:
+    """
+    Bounded worker pool for ffmpeg transcoding jobs
+    
+    Each worker drives one ffmpeg process at a time, so the number of concurrent
+    ffmpeg processes never exceeds max_workers (sized to the CPU count by default).
+    Jobs beyond the workers wait in a bounded queue; when the queue is full new
+    jobs are rejected immediately with TranscodingQueueFullError.
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_size: int = 16,
+        job_timeout: float = 300.0
+    ):
+        """
+        Initialize the pool
+        
+        Args:
+            max_workers: Number of concurrent ffmpeg processes (default: CPU count)
+            max_queue_size: Number of jobs allowed to wait for a worker
+            job_timeout: Seconds after which a job's ffmpeg process is killed
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+        self.job_timeout = job_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='transcode'
+        )
+        self._lock = threading.Lock()
+        
+        # Metrics (guarded by _lock)
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._rejected = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._avg_job_seconds = 0.0
+    
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running + queued jobs"""
+        return self.max_workers + self.max_queue_size
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait time and outcome counters"""
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            return {
+                "workers": self.max_workers,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "queue_capacity": self.max_queue_size,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait_seconds / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 2),
+                "avg_job_ms": round(self._avg_job_seconds * 1000, 2)
+            }
+    
+    def _retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up"""
+        queued_rounds = math.ceil(self._pending / self.max_workers)
+        return max(1, math.ceil(queued_rounds * self._avg_job_seconds))
+    
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a transcoding job on the pool
+        
+        fn is called on a worker thread as fn(*args, timeout=job_timeout) and is
+        expected to kill its ffmpeg process when the timeout expires.
+        
+        Raises:
+            TranscodingQueueFullError: If the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise TranscodingQueueFullError(
+                    f"Transcoding queue is full ({self._pending} jobs pending)",
+                    retry_after=self._retry_after()
+                )
+            self._pending += 1
+        
+        enqueued_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        # Worker threads log with the caller's request/session correlation IDs
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, self._run_job, enqueued_at, fn, args)
+    
+    def _run_job(self, enqueued_at: float, fn: Callable[..., Any], args: tuple) -> Any:
+        started_at = time.monotonic()
+        wait_seconds = started_at - enqueued_at
+        with self._lock:
+            self._running += 1
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+        
+        succeeded = False
+        try:
+            result = fn(*args, timeout=self.job_timeout)
+            succeeded = True
+            return result
+        except TranscodingTimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started_at
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                if succeeded:
+                    self._completed += 1
+                    # Exponentially weighted average used for Retry-After estimates
+                    if self._avg_job_seconds == 0.0:
+                        self._avg_job_seconds = elapsed
+                    else:
+                        self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+                else:
+                    self._failed += 1
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+
+_transcoding_pool: Optional[TranscodingPool] = None
+_transcoding_pool_lock = threading.Lock()
+
+
+def get_transcoding_pool() -> TranscodingPool:
+    """Get the shared transcoding pool (configured from environment variables)"""
+    global _transcoding_pool
+    with _transcoding_pool_lock:
+        if _transcoding_pool is None:
+            workers = os.getenv('TRANSCODE_MAX_WORKERS')
+            _transcoding_pool = TranscodingPool(
+                max_workers=int(workers) if workers else None,
+                max_queue_size=int(os.getenv('TRANSCODE_MAX_QUEUE_SIZE', '16')),
+                job_timeout=float(os.getenv('TRANSCODE_JOB_TIMEOUT_SECONDS', '300'))
+            )
+            logger.info(
+                f"Created transcoding pool (workers={_transcoding_pool.max_workers}, "
+                f"queue={_transcoding_pool.max_queue_size})"
+            )
+        return _transcoding_pool
+
+
+def shutdown_transcoding_pool(wait: bool = True) -> None:
+    """Shut down the shared transcoding pool"""
+    global _transcoding_pool
+    with _transcoding_pool_lock:
+        if _transcoding_pool is not None:
+            _transcoding_pool.shutdown(wait=wait)
+            _transcoding_pool = None
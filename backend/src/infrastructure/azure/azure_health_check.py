@@ -0,0 +1,50 @@
+"""
+Azure OpenAI のヘルスチェック
+"""
+import time
+from typing import Callable
+from infrastructure.azure.azure_openai_client import IAzureOpenAIClient
+from shared.monitoring.health import HealthCheckResult, HealthStatus, IHealthCheck
+
+
+class AzureOpenAIHealthCheck(IHealthCheck):
+    """Azure OpenAI への接続確認
+    
+    Azure OpenAI に接続できない場合も本サービス自体は応答できるため、unhealthy ではなく
+    degraded として報告します（ロードバランサーから全インスタンスが外れないように）。
+    確認が例外・タイムアウトで失敗した場合も同様です。
+    """
+    
+    failure_status = HealthStatus.DEGRADED
+    
+    def __init__(self, client_provider: Callable[[], IAzureOpenAIClient], name: str = "azure_openai"):
+        """初期化
+        
+        Args:
+            client_provider: Azure OpenAI クライアントを返す関数
+            name: ヘルスチェック名
+        """
+        self._client_provider = client_provider
+        self._name = name
+    
+    async def check(self) -> HealthCheckResult:
+        start = time.perf_counter()
+        try:
+            client = self._client_provider()
+        except ValueError as e:
+            return HealthCheckResult(
+                name=self._name,
+                status=HealthStatus.DEGRADED,
+                message=f"Azure OpenAI is not configured: {e}",
+                response_time_ms=0.0
+            )
+        
+        result = await client.health_check()
+        healthy = result.get("status") == "healthy"
+        return HealthCheckResult(
+            name=self._name,
+            status=HealthStatus.HEALTHY if healthy else HealthStatus.DEGRADED,
+            message=str(result.get("azure_openai", result.get("status"))),
+            response_time_ms=(time.perf_counter() - start) * 1000,
+            details={key: value for key, value in result.items() if key not in ("status", "azure_openai")}
+        )
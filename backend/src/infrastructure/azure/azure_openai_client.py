@@ -25,6 +25,23 @@ class IAzureOpenAIClient(ABC):
         """
         pass
     
+    @abstractmethod
+    async def proxy_webrtc_sdp(self, model: str, ephemeral_key: str, sdp_offer: str) -> str:
+        """WebRTC の SDP Offer を送信して Answer を取得する
+        
+        Args:
+            model: デプロイメント名
+            ephemeral_key: セッション作成で発行されたエフェメラルキー
+            sdp_offer: クライアントの SDP Offer
+        
+        Returns:
+            SDP Answer
+        
+        Raises:
+            AzureOpenAIException: Azure API エラー
+        """
+        pass
+    
     @abstractmethod
     async def health_check(self) -> Dict[str, Any]:
         """Azure OpenAI APIの接続確認
@@ -33,23 +50,52 @@ class IAzureOpenAIClient(ABC):
             ヘルスチェック結果
         """
         pass
+    
+    @abstractmethod
+    async def start(self) -> None:
+        """共有HTTPセッション（接続プール）を開始する"""
+        pass
+    
+    @abstractmethod
+    async def close(self) -> None:
+        """共有HTTPセッション（接続プール）を閉じる"""
+        pass
 
 
 import aiohttp
 import asyncio
+import logging
 import os
 import json
 from typing import Dict, Any, Optional
 from application.dto.azure_dto import AzureSessionRequest, AzureSessionResponse
+from infrastructure.azure.resilience import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after
+)
 from shared.utils.logging import get_logger
 
 
 class AzureOpenAIException(Exception):
     """Azure OpenAI API 例外"""
-    def __init__(self, message: str, status_code: Optional[int] = None, error_code: Optional[str] = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        error_code: Optional[str] = None,
+        retry_after: Optional[float] = None
+    ):
         super().__init__(message)
         self.status_code = status_code
         self.error_code = error_code
+        self.retry_after = retry_after
+
+
+# サーキットブレーカーが開いている場合の error_code
+CIRCUIT_OPEN_ERROR_CODE = "circuit_open"
 
 
 class AzureOpenAIClient(IAzureOpenAIClient):
@@ -65,7 +111,15 @@ class AzureOpenAIClient(IAzureOpenAIClient):
         api_key: str,
         api_version: str = "2024-10-01-preview",
         timeout: float = 30.0,
-        max_retries: int = 3
+        max_retries: int = 3,
+        pool_limit: int = 100,
+        pool_limit_per_host: int = 30,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        webrtc_url: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
     ):
         """初期化
         
@@ -75,8 +129,17 @@ class AzureOpenAIClient(IAzureOpenAIClient):
             api_version: API バージョン
             timeout: タイムアウト秒数
             max_retries: 最大リトライ回数
+            pool_limit: 接続プールの最大接続数
+            pool_limit_per_host: ホストあたりの最大接続数
+            keepalive_timeout: アイドル接続を保持する秒数（経過後に破棄）
+            dns_cache_ttl: DNS キャッシュTTL秒数
+            webrtc_url: SDP 交換のURL（省略時は {endpoint}/openai/realtime）
+            retry_policy: リトライポリシー（省略時は max_retries 回のフルジッター指数バックオフ）
+            retry_budget: リトライ量の上限（省略時は既定値）
+            circuit_breaker: サーキットブレーカー（省略時は既定値）
         """
         self.endpoint = endpoint.rstrip('/')
+        self.webrtc_url = webrtc_url or f"{self.endpoint}/openai/realtime"
         self.api_key = api_key
         self.api_version = api_version
         self.timeout = aiohttp.ClientTimeout(total=timeout)
@@ -85,20 +148,107 @@ class AzureOpenAIClient(IAzureOpenAIClient):
         
         # 接続プール設定（遅延初期化）
         self._connector = None
+        self._session: Optional[aiohttp.ClientSession] = None
         self._timeout_seconds = timeout
+        self._pool_limit = pool_limit
+        self._pool_limit_per_host = pool_limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_cache_ttl = dns_cache_ttl
+        
+        # 接続プールのメトリクス
+        self._new_connections = 0
+        self._reused_connections = 0
+        
+        # リトライ・サーキットブレーカー
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries)
+        self.retry_budget = retry_budget or RetryBudget()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._retries = 0
     
     @property
     def connector(self) -> aiohttp.TCPConnector:
         """HTTPコネクターを遅延初期化で取得"""
-        if self._connector is None:
+        if self._connector is None or self._connector.closed:
             self._connector = aiohttp.TCPConnector(
-                limit=100,  # 最大接続数
-                limit_per_host=30,  # ホストあたりの最大接続数
-                ttl_dns_cache=300,  # DNS キャッシュTTL (5分)
+                limit=self._pool_limit,  # 最大接続数
+                limit_per_host=self._pool_limit_per_host,  # ホストあたりの最大接続数
+                keepalive_timeout=self._keepalive_timeout,  # アイドル接続の有効期限
+                ttl_dns_cache=self._dns_cache_ttl,  # DNS キャッシュTTL
                 use_dns_cache=True,
             )
         return self._connector
     
+    @property
+    def pool_stats(self) -> Dict[str, Any]:
+        """接続プールの利用状況（再利用 vs 新規接続）"""
+        total = self._new_connections + self._reused_connections
+        return {
+            "new_connections": self._new_connections,
+            "reused_connections": self._reused_connections,
+            "reuse_ratio": round(self._reused_connections / total, 4) if total else 0.0,
+            "limit": self._pool_limit,
+            "limit_per_host": self._pool_limit_per_host,
+            "keepalive_timeout": self._keepalive_timeout
+        }
+    
+    @property
+    def resilience_stats(self) -> Dict[str, Any]:
+        """リトライ・サーキットブレーカーの状態"""
+        return {
+            "circuit_state": self.circuit_breaker.state,
+            "circuit_rejected": self.circuit_breaker.rejected,
+            "retries": self._retries,
+            "retry_budget_exhausted": self.retry_budget.exhausted
+        }
+    
+    async def start(self) -> None:
+        """共有HTTPセッションを開始
+        
+        アプリケーションのライフスパンで一度だけ呼び出され、
+        以降の全リクエストでキープアライブ接続を再利用します。
+        """
+        if self._session is not None and not self._session.closed:
+            return
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        
+        self._session = aiohttp.ClientSession(
+            connector=self.connector,
+            timeout=self.timeout,
+            trace_configs=[trace_config]
+        )
+        self.logger.info(
+            f"Azure OpenAI HTTP session started "
+            f"(limit={self._pool_limit}, limit_per_host={self._pool_limit_per_host}, "
+            f"keepalive_timeout={self._keepalive_timeout}s)"
+        )
+    
+    async def close(self) -> None:
+        """共有HTTPセッションとコネクターを閉じる"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        elif self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._session = None
+        self._connector = None
+        self.logger.info("Azure OpenAI HTTP session closed")
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """共有HTTPセッションを取得（未開始の場合は開始する）"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    async def _on_connection_created(self, session, trace_config_ctx, params) -> None:
+        """新規TCP/TLS接続の確立を記録"""
+        self._new_connections += 1
+    
+    async def _on_connection_reused(self, session, trace_config_ctx, params) -> None:
+        """プール内のキープアライブ接続の再利用を記録"""
+        self._reused_connections += 1
+    
     async def create_session(self, request: AzureSessionRequest) -> AzureSessionResponse:
         """セッションを作成する"""
         # フロントエンドと同じエンドポイント形式を使用
@@ -123,33 +273,75 @@ class AzureOpenAIClient(IAzureOpenAIClient):
         if request.tools:
             request_data["tools"] = request.tools
         
-        self.logger.info(f"Creating session with model: {request.model}")
-        self.logger.info(f"Request URL: {url}")
-        self.logger.info(f"Request params: {params}")
-        self.logger.info(f"Request data: {json.dumps(request_data, ensure_ascii=False)}")
+        self.logger.info("Creating session with model: %s", request.model)
+        # リクエスト本文（instructions 等）は大きくなり得るため DEBUG でのみ出力
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Request URL: %s, params: %s", url, params)
+            self.logger.debug("Request data: %s", json.dumps(request_data, ensure_ascii=False))
         
-        try:
-            # 新しいコネクターを毎回作成して接続問題を回避
-            connector = aiohttp.TCPConnector(
-                limit=10,
-                limit_per_host=5,
-                enable_cleanup_closed=True
-            )
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            try:
+                self.circuit_breaker.before_call()
+            except CircuitBreakerOpenError as e:
+                self.logger.warning(f"Azure OpenAI circuit open, failing fast (retry after {e.retry_after:.0f}s)")
+                raise AzureOpenAIException(
+                    str(e),
+                    status_code=503,
+                    error_code=CIRCUIT_OPEN_ERROR_CODE,
+                    retry_after=e.retry_after
+                )
             
-            async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=self.timeout
-            ) as session:
-                async with session.post(
-                    url,
-                    headers=headers,
-                    params=params,
-                    json=request_data
-                ) as response:
-                    response_data = await self._handle_response(response)
-                    
-                    self.logger.info(f"Session created successfully: {response_data.get('id')}")
-                    return AzureSessionResponse(**response_data)
+            try:
+                result = await self._post_session(url, headers, params, request_data)
+            except AzureOpenAIException as e:
+                if self._is_outage(e):
+                    self.circuit_breaker.record_failure()
+                else:
+                    # 4xx はサービスが応答している（障害ではない）
+                    self.circuit_breaker.record_success()
+                
+                delay = self.retry_policy.next_delay(attempt, e.status_code, e.retry_after)
+                if delay is None or not self.retry_budget.try_acquire():
+                    raise
+                attempt += 1
+                self._retries += 1
+                self.logger.warning(
+                    f"Retrying session creation in {delay:.2f}s "
+                    f"(attempt {attempt}/{self.retry_policy.max_retries}, status={e.status_code})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            
+            self.circuit_breaker.record_success()
+            return result
+    
+    @staticmethod
+    def _is_outage(error: AzureOpenAIException) -> bool:
+        """サーキットブレーカーの失敗として数えるエラーか（接続エラー・タイムアウト・5xx）"""
+        return error.status_code is None or error.status_code >= 500
+    
+    async def _post_session(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        params: Dict[str, str],
+        request_data: Dict[str, Any]
+    ) -> AzureSessionResponse:
+        """セッション作成リクエストを1回送信"""
+        try:
+            session = await self._get_session()
+            async with session.post(
+                url,
+                headers=headers,
+                params=params,
+                json=request_data
+            ) as response:
+                response_data = await self._handle_response(response)
+                
+                self.logger.info("Session created successfully: %s", response_data.get('id'))
+                return AzureSessionResponse(**response_data)
                     
         except aiohttp.ClientError as e:
             error_msg = f"Azure OpenAI connection error: {str(e)}"
@@ -160,6 +352,47 @@ class AzureOpenAIClient(IAzureOpenAIClient):
             self.logger.error(error_msg)
             raise AzureOpenAIException(error_msg)
     
+    async def proxy_webrtc_sdp(self, model: str, ephemeral_key: str, sdp_offer: str) -> str:
+        """SDP Offer を送信して Answer を取得する
+        
+        セッション作成と同じ接続プールを使用します。Offer には有効期限の短い
+        ICE 候補が含まれるため、リトライは行いません。
+        """
+        headers = {
+            "Authorization": f"Bearer {ephemeral_key}",
+            "Content-Type": "application/sdp"
+        }
+        params = {"model": model}
+        
+        self.logger.info("Exchanging WebRTC SDP for model: %s", model)
+        try:
+            session = await self._get_session()
+            async with session.post(
+                self.webrtc_url,
+                headers=headers,
+                params=params,
+                data=sdp_offer.encode("utf-8")
+            ) as response:
+                response_text = await response.text()
+                if 200 <= response.status < 300:
+                    return response_text
+                
+                self.logger.error(f"Azure OpenAI SDP exchange error: {response.status} - {response_text}")
+                raise AzureOpenAIException(
+                    response_text or f"SDP exchange failed with status {response.status}",
+                    status_code=response.status,
+                    retry_after=parse_retry_after(response.headers)
+                )
+        
+        except aiohttp.ClientError as e:
+            error_msg = f"Azure OpenAI connection error: {str(e)}"
+            self.logger.error(error_msg)
+            raise AzureOpenAIException(error_msg)
+        except asyncio.TimeoutError:
+            error_msg = "Azure OpenAI request timeout"
+            self.logger.error(error_msg)
+            raise AzureOpenAIException(error_msg)
+    
     async def health_check(self) -> Dict[str, Any]:
         """Azure OpenAI APIの接続確認"""
         try:
@@ -168,23 +401,29 @@ class AzureOpenAIClient(IAzureOpenAIClient):
             headers = {"api-key": self.api_key}
             params = {"api-version": self.api_version}
             
-            async with aiohttp.ClientSession(
-                connector=self.connector,
+            session = await self._get_session()
+            async with session.get(
+                url,
+                headers=headers,
+                params=params,
                 timeout=aiohttp.ClientTimeout(total=10.0)  # ヘルスチェックは短いタイムアウト
-            ) as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "healthy",
-                            "azure_openai": "connected",
-                            "endpoint": self.endpoint
-                        }
-                    else:
-                        return {
-                            "status": "unhealthy",
-                            "azure_openai": f"error_{response.status}",
-                            "endpoint": self.endpoint
-                        }
+            ) as response:
+                if response.status == 200:
+                    return {
+                        "status": "healthy",
+                        "azure_openai": "connected",
+                        "endpoint": self.endpoint,
+                        "connection_pool": self.pool_stats,
+                        "resilience": self.resilience_stats
+                    }
+                else:
+                    return {
+                        "status": "unhealthy",
+                        "azure_openai": f"error_{response.status}",
+                        "endpoint": self.endpoint,
+                        "connection_pool": self.pool_stats,
+                        "resilience": self.resilience_stats
+                    }
         except Exception as e:
             self.logger.error(f"Azure OpenAI health check failed: {str(e)}")
             return {
@@ -215,7 +454,12 @@ class AzureOpenAIClient(IAzureOpenAIClient):
                 error_code = None
             
             self.logger.error(f"Azure OpenAI API error: {response.status} - {error_msg}")
-            raise AzureOpenAIException(error_msg, status_code=response.status, error_code=error_code)
+            raise AzureOpenAIException(
+                error_msg,
+                status_code=response.status,
+                error_code=error_code,
+                retry_after=parse_retry_after(response.headers)
+            )
     
     def _get_default_tools(self) -> list:
         """デフォルトのツール設定を取得"""
@@ -253,9 +497,9 @@ class AzureOpenAIClient(IAzureOpenAIClient):
     
     async def __aenter__(self):
         """非同期コンテキストマネージャー入口"""
+        await self.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """非同期コンテキストマネージャー出口"""
-        if self._connector:
-            await self._connector.close()
+        await self.close()
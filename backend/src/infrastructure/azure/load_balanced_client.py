@@ -0,0 +1,240 @@
+"""
+複数の Azure OpenAI エンドポイントへの負荷分散クライアント
+"""
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from application.dto.azure_dto import AzureSessionRequest, AzureSessionResponse
+from infrastructure.azure.azure_openai_client import (
+    CIRCUIT_OPEN_ERROR_CODE,
+    AzureOpenAIException,
+    IAzureOpenAIClient
+)
+from shared.utils.logging import get_logger
+
+ROUTING_WEIGHTED = "weighted"
+ROUTING_LEAST_LATENCY = "least_latency"
+
+# 観測値の指数移動平均の重み
+EWMA_ALPHA = 0.3
+
+# SDP 交換の送信先を決めるために保持するエフェメラルキーの件数
+MAX_TRACKED_EPHEMERAL_KEYS = 4096
+
+
+@dataclass
+class AzureOpenAIBackend:
+    """負荷分散先のエンドポイント"""
+    name: str
+    client: IAzureOpenAIClient
+    weight: float = 1.0
+    region: Optional[str] = None
+    latency_ewma: Optional[float] = None
+    error_ewma: float = 0.0
+    cooldown_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    
+    def observe_success(self, latency: float) -> None:
+        """成功したリクエストのレイテンシを記録"""
+        self.requests += 1
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency_ewma
+        self.error_ewma *= (1 - EWMA_ALPHA)
+    
+    def observe_failure(self) -> None:
+        """失敗したリクエストを記録"""
+        self.requests += 1
+        self.failures += 1
+        self.error_ewma = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_ewma
+
+
+class LoadBalancedAzureOpenAIClient(IAzureOpenAIClient):
+    """複数エンドポイントに負荷分散する Azure OpenAI クライアント
+    
+    重み付きランダム、または観測レイテンシが最小のエンドポイントにルーティングします。
+    429・5xx・接続エラー・認証エラーが返ったエンドポイントは一定時間（429 の場合は
+    Retry-After の間）ルーティング対象から外し、同じリクエストを次のエンドポイントで
+    再試行します（フェイルオーバー）。リクエスト内容の誤り（400 等）はそのまま返します。
+    
+    エフェメラルキーは発行したリソースでしか使えないため、SDP 交換はキーを発行した
+    エンドポイントに送信します（発行元が不明な場合は 401 を返さないエンドポイントを探します）。
+    """
+    
+    def __init__(
+        self,
+        backends: List[AzureOpenAIBackend],
+        routing: str = ROUTING_WEIGHTED,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random
+    ):
+        """初期化
+        
+        Args:
+            backends: 負荷分散先のエンドポイント
+            routing: ルーティング方式（weighted / least_latency）
+            cooldown_seconds: 障害が観測されたエンドポイントを除外する秒数
+            clock: 現在時刻を返す関数
+            rng: [0, 1) の乱数を返す関数
+        """
+        if not backends:
+            raise ValueError("At least one Azure OpenAI endpoint is required")
+        if routing not in (ROUTING_WEIGHTED, ROUTING_LEAST_LATENCY):
+            raise ValueError(f"Unknown routing strategy: {routing}")
+        self.backends = backends
+        self.routing = routing
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._rng = rng
+        self._key_owners: "OrderedDict[str, AzureOpenAIBackend]" = OrderedDict()
+        self.logger = get_logger("azure_openai_load_balancer")
+    
+    @staticmethod
+    def _is_failover_error(error: AzureOpenAIException) -> bool:
+        """別のエンドポイントで再試行すべきエラーか"""
+        status = error.status_code
+        return status is None or status in (401, 403, 408, 429) or status >= 500
+    
+    def _order_backends(self) -> List[AzureOpenAIBackend]:
+        """試行順にエンドポイントを並べる（除外中のエンドポイントは最後）"""
+        now = self._clock()
+        available = [backend for backend in self.backends if backend.cooldown_until <= now]
+        cooling = sorted(
+            (backend for backend in self.backends if backend.cooldown_until > now),
+            key=lambda backend: backend.cooldown_until
+        )
+        
+        if self.routing == ROUTING_LEAST_LATENCY:
+            # 未計測のエンドポイントは優先して計測する
+            ordered = sorted(
+                available,
+                key=lambda backend: (backend.latency_ewma or 0.0) * (1 + 4 * backend.error_ewma)
+            )
+        else:
+            # 重み付きランダムで順序を決める（直近のエラー率に応じて重みを下げる）
+            ordered = []
+            candidates = list(available)
+            while candidates:
+                weights = [max(backend.weight * (1 - backend.error_ewma), 1e-6) for backend in candidates]
+                point = self._rng() * sum(weights)
+                for index, weight in enumerate(weights):
+                    point -= weight
+                    if point < 0 or index == len(weights) - 1:
+                        ordered.append(candidates.pop(index))
+                        break
+        
+        return ordered + cooling
+    
+    async def create_session(self, request: AzureSessionRequest) -> AzureSessionResponse:
+        """セッションを作成する（障害時は次のエンドポイントにフェイルオーバー）"""
+        last_error: Optional[AzureOpenAIException] = None
+        for backend in self._order_backends():
+            started_at = self._clock()
+            try:
+                response = await backend.client.create_session(request)
+            except AzureOpenAIException as e:
+                if not self._is_failover_error(e):
+                    raise
+                if e.error_code != CIRCUIT_OPEN_ERROR_CODE:
+                    backend.observe_failure()
+                cooldown = e.retry_after if e.retry_after is not None else self.cooldown_seconds
+                backend.cooldown_until = self._clock() + cooldown
+                last_error = e
+                self.logger.warning(
+                    f"Azure OpenAI endpoint {backend.name} failed (status={e.status_code}), "
+                    f"excluding for {cooldown:.0f}s and failing over"
+                )
+                continue
+            
+            backend.observe_success(self._clock() - started_at)
+            backend.cooldown_until = 0.0
+            self._remember_key_owner(response, backend)
+            return response
+        
+        raise last_error
+    
+    def _remember_key_owner(self, response: AzureSessionResponse, backend: AzureOpenAIBackend) -> None:
+        """発行されたエフェメラルキーとエンドポイントの対応を記録"""
+        ephemeral_key = (response.client_secret or {}).get("value")
+        if ephemeral_key:
+            self._remember_ephemeral_key(ephemeral_key, backend)
+    
+    def _remember_ephemeral_key(self, ephemeral_key: str, backend: AzureOpenAIBackend) -> None:
+        self._key_owners[ephemeral_key] = backend
+        self._key_owners.move_to_end(ephemeral_key)
+        while len(self._key_owners) > MAX_TRACKED_EPHEMERAL_KEYS:
+            self._key_owners.popitem(last=False)
+    
+    async def proxy_webrtc_sdp(self, model: str, ephemeral_key: str, sdp_offer: str) -> str:
+        """SDP 交換をキーを発行したエンドポイントに送信
+        
+        発行元が不明なキー（別のワーカーが発行した場合など）はルーティング順に送信し、
+        キーを受け付けない（401）エンドポイントの場合は次のエンドポイントで再試行します。
+        受け付けたエンドポイントは発行元として記録します。
+        """
+        owner = self._key_owners.get(ephemeral_key)
+        if owner is not None:
+            return await owner.client.proxy_webrtc_sdp(model, ephemeral_key, sdp_offer)
+        
+        last_error: Optional[AzureOpenAIException] = None
+        for backend in self._order_backends():
+            try:
+                answer = await backend.client.proxy_webrtc_sdp(model, ephemeral_key, sdp_offer)
+            except AzureOpenAIException as e:
+                if e.status_code != 401:
+                    raise
+                # 別のリソースが発行したキー: エンドポイントの障害ではないため除外しない
+                last_error = e
+                continue
+            self._remember_ephemeral_key(ephemeral_key, backend)
+            return answer
+        
+        raise last_error
+    
+    @property
+    def backend_stats(self) -> List[Dict[str, Any]]:
+        """エンドポイントごとの状態"""
+        now = self._clock()
+        return [
+            {
+                "name": backend.name,
+                "region": backend.region,
+                "weight": backend.weight,
+                "available": backend.cooldown_until <= now,
+                "cooldown_remaining": round(max(0.0, backend.cooldown_until - now), 1),
+                "latency_ewma_ms": round(backend.latency_ewma * 1000, 1) if backend.latency_ewma is not None else None,
+                "error_rate_ewma": round(backend.error_ewma, 3),
+                "requests": backend.requests,
+                "failures": backend.failures
+            }
+            for backend in self.backends
+        ]
+    
+    async def health_check(self) -> Dict[str, Any]:
+        """全エンドポイントの接続確認（1つでも正常なら healthy）"""
+        results = await asyncio.gather(*[backend.client.health_check() for backend in self.backends])
+        endpoints = {backend.name: result for backend, result in zip(self.backends, results)}
+        healthy = [name for name, result in endpoints.items() if result.get("status") == "healthy"]
+        return {
+            "status": "healthy" if healthy else "unhealthy",
+            "azure_openai": f"{len(healthy)}/{len(self.backends)} endpoints healthy",
+            "routing": self.routing,
+            "backends": self.backend_stats,
+            "endpoints": endpoints
+        }
+    
+    async def start(self) -> None:
+        """全エンドポイントの接続プールを開始"""
+        for backend in self.backends:
+            await backend.client.start()
+    
+    async def close(self) -> None:
+        """全エンドポイントの接続プールを閉じる"""
+        for backend in self.backends:
+            await backend.client.close()
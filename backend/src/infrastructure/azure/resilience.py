@@ -0,0 +1,252 @@
+"""
+Azure OpenAI 呼び出しのリトライ・サーキットブレーカー
+"""
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Mapping, Optional
+
+
+class CircuitBreakerOpenError(Exception):
+    """サーキットブレーカーが開いているため呼び出しを行わなかった場合のエラー"""
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers: Mapping[str, str], clock: Callable[[], float] = time.time) -> Optional[float]:
+    """Retry-After / retry-after-ms ヘッダーから待機秒数を取得
+    
+    Args:
+        headers: レスポンスヘッダー
+        clock: 現在時刻（UNIX秒）を返す関数（HTTP日付形式の解釈に使用）
+    
+    Returns:
+        待機秒数（ヘッダーがない・解釈できない場合はNone）
+    """
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+    
+    retry_after = headers.get("Retry-After") or headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - clock())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """フルジッター指数バックオフのリトライポリシー
+    
+    待機時間は [0, min(max_delay, base_delay * 2^attempt)] の一様乱数です。
+    サーバーが Retry-After を返した場合はその時間以上待機し、max_retry_after を
+    超える場合はリトライせずに呼び出し元へ返します（クライアントが判断できるように）。
+    """
+    
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_retry_after: float = 10.0,
+        rng: Callable[[], float] = random.random
+    ):
+        """初期化
+        
+        Args:
+            max_retries: 最大リトライ回数
+            base_delay: バックオフの基準秒数
+            max_delay: バックオフの上限秒数
+            max_retry_after: リトライする Retry-After の上限秒数
+            rng: [0, 1) の乱数を返す関数
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self._rng = rng
+    
+    @staticmethod
+    def is_retryable_status(status_code: Optional[int]) -> bool:
+        """リトライ対象のステータスか（None は接続エラー・タイムアウト）"""
+        return status_code is None or status_code in (408, 429) or 500 <= status_code < 600
+    
+    def next_delay(self, attempt: int, status_code: Optional[int], retry_after: Optional[float] = None) -> Optional[float]:
+        """次のリトライまでの待機秒数
+        
+        Args:
+            attempt: これまでのリトライ回数
+            status_code: 失敗したレスポンスのステータス（接続エラーはNone）
+            retry_after: サーバーが指定した待機秒数
+        
+        Returns:
+            待機秒数（リトライしない場合はNone）
+        """
+        if attempt >= self.max_retries or not self.is_retryable_status(status_code):
+            return None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        
+        backoff = self._rng() * min(self.max_delay, self.base_delay * (2 ** attempt))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class RetryBudget:
+    """リトライ量の上限（リトライによる負荷増幅を防ぐ）
+    
+    直近 window_seconds 秒のリクエスト数に対して ratio の割合、
+    および毎秒 min_retries_per_second 回までのリトライを許可します。
+    障害時に全リクエストがリトライして負荷が数倍になることを防ぎます。
+    """
+    
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        window_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """初期化
+        
+        Args:
+            ratio: リクエスト数に対するリトライ数の上限割合
+            min_retries_per_second: リクエストが少ない場合でも許可する毎秒のリトライ数
+            window_seconds: 集計期間
+            clock: 現在時刻を返す関数
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+    
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+    
+    def record_request(self) -> None:
+        """最初の試行を記録"""
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            self._requests.append(now)
+    
+    def try_acquire(self) -> bool:
+        """リトライを1回行えるか判定し、行える場合は記録"""
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            allowed = self.min_retries_per_second * self.window_seconds + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+
+class CircuitBreaker:
+    """サーキットブレーカー
+    
+    連続して failure_threshold 回失敗すると開き（open）、recovery_timeout 秒間は
+    呼び出しを行わずに即座に失敗させます。経過後は1件だけ試行を許可し（half-open）、
+    成功すれば閉じ（closed）、失敗すれば再び開きます。
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """初期化
+        
+        Args:
+            failure_threshold: 開くまでの連続失敗回数
+            recovery_timeout: 開いてから試行を再開するまでの秒数
+            clock: 現在時刻を返す関数
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+        self.rejected = 0
+    
+    @property
+    def state(self) -> str:
+        """現在の状態"""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+    
+    def before_call(self) -> None:
+        """呼び出し前の判定
+        
+        Raises:
+            CircuitBreakerOpenError: 開いている場合、または half-open で試行中の場合
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            
+            remaining = self.recovery_timeout - (self._clock() - self._opened_at)
+            if self._state == self.OPEN and remaining <= 0:
+                self._state = self.HALF_OPEN
+            
+            if self._state == self.HALF_OPEN:
+                # 試行が結果を記録せずに終わった場合（キャンセル等）に備え、一定時間で再試行を許可
+                probe_stale = self._clock() - self._probe_started_at >= self.recovery_timeout
+                if not self._probe_in_flight or probe_stale:
+                    self._probe_in_flight = True
+                    self._probe_started_at = self._clock()
+                    return
+                remaining = self.recovery_timeout - (self._clock() - self._probe_started_at)
+            
+            self.rejected += 1
+            raise CircuitBreakerOpenError(
+                "Azure OpenAI circuit breaker is open",
+                retry_after=max(1.0, remaining)
+            )
+    
+    def record_success(self) -> None:
+        """成功を記録（閉じる）"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """失敗を記録（しきい値に達するか half-open の試行が失敗すると開く）"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
@@ -1,28 +1,157 @@
 """
 依存性注入設定
 """
+import asyncio
+import json
 import os
+import threading
 from typing import Optional
 from application.interfaces.azure_proxy_service import IAzureProxyService
 from application.services.azure_proxy_service import AzureProxyService
+from application.services.session_warm_pool import SessionWarmPool
+from application.services.session_rate_limiter import SessionRateLimiter
+from application.services.upload_deduplicator import UploadDeduplicator
+from application.interfaces.rate_limit_store import IRateLimitStore, TokenBucketRule
 from infrastructure.azure.azure_openai_client import IAzureOpenAIClient, AzureOpenAIClient
+from infrastructure.azure.load_balanced_client import (
+    ROUTING_WEIGHTED,
+    AzureOpenAIBackend,
+    LoadBalancedAzureOpenAIClient
+)
+from infrastructure.azure.resilience import CircuitBreaker, RetryBudget, RetryPolicy
+from infrastructure.rate_limit.token_bucket_store import InMemoryRateLimitStore, SqliteRateLimitStore
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient, shutdown_blocking_executor
+from infrastructure.storage.audio_metadata_index import AudioMetadataIndex
+from infrastructure.audio.transcoding_pool import shutdown_transcoding_pool
 from shared.utils.logging import get_logger
 
 logger = get_logger("dependency_injection")
 
+# 既定のデータディレクトリ（backend/data。起動時のカレントディレクトリには依存しない）
+DEFAULT_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "data"
+)
+
+
+def _data_file_path(env_name: str, filename: str) -> str:
+    """SQLite 等のデータファイルのパス
+    
+    環境変数で指定されていればその値、未指定の場合は APP_DATA_DIR（既定は backend/data）
+    配下の filename を返します。
+    """
+    path = os.getenv(env_name)
+    if path:
+        return path
+    return os.path.join(os.getenv("APP_DATA_DIR") or DEFAULT_DATA_DIR, filename)
+
+
+def _create_single_azure_openai_client(
+    endpoint: str,
+    api_key: str,
+    api_version: str,
+    max_retries: int,
+    webrtc_url: Optional[str] = None
+) -> AzureOpenAIClient:
+    """1つのエンドポイントに接続する Azure OpenAI クライアントを作成"""
+    return AzureOpenAIClient(
+        endpoint=endpoint,
+        api_key=api_key,
+        api_version=api_version,
+        timeout=float(os.getenv("AZURE_OPENAI_TIMEOUT", "30.0")),
+        max_retries=max_retries,
+        pool_limit=int(os.getenv("AZURE_OPENAI_POOL_LIMIT", "100")),
+        pool_limit_per_host=int(os.getenv("AZURE_OPENAI_POOL_LIMIT_PER_HOST", "30")),
+        keepalive_timeout=float(os.getenv("AZURE_OPENAI_KEEPALIVE_TIMEOUT", "30.0")),
+        webrtc_url=webrtc_url,
+        retry_policy=RetryPolicy(
+            max_retries=max_retries,
+            base_delay=float(os.getenv("AZURE_OPENAI_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("AZURE_OPENAI_RETRY_MAX_DELAY", "8.0")),
+            max_retry_after=float(os.getenv("AZURE_OPENAI_RETRY_MAX_RETRY_AFTER", "10.0"))
+        ),
+        retry_budget=RetryBudget(
+            ratio=float(os.getenv("AZURE_OPENAI_RETRY_BUDGET_RATIO", "0.2")),
+            min_retries_per_second=float(os.getenv("AZURE_OPENAI_RETRY_BUDGET_MIN_PER_SECOND", "1.0"))
+        ),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("AZURE_OPENAI_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            recovery_timeout=float(os.getenv("AZURE_OPENAI_CIRCUIT_RECOVERY_SECONDS", "30"))
+        )
+    )
+
+
+def create_load_balanced_azure_openai_client(endpoints_json: str, api_version: str) -> LoadBalancedAzureOpenAIClient:
+    """複数エンドポイントに負荷分散する Azure OpenAI クライアントを作成
+    
+    Args:
+        endpoints_json: エンドポイント一覧のJSON
+            （例: [{"endpoint": "https://...", "api_key": "...", "region": "japaneast", "weight": 2}]、
+            SDP 交換のURLが異なる場合は webrtc_url も指定）
+        api_version: 既定の API バージョン（エンドポイントごとに api_version で上書き可能）
+    
+    Returns:
+        負荷分散クライアント
+    
+    Raises:
+        ValueError: JSONが不正、または endpoint / api_key がない場合
+    """
+    try:
+        entries = json.loads(endpoints_json)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"AZURE_OPENAI_ENDPOINTS is not valid JSON: {e}")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("AZURE_OPENAI_ENDPOINTS must be a non-empty JSON array")
+    
+    # 失敗時は別のエンドポイントへフェイルオーバーするため、エンドポイント内のリトライは抑える
+    max_retries = int(os.getenv("AZURE_OPENAI_ENDPOINT_MAX_RETRIES", "0"))
+    backends = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get("endpoint") or not entry.get("api_key"):
+            raise ValueError(f"AZURE_OPENAI_ENDPOINTS[{index}] requires endpoint and api_key")
+        backends.append(AzureOpenAIBackend(
+            name=entry.get("name") or entry["endpoint"],
+            client=_create_single_azure_openai_client(
+                endpoint=entry["endpoint"],
+                api_key=entry["api_key"],
+                api_version=entry.get("api_version", api_version),
+                max_retries=max_retries,
+                webrtc_url=entry.get("webrtc_url")
+            ),
+            weight=float(entry.get("weight", 1.0)),
+            region=entry.get("region")
+        ))
+    
+    routing = os.getenv("AZURE_OPENAI_ROUTING", ROUTING_WEIGHTED)
+    logger.info(f"Creating load balanced Azure OpenAI client for {len(backends)} endpoints (routing={routing})")
+    
+    return LoadBalancedAzureOpenAIClient(
+        backends,
+        routing=routing,
+        cooldown_seconds=float(os.getenv("AZURE_OPENAI_FAILOVER_COOLDOWN_SECONDS", "30"))
+    )
+
 
 def create_azure_openai_client() -> IAzureOpenAIClient:
     """Azure OpenAI クライアントを作成
     
+    AZURE_OPENAI_ENDPOINTS が設定されている場合は複数エンドポイントに負荷分散する
+    クライアントを、それ以外は AZURE_OPENAI_ENDPOINT に接続するクライアントを作成します。
+    
     Returns:
         設定されたAzure OpenAI クライアント
         
     Raises:
         ValueError: 必要な環境変数が設定されていない場合
     """
+    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-01-preview")
+    
+    endpoints_json = os.getenv("AZURE_OPENAI_ENDPOINTS")
+    if endpoints_json:
+        return create_load_balanced_azure_openai_client(endpoints_json, api_version)
+    
     endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
     api_key = os.getenv("AZURE_OPENAI_API_KEY")
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-01-preview")
     
     if not endpoint:
         raise ValueError("AZURE_OPENAI_ENDPOINT environment variable is required")
@@ -31,33 +160,82 @@ def create_azure_openai_client() -> IAzureOpenAIClient:
     
     logger.info(f"Creating Azure OpenAI client for endpoint: {endpoint}")
     
-    return AzureOpenAIClient(
+    return _create_single_azure_openai_client(
         endpoint=endpoint,
         api_key=api_key,
         api_version=api_version,
-        timeout=float(os.getenv("AZURE_OPENAI_TIMEOUT", "30.0")),
-        max_retries=int(os.getenv("AZURE_OPENAI_MAX_RETRIES", "3"))
+        max_retries=int(os.getenv("AZURE_OPENAI_MAX_RETRIES", "3")),
+        webrtc_url=os.getenv("AZURE_OPENAI_WEBRTC_URL")
     )
 
 
+def create_session_warm_pool(azure_client: IAzureOpenAIClient) -> Optional[SessionWarmPool]:
+    """セッション事前作成プールを作成
+    
+    SESSION_POOL_ENABLED が true の場合のみ作成します。
+    
+    Args:
+        azure_client: Azure OpenAI クライアント
+        
+    Returns:
+        セッション事前作成プール（無効時はNone）
+    """
+    if os.getenv("SESSION_POOL_ENABLED", "false").lower() != "true":
+        return None
+    
+    pool = SessionWarmPool(
+        azure_client,
+        pool_size=int(os.getenv("SESSION_POOL_SIZE", "2")),
+        expiry_margin_seconds=float(os.getenv("SESSION_POOL_EXPIRY_MARGIN_SECONDS", "15")),
+        keep_warm_seconds=float(os.getenv("SESSION_POOL_KEEP_WARM_SECONDS", "300")),
+        max_keys=int(os.getenv("SESSION_POOL_MAX_KEYS", "16"))
+    )
+    logger.info(f"Session warm pool enabled (pool_size={pool.pool_size})")
+    return pool
+
+
 def create_azure_proxy_service(azure_client: Optional[IAzureOpenAIClient] = None) -> IAzureProxyService:
     """Azure プロキシサービスを作成
     
     Args:
-        azure_client: Azure OpenAI クライアント（省略時は自動作成）
+        azure_client: Azure OpenAI クライアント（省略時は共有インスタンスを使用）
         
     Returns:
         設定されたAzure プロキシサービス
     """
     if azure_client is None:
-        azure_client = create_azure_openai_client()
+        azure_client = get_azure_openai_client()
     
     logger.info("Creating Azure proxy service")
-    return AzureProxyService(azure_client)
+    return AzureProxyService(azure_client, session_pool=create_session_warm_pool(azure_client))
 
 
 # グローバルインスタンス（シングルトン）
+_azure_openai_client: Optional[IAzureOpenAIClient] = None
 _azure_proxy_service: Optional[IAzureProxyService] = None
+_audio_blob_storage_client: Optional[AudioBlobStorageClient] = None
+_audio_blob_storage_client_lock = threading.Lock()
+_upload_deduplicator: Optional[UploadDeduplicator] = None
+_audio_metadata_index: Optional[AudioMetadataIndex] = None
+_audio_metadata_index_lock = threading.Lock()
+_session_rate_limiter: Optional[SessionRateLimiter] = None
+
+
+def get_azure_openai_client() -> IAzureOpenAIClient:
+    """Azure OpenAI クライアントのシングルトンインスタンスを取得
+    
+    接続プールをプロセス全体で共有するため、クライアントは一度だけ作成します。
+    
+    Returns:
+        Azure OpenAI クライアント
+    """
+    global _azure_openai_client
+    
+    if _azure_openai_client is None:
+        _azure_openai_client = create_azure_openai_client()
+        logger.info("Azure OpenAI client singleton created")
+    
+    return _azure_openai_client
 
 
 def get_azure_proxy_service() -> IAzureProxyService:
@@ -75,8 +253,215 @@ def get_azure_proxy_service() -> IAzureProxyService:
     return _azure_proxy_service
 
 
+def get_audio_blob_storage_client() -> AudioBlobStorageClient:
+    """音声Blob Storageクライアントのシングルトンインスタンスを取得
+    
+    BlobServiceClient の接続プールとコンテナ存在確認の結果を共有するため、
+    クライアントは一度だけ作成します。同期の依存関係はスレッドプールで
+    解決されるため、ロックで二重作成を防ぎます。
+    
+    Returns:
+        音声Blob Storageクライアント
+    
+    Raises:
+        ValueError: 必要な環境変数が設定されていない場合
+    """
+    global _audio_blob_storage_client
+    
+    if _audio_blob_storage_client is None:
+        with _audio_blob_storage_client_lock:
+            if _audio_blob_storage_client is None:
+                _audio_blob_storage_client = AudioBlobStorageClient()
+                logger.info("Audio blob storage client singleton created")
+    
+    return _audio_blob_storage_client
+
+
+def get_upload_deduplicator() -> Optional[UploadDeduplicator]:
+    """音声アップロード重複排除のシングルトンインスタンスを取得
+    
+    UPLOAD_DEDUP_ENABLED が false の場合は None を返します。
+    
+    Returns:
+        重複排除（無効時はNone）
+    """
+    global _upload_deduplicator
+    
+    if os.getenv("UPLOAD_DEDUP_ENABLED", "true").lower() != "true":
+        return None
+    
+    if _upload_deduplicator is None:
+        _upload_deduplicator = UploadDeduplicator(
+            max_entries=int(os.getenv("UPLOAD_DEDUP_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("UPLOAD_DEDUP_TTL_SECONDS", "3600"))
+        )
+        logger.info("Upload deduplicator singleton created")
+    
+    return _upload_deduplicator
+
+
+def get_audio_metadata_index() -> Optional[AudioMetadataIndex]:
+    """音声メタデータインデックスのシングルトンインスタンスを取得
+    
+    AUDIO_INDEX_ENABLED が false の場合は None を返します。
+    
+    Returns:
+        音声メタデータインデックス（無効時はNone）
+    """
+    global _audio_metadata_index
+    
+    if os.getenv("AUDIO_INDEX_ENABLED", "true").lower() != "true":
+        return None
+    
+    if _audio_metadata_index is None:
+        with _audio_metadata_index_lock:
+            if _audio_metadata_index is None:
+                _audio_metadata_index = AudioMetadataIndex(
+                    _data_file_path("AUDIO_INDEX_DB_PATH", "audio_index.db")
+                )
+                logger.info("Audio metadata index singleton created")
+    
+    return _audio_metadata_index
+
+
+def _token_bucket_rule(per_second: float, burst: float) -> Optional[TokenBucketRule]:
+    """毎秒のリクエスト数が0以下の場合は制限なし"""
+    if per_second <= 0:
+        return None
+    return TokenBucketRule(rate=per_second, burst=max(1.0, burst))
+
+
+def create_rate_limit_store() -> IRateLimitStore:
+    """レート制限の状態ストアを作成
+    
+    RATE_LIMIT_BACKEND が sqlite の場合は複数ワーカーで状態を共有するストアを作成します。
+    
+    Returns:
+        レート制限の状態ストア
+    
+    Raises:
+        ValueError: 不明なバックエンドが指定された場合
+    """
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "memory":
+        return InMemoryRateLimitStore()
+    if backend == "sqlite":
+        return SqliteRateLimitStore(_data_file_path("RATE_LIMIT_DB_PATH", "rate_limit.db"))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+def get_session_rate_limiter() -> Optional[SessionRateLimiter]:
+    """セッション作成のレート制限のシングルトンインスタンスを取得
+    
+    RATE_LIMIT_ENABLED が false の場合は None を返します。
+    
+    Returns:
+        レート制限（無効時はNone）
+    
+    Raises:
+        ValueError: RATE_LIMIT_MODEL_LIMITS または RATE_LIMIT_TRUSTED_CLIENT_ID_SOURCES が不正な場合
+    """
+    global _session_rate_limiter
+    
+    if os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "true":
+        return None
+    
+    if _session_rate_limiter is None:
+        model_rules = {}
+        model_limits = os.getenv("RATE_LIMIT_MODEL_LIMITS")
+        if model_limits:
+            try:
+                for model, limit in json.loads(model_limits).items():
+                    rule = _token_bucket_rule(float(limit["per_second"]), float(limit.get("burst", 1)))
+                    if rule is not None:
+                        model_rules[model] = rule
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"RATE_LIMIT_MODEL_LIMITS is invalid: {e}")
+        
+        _session_rate_limiter = SessionRateLimiter(
+            store=create_rate_limit_store(),
+            client_rule=_token_bucket_rule(
+                float(os.getenv("RATE_LIMIT_CLIENT_PER_SECOND", "1.0")),
+                float(os.getenv("RATE_LIMIT_CLIENT_BURST", "10"))
+            ),
+            global_rule=_token_bucket_rule(
+                float(os.getenv("RATE_LIMIT_GLOBAL_PER_SECOND", "0")),
+                float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "20"))
+            ),
+            model_rules=model_rules,
+            max_wait_seconds=float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "2.0")),
+            max_waiters=int(os.getenv("RATE_LIMIT_MAX_WAITERS", "100")),
+            trusted_client_id_sources=os.getenv("RATE_LIMIT_TRUSTED_CLIENT_ID_SOURCES", "").split(",")
+        )
+        logger.info("Session rate limiter singleton created")
+    
+    return _session_rate_limiter
+
+
+async def startup_dependencies() -> None:
+    """アプリケーション起動時に共有リソースを初期化
+    
+    Azure OpenAI の接続プールを開始し、Blob Storage クライアントを作成して
+    コンテナの存在を確認しておきます。メタデータインデックスやレート制限のストアも
+    ここで作成し、各ワーカーが初期化を終えてから接続を受け付けるようにします。
+    環境変数が未設定の場合や接続に失敗した場合は警告のみ出力し、最初のリクエスト時に
+    改めてエラーとします。
+    """
+    try:
+        await asyncio.to_thread(get_audio_blob_storage_client)
+    except Exception as e:
+        logger.warning(f"Audio blob storage client not initialized at startup: {e}")
+    
+    # SQLite のオープン・スキーマ作成を最初のリクエストで行わないよう事前に作成
+    try:
+        await asyncio.to_thread(get_audio_metadata_index)
+        get_upload_deduplicator()
+        get_session_rate_limiter()
+    except Exception as e:
+        logger.warning(f"Upload/rate limit resources not initialized at startup: {e}")
+    
+    try:
+        azure_client = get_azure_openai_client()
+    except ValueError as e:
+        logger.warning(f"Azure OpenAI client not initialized at startup: {e}")
+        return
+    
+    await azure_client.start()
+    
+    azure_proxy_service = get_azure_proxy_service()
+    if getattr(azure_proxy_service, "session_pool", None) is not None:
+        azure_proxy_service.session_pool.start()
+
+
+async def shutdown_dependencies() -> None:
+    """アプリケーション終了時に共有リソースを解放"""
+    global _audio_metadata_index, _session_rate_limiter
+    
+    if getattr(_azure_proxy_service, "session_pool", None) is not None:
+        await _azure_proxy_service.session_pool.close()
+    if _azure_openai_client is not None:
+        await _azure_openai_client.close()
+    
+    # 実行中の変換・アップロードの完了を待ってからワーカーを停止
+    await asyncio.to_thread(shutdown_transcoding_pool, True)
+    await asyncio.to_thread(shutdown_blocking_executor, True)
+    
+    if _audio_metadata_index is not None:
+        _audio_metadata_index.close()
+        _audio_metadata_index = None
+    if _session_rate_limiter is not None:
+        _session_rate_limiter.store.close()
+        _session_rate_limiter = None
+
+
 def reset_dependencies():
     """依存関係をリセット（主にテスト用）"""
-    global _azure_proxy_service
+    global _azure_openai_client, _azure_proxy_service, _audio_blob_storage_client, _upload_deduplicator
+    global _audio_metadata_index, _session_rate_limiter
+    _azure_openai_client = None
     _azure_proxy_service = None
+    _audio_blob_storage_client = None
+    _upload_deduplicator = None
+    _audio_metadata_index = None
+    _session_rate_limiter = None
     logger.info("Dependencies reset")
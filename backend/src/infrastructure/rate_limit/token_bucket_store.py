@@ -0,0 +1,166 @@
+"""
+トークンバケットの状態ストア実装
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from application.interfaces.rate_limit_store import IRateLimitStore, TokenBucketRule
+from shared.utils.logging import get_logger
+
+logger = get_logger("rate_limit_store")
+
+# バケットの状態（残りトークン数、更新時刻）
+BucketState = Tuple[float, float]
+
+
+def _refill(state: Optional[BucketState], rule: TokenBucketRule, now: float) -> float:
+    """現在のトークン数を算出（未作成のバケットは満杯）"""
+    if state is None:
+        return rule.burst
+    tokens, updated_at = state
+    return min(rule.burst, tokens + max(0.0, now - updated_at) * rule.rate)
+
+
+def _take(
+    states: Dict[str, Optional[BucketState]],
+    buckets: List[Tuple[str, TokenBucketRule]],
+    tokens: float,
+    now: float
+) -> Tuple[float, Dict[str, float]]:
+    """全バケットから取得した後のトークン数、または待機秒数を算出"""
+    remaining = {}
+    wait = 0.0
+    for key, rule in buckets:
+        available = _refill(states.get(key), rule, now)
+        if available < tokens:
+            wait = max(wait, (tokens - available) / rule.rate)
+        remaining[key] = available - tokens
+    return wait, remaining
+
+
+def _full_at(rule: TokenBucketRule, tokens: float, now: float) -> float:
+    """バケットが満杯に戻る時刻（以降は状態を破棄してよい）"""
+    return now + (rule.burst - tokens) / rule.rate
+
+
+class InMemoryRateLimitStore(IRateLimitStore):
+    """プロセス内のトークンバケットストア
+    
+    満杯に戻ったバケットは未作成と同じ状態のため、キー数が max_keys を超えた時点で破棄します。
+    """
+    
+    def __init__(self, max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        """初期化
+        
+        Args:
+            max_keys: 保持するバケット数の目安
+            clock: 現在時刻を返す関数
+        """
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: Dict[str, BucketState] = {}
+        self._full_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def _prune(self, now: float) -> None:
+        for key in [key for key, full_at in self._full_at.items() if full_at <= now]:
+            del self._buckets[key]
+            del self._full_at[key]
+    
+    async def try_acquire(self, buckets: List[Tuple[str, TokenBucketRule]], tokens: float = 1.0) -> float:
+        with self._lock:
+            now = self._clock()
+            wait, remaining = _take(self._buckets, buckets, tokens, now)
+            if wait > 0:
+                return wait
+            for key, rule in buckets:
+                self._buckets[key] = (remaining[key], now)
+                self._full_at[key] = _full_at(rule, remaining[key], now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0.0
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    full_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_token_buckets_full_at ON token_buckets (full_at);
+"""
+
+
+class SqliteRateLimitStore(IRateLimitStore):
+    """SQLite で状態を共有するトークンバケットストア
+    
+    同じホストの複数ワーカープロセスが1つのデータベースファイルを共有し、
+    全体でレート制限を合わせます。取得は BEGIN IMMEDIATE のトランザクションで
+    直列化され、スレッドプールで実行されます。
+    """
+    
+    # 満杯に戻ったバケットを削除する間隔（取得回数）
+    PRUNE_INTERVAL = 1000
+    
+    def __init__(self, db_path: str, clock: Callable[[], float] = time.time):
+        """初期化
+        
+        Args:
+            db_path: SQLite データベースファイルのパス
+            clock: 現在時刻（UNIX秒、プロセス間で共通の時計）を返す関数
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory and db_path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._operations = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        logger.info(f"Opened rate limit store: {db_path}")
+    
+    def _try_acquire(self, buckets: List[Tuple[str, TokenBucketRule]], tokens: float) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                keys = [key for key, _ in buckets]
+                rows = self._conn.execute(
+                    f"SELECT key, tokens, updated_at FROM token_buckets WHERE key IN ({','.join('?' * len(keys))})",
+                    keys
+                ).fetchall()
+                states = {key: (row_tokens, updated_at) for key, row_tokens, updated_at in rows}
+                
+                wait, remaining = _take(states, buckets, tokens, now)
+                if wait == 0:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)",
+                        [(key, remaining[key], now, _full_at(rule, remaining[key], now)) for key, rule in buckets]
+                    )
+                    self._operations += 1
+                    if self._operations % self.PRUNE_INTERVAL == 0:
+                        self._conn.execute("DELETE FROM token_buckets WHERE full_at <= ?", (now,))
+                self._conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    async def try_acquire(self, buckets: List[Tuple[str, TokenBucketRule]], tokens: float = 1.0) -> float:
+        return await asyncio.to_thread(self._try_acquire, buckets, tokens)
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,222 +1,924 @@
 import os
+import json
 import uuid
+import base64
+import shutil
+import subprocess
+import asyncio
+import contextvars
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from datetime import datetime, timedelta
-from typing import Optional
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
-from azure.core.exceptions import AzureError
+from urllib.parse import quote, unquote, urlparse
+from typing import BinaryIO, Callable, Dict, List, Optional, TypeVar
+from azure.storage.blob import BlobBlock, BlobServiceClient, ContentSettings, generate_blob_sas, BlobSasPermissions
+from azure.core.exceptions import (
+    AzureError,
+    ClientAuthenticationError,
+    ResourceNotFoundError,
+    ServiceRequestError
+)
 import logging
+from application.dto.audio_dto import AudioAnalysis
+from infrastructure.audio.audio_analyzer import analyze_decoded_pcm
+from infrastructure.audio.container_sniffer import (
+    SNIFFED_FORMATS,
+    ContainerInfo,
+    InvalidAudioError,
+    sniff_audio_file
+)
+from infrastructure.audio.ffmpeg_pipe import FfmpegPipeResult, run_ffmpeg_pipe
+from infrastructure.audio.pcm_decoder import DecodedPcm, numpy_available, open_pcm
+from infrastructure.audio.silence_trimmer import SilenceTrimmer, TrimPlan
+from infrastructure.storage.block_uploader import BlockBlobUploader
+from shared.monitoring.metrics import metrics
+from shared.utils.ttl_cache import TTLCache
+from infrastructure.audio.transcoding_pool import (
+    TranscodingPool,
+    TranscodingTimeoutError,
+    get_transcoding_pool
+)
 import ffmpeg
 import tempfile
 import ffmpeg
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Chunk size used when copying upload streams (keeps per-request memory bounded)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Upload in 4 MiB blocks instead of buffering blobs up to 64 MiB for a single PUT
+BLOB_MAX_SINGLE_PUT_SIZE = 4 * 1024 * 1024
+BLOB_MAX_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Chunked recordings are staged as uncommitted blocks of a blob under this prefix
+STREAM_BLOB_PREFIX = "streams"
+
+# Committed recordings are downloaded for transcoding; kept in memory up to this size
+STREAM_SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+# Memoized SAS URLs are reused until this fraction of their lifetime has elapsed
+SAS_REUSE_FRACTION = 0.75
+
+# Transcoding modes: "pipe" streams through ffmpeg stdin/stdout, "file" uses temp files + ffprobe
+TRANSCODE_MODE_PIPE = "pipe"
+TRANSCODE_MODE_FILE = "file"
+
+# Storage policies: "remux" stores acceptable codecs as-is (-c:a copy) and only re-encodes
+# the rest; "transcode" always re-encodes to AAC
+STORAGE_POLICY_REMUX = "remux"
+STORAGE_POLICY_TRANSCODE = "transcode"
+
+# How an upload was turned into the stored blob (recorded in blob metadata)
+PROCESSING_PASSTHROUGH = "passthrough"
+PROCESSING_REMUX = "remux"
+PROCESSING_TRANSCODE = "transcode"
+
+# Codecs that can be copied into each remux container without re-encoding
+REMUX_CODECS = {
+    "mp4": frozenset({"aac", "opus", "mp3"}),
+    "ogg": frozenset({"opus", "vorbis", "flac"})
+}
+
+# Source formats that only carry PCM, so a copy attempt is never worthwhile
+PCM_FORMATS = frozenset({"wav"})
+
+# Re-encoding settings for the transcode path
+TRANSCODE_OUTPUT_OPTIONS = {
+    'vn': None,  # No video
+    'c:a': 'aac',  # AAC audio codec for MP4
+    'b:a': '127k',  # Audio bitrate - 127 kbps as requested
+    'ar': 32000,  # Sample rate - 32 kHz as requested
+    'ac': 1  # Mono channel as requested
+}
+
+# Removed silence ranges recorded in blob metadata (metadata is limited to 8 KB per blob)
+MAX_RECORDED_TRIM_RANGES = 32
+
+# Analysis results are stored next to the audio blob under this suffix
+ANALYSIS_SIDECAR_SUFFIX = ".analysis.json"
+
+SILENCE_REMOVED_SECONDS = metrics.counter(
+    "audio_silence_removed_seconds_total",
+    "Seconds of silence removed from uploads before storage"
+)
+TRANSCODE_SECONDS = metrics.histogram(
+    "audio_transcode_seconds",
+    "ffmpeg processing time of uploaded audio",
+    ["mode", "processing"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+BLOB_UPLOAD_SECONDS = metrics.histogram(
+    "blob_upload_seconds",
+    "Blob Storage upload time of transcoded audio",
+    ["method"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+SAS_GENERATION_SECONDS = metrics.histogram(
+    "sas_generation_seconds",
+    "SAS URL generation time",
+    ["cached"],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+)
+
+# Blocking Blob SDK and ffmpeg work runs on this bounded executor, never on the event loop
+_blocking_executor: Optional[ThreadPoolExecutor] = None
+_blocking_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared executor for blocking storage / transcoding work
+    
+    The number of concurrent uploads is bounded by AUDIO_UPLOAD_MAX_WORKERS;
+    additional uploads wait for a free worker.
+    """
+    global _blocking_executor
+    with _blocking_executor_lock:
+        if _blocking_executor is None:
+            max_workers = int(os.getenv('AUDIO_UPLOAD_MAX_WORKERS', '4'))
+            _blocking_executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='audio-upload'
+            )
+            logger.info(f"Created audio upload executor (max_workers={max_workers})")
+        return _blocking_executor
+
+
+def shutdown_blocking_executor(wait: bool = True) -> None:
+    """Shut down the shared executor (waits for running uploads by default)"""
+    global _blocking_executor
+    with _blocking_executor_lock:
+        if _blocking_executor is not None:
+            _blocking_executor.shutdown(wait=wait)
+            _blocking_executor = None
+
+
+@dataclass
+class TranscodedAudio:
+    """Audio ready for upload, plus the resources to release afterwards"""
+    stream: BinaryIO
+    owns_stream: bool = True
+    temp_paths: List[str] = field(default_factory=list)
+    container: str = "mp4"
+    processing: str = PROCESSING_PASSTHROUGH
+    codec: Optional[str] = None
+    trim: Optional[TrimPlan] = None
+    analysis: Optional[AudioAnalysis] = None
+    
+    def release(self) -> None:
+        """Close the stream (if owned) and delete temp files"""
+        if self.owns_stream:
+            self.stream.close()
+        for temp_path in self.temp_paths:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
 
 class AudioBlobStorageClient:
     """Azure Blob Storage client for audio files"""
     
-    def __init__(self):
-        """Initialize Azure Blob Storage client"""
+    def __init__(self, transcoding_pool: Optional[TranscodingPool] = None):
+        """
+        Initialize Azure Blob Storage client
+        
+        Args:
+            transcoding_pool: Pool used for ffmpeg jobs (default: shared pool)
+        """
+        self.container_name = os.getenv('AZURE_STORAGE_CONTAINER_NAME', 'audio')
+        self.transcode_mode = os.getenv('AUDIO_TRANSCODE_MODE', TRANSCODE_MODE_PIPE).lower()
+        self.storage_policy = os.getenv('AUDIO_STORAGE_POLICY', STORAGE_POLICY_REMUX).lower()
+        self.remux_container = os.getenv('AUDIO_REMUX_CONTAINER', 'mp4').lower()
+        if self.remux_container not in REMUX_CODECS:
+            raise ValueError(f"Unsupported AUDIO_REMUX_CONTAINER: {self.remux_container}")
+        self.transcoding_pool = transcoding_pool or get_transcoding_pool()
+        self.silence_trimmer = self._create_silence_trimmer()
+        self.analysis_enabled = os.getenv('AUDIO_ANALYSIS_ENABLED', 'false').lower() == 'true' and numpy_available()
+        self.analysis_peak_buckets = int(os.getenv('AUDIO_ANALYSIS_PEAK_BUCKETS', '500'))
+        self._reconnect_lock = threading.Lock()
+        self.block_upload_threshold = int(
+            float(os.getenv('AZURE_STORAGE_BLOCK_UPLOAD_THRESHOLD_MB', '32')) * 1024 * 1024
+        )
+        self.block_uploader = BlockBlobUploader(
+            block_size=int(float(os.getenv('AZURE_STORAGE_BLOCK_SIZE_MB', '8')) * 1024 * 1024),
+            max_concurrency=int(os.getenv('AZURE_STORAGE_UPLOAD_CONCURRENCY', '4')),
+            max_block_retries=int(os.getenv('AZURE_STORAGE_BLOCK_MAX_RETRIES', '3'))
+        )
+        self._container_ready = False
+        self._sas_cache: TTLCache[tuple[str, datetime]] = TTLCache(
+            max_entries=int(os.getenv('AZURE_STORAGE_SAS_CACHE_SIZE', '10000'))
+        )
+        # audio_id -> blob name of recordings uploaded by this process
+        self._audio_blob_names: TTLCache[str] = TTLCache(
+            max_entries=int(os.getenv('AZURE_STORAGE_AUDIO_ID_CACHE_SIZE', '10000')),
+            ttl_seconds=7 * 24 * 3600
+        )
+        
+        self.blob_service_client = self._create_blob_service_client()
+        
+        # Ensure container exists (checked once and cached)
+        self._ensure_container_exists()
+    
+    def _create_silence_trimmer(self) -> Optional[SilenceTrimmer]:
+        """Create the silence trimming stage if enabled (AUDIO_TRIM_SILENCE=true)"""
+        if os.getenv('AUDIO_TRIM_SILENCE', 'false').lower() != 'true':
+            return None
+        if not numpy_available():
+            logger.warning("AUDIO_TRIM_SILENCE is enabled but numpy is not installed; silence trimming is disabled")
+            return None
+        max_gap_ms = int(os.getenv('AUDIO_TRIM_MAX_GAP_MS', '0'))
+        return SilenceTrimmer(
+            threshold_db=float(os.getenv('AUDIO_TRIM_THRESHOLD_DB', '-45')),
+            padding_ms=int(os.getenv('AUDIO_TRIM_PADDING_MS', '200')),
+            max_gap_ms=max_gap_ms or None
+        )
+    
+    def _create_blob_service_client(self) -> BlobServiceClient:
+        """Read credentials from the environment and build a BlobServiceClient"""
         self.account_name = os.getenv('AZURE_STORAGE_ACCOUNT_NAME')
         self.account_key = os.getenv('AZURE_STORAGE_ACCOUNT_KEY')
-        self.container_name = os.getenv('AZURE_STORAGE_CONTAINER_NAME', 'audio')
         
         if not self.account_name or not self.account_key:
             raise ValueError("Azure Storage account name and key must be set in environment variables")
         
-        connection_string = f"DefaultEndpointsProtocol=https;AccountName={self.account_name};AccountKey={self.account_key};EndpointSuffix=core.windows.net"
-        self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+        # A custom endpoint points the client at Azurite or another local stand-in
+        blob_endpoint = os.getenv('AZURE_STORAGE_BLOB_ENDPOINT')
+        if blob_endpoint:
+            connection_string = f"AccountName={self.account_name};AccountKey={self.account_key};BlobEndpoint={blob_endpoint}"
+        else:
+            connection_string = f"DefaultEndpointsProtocol=https;AccountName={self.account_name};AccountKey={self.account_key};EndpointSuffix=core.windows.net"
+        return BlobServiceClient.from_connection_string(
+            connection_string,
+            max_single_put_size=BLOB_MAX_SINGLE_PUT_SIZE,
+            max_block_size=BLOB_MAX_BLOCK_SIZE
+        )
+    
+    def _reconnect(self, stale_client: BlobServiceClient) -> None:
+        """
+        Rebuild the BlobServiceClient after an auth or transport failure
         
-        # Ensure container exists
-        self._ensure_container_exists()
+        Credentials are re-read so that a rotated account key is picked up.
+        Concurrent callers that failed on the same client reconnect only once.
+        """
+        with self._reconnect_lock:
+            if self.blob_service_client is not stale_client:
+                return
+            logger.warning("Reconnecting Azure Blob Storage client")
+            self.blob_service_client = self._create_blob_service_client()
+            self._container_ready = False
+            # SAS URLs signed with a rotated key are no longer valid
+            self._sas_cache.clear()
+            try:
+                stale_client.close()
+            except Exception:
+                pass
     
-    def _ensure_container_exists(self):
-        """Ensure the audio container exists"""
+    def _call_with_reconnect(self, operation: Callable[[BlobServiceClient], T]) -> T:
+        """
+        Run a Blob operation, reconnecting and retrying once on auth/transport failure
+        
+        Args:
+            operation: Callable receiving the current BlobServiceClient
+        
+        Returns:
+            The operation's result
+        """
+        client = self.blob_service_client
         try:
-            container_client = self.blob_service_client.get_container_client(self.container_name)
+            return operation(client)
+        except (ClientAuthenticationError, ServiceRequestError) as e:
+            logger.warning(f"Blob Storage request failed ({type(e).__name__}): {e}")
+            self._reconnect(client)
+            return operation(self.blob_service_client)
+    
+    def _ensure_container_exists(self):
+        """Ensure the audio container exists (the result is cached per client)"""
+        if self._container_ready:
+            return
+        
+        def ensure(client: BlobServiceClient) -> None:
+            container_client = client.get_container_client(self.container_name)
             if not container_client.exists():
                 container_client.create_container()
                 logger.info(f"Created container: {self.container_name}")
+        
+        try:
+            self._call_with_reconnect(ensure)
+            self._container_ready = True
         except AzureError as e:
             logger.error(f"Error ensuring container exists: {e}")
             raise
     
-    def _validate_audio_file(self, audio_data: bytes, source_format: str) -> bool:
+    @property
+    def container_ready(self) -> bool:
+        """Whether the container existence check has succeeded"""
+        return self._container_ready
+    
+    def _spool_to_temp_file(self, audio_file: BinaryIO, suffix: str) -> str:
+        """
+        Copy an upload stream to a temporary file in fixed-size chunks
+        
+        Args:
+            audio_file: Audio file stream
+            suffix: Temporary file suffix
+            
+        Returns:
+            Path of the temporary file (caller is responsible for deleting it)
+        """
+        audio_file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            shutil.copyfileobj(audio_file, temp_file, STREAM_CHUNK_SIZE)
+            return temp_file.name
+    
+    def _validate_audio_file(self, input_path: str, source_format: str) -> bool:
         """
         Validate audio file integrity using ffprobe
         
         Args:
-            audio_data: Audio file binary data
+            input_path: Path of the audio file to validate
             source_format: Source audio format
             
         Returns:
             True if file is valid, False otherwise
         """
+        return self._probe_audio_codec(input_path, source_format) is not None
+    
+    def _probe_audio_codec(self, input_path: str, source_format: str) -> Optional[str]:
+        """
+        Probe an audio file with ffprobe
+        
+        Args:
+            input_path: Path of the audio file to probe
+            source_format: Source audio format
+        
+        Returns:
+            Codec name of the first audio stream, or None if the file is invalid
+        """
         try:
-            with tempfile.NamedTemporaryFile(suffix=f'.{source_format}', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file.flush()
-                temp_path = temp_file.name
+            # Use ffprobe to validate the file
+            probe = ffmpeg.probe(input_path)
             
-            try:
-                # Use ffprobe to validate the file
-                probe = ffmpeg.probe(temp_path)
-                
-                # Check if we have audio streams
-                audio_streams = [stream for stream in probe['streams'] if stream['codec_type'] == 'audio']
-                if not audio_streams:
-                    logger.warning(f"No audio streams found in {source_format} file")
-                    return False
-                
-                # Log file information
-                logger.info(f"Valid {source_format} file detected:")
-                for stream in audio_streams:
-                    codec = stream.get('codec_name', 'unknown')
-                    duration = stream.get('duration', 'unknown')
-                    sample_rate = stream.get('sample_rate', 'unknown')
-                    channels = stream.get('channels', 'unknown')
-                    logger.info(f"  Codec: {codec}, Duration: {duration}s, Sample Rate: {sample_rate}, Channels: {channels}")
-                
-                return True
-                
-            finally:
-                try:
-                    os.unlink(temp_path)
-                except OSError:
-                    pass
-                    
+            # Check if we have audio streams
+            audio_streams = [stream for stream in probe['streams'] if stream['codec_type'] == 'audio']
+            if not audio_streams:
+                logger.warning(f"No audio streams found in {source_format} file")
+                return None
+            
+            # Log file information
+            logger.info(f"Valid {source_format} file detected:")
+            for stream in audio_streams:
+                codec = stream.get('codec_name', 'unknown')
+                duration = stream.get('duration', 'unknown')
+                sample_rate = stream.get('sample_rate', 'unknown')
+                channels = stream.get('channels', 'unknown')
+                logger.info(f"  Codec: {codec}, Duration: {duration}s, Sample Rate: {sample_rate}, Channels: {channels}")
+            
+            return audio_streams[0].get('codec_name', 'unknown')
+        
         except Exception as e:
             logger.error(f"Audio file validation failed: {e}")
-            return False
-
-    def _convert_to_mp4_with_ffmpeg(self, audio_data: bytes, source_format: str) -> bytes:
+            return None
+    
+    def _convert_to_mp4_with_ffmpeg(
+        self,
+        input_path: str,
+        source_format: str,
+        timeout: Optional[float] = None,
+        trim: Optional[TrimPlan] = None,
+        sniffed: Optional[ContainerInfo] = None
+    ) -> str:
         """
-        Convert audio data to MP4 format using ffmpeg
+        Convert audio file to MP4 format using ffmpeg
         
         Args:
-            audio_data: Original audio file binary data
+            input_path: Path of the original audio file
             source_format: Source audio format (webm, ogg, etc.)
-            
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+            trim: Silence to cut out while converting (None = keep everything)
+            sniffed: Header information (ffprobe is skipped if it is complete)
+        
         Returns:
-            MP4 audio binary data
+            Path of the converted MP4 file (caller is responsible for deleting it)
         """
         try:
             # First validate the input file
-            logger.info(f"Validating {source_format} file ({len(audio_data)} bytes)...")
-            if not self._validate_audio_file(audio_data, source_format):
-                logger.error(f"Invalid {source_format} file detected, skipping conversion")
-                raise ValueError(f"Invalid {source_format} audio file")
+            if sniffed is not None and sniffed.is_complete:
+                logger.info(f"Valid {source_format} file detected from header:")
+                logger.info(f"  Codec: {sniffed.codec}, Duration: {sniffed.duration}s, Sample Rate: {sniffed.sample_rate}, Channels: {sniffed.channels}")
+            else:
+                logger.info(f"Validating {source_format} file ({os.path.getsize(input_path)} bytes)...")
+                if not self._validate_audio_file(input_path, source_format):
+                    logger.error(f"Invalid {source_format} file detected, skipping conversion")
+                    raise ValueError(f"Invalid {source_format} audio file")
+            
+            logger.info(f"Starting conversion from {source_format} to MP4...")
+            output_options = dict(TRANSCODE_OUTPUT_OPTIONS, f='mp4')  # Force MP4 format
+            if source_format.lower() == 'webm':
+                output_options['movflags'] = 'frag_keyframe+empty_moov'  # Better MP4 compatibility
+            output_options.update(self._trim_output_options(trim, reencode=True))
             
-            # Create temporary files for input and output
-            with tempfile.NamedTemporaryFile(suffix=f'.{source_format}', delete=False) as input_file:
-                input_file.write(audio_data)
-                input_file.flush()
-                input_path = input_file.name
+            output_path = self._run_ffmpeg_to_file(input_path, source_format, output_options, timeout)
+            logger.info(f"Successfully converted audio from {source_format} to MP4 using ffmpeg")
+            return output_path
+        
+        except Exception as e:
+            logger.error(f"Failed to convert audio from {source_format} to MP4 using ffmpeg: {e}")
+            # Don't return original data if conversion fails - raise the error instead
+            raise
+    
+    def _run_ffmpeg_to_file(
+        self,
+        input_path: str,
+        source_format: str,
+        output_options: dict,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Run ffmpeg from an input file into a new temporary file
+        
+        Args:
+            input_path: Path of the original audio file
+            source_format: Source audio format (webm, ogg, etc.)
+            output_options: ffmpeg output options (must include the container as 'f')
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+        
+        Returns:
+            Path of the output file (caller is responsible for deleting it)
+        """
+        with tempfile.NamedTemporaryFile(suffix=f".{output_options['f']}", delete=False) as output_file:
+            output_path = output_file.name
             
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as output_file:
-                output_path = output_file.name
+        try:
+            # WebM specific settings - specify input format explicitly
+            input_options = {'f': 'webm'} if source_format.lower() == 'webm' else {}
             
+            # Convert using ffmpeg-python
+            process = (
+                ffmpeg.input(input_path, **input_options)
+                .output(output_path, **output_options)
+                .overwrite_output()
+                .run_async(pipe_stdout=True, pipe_stderr=True)
+            )
             try:
-                logger.info(f"Starting conversion from {source_format} to MP4...")
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise TranscodingTimeoutError(f"ffmpeg did not finish within {timeout} seconds")
+            if process.returncode != 0:
+                raise ffmpeg.Error('ffmpeg', stdout, stderr)
                 
-                # Configure ffmpeg settings based on source format
-                if source_format.lower() == 'webm':
-                    # WebM specific settings - specify input format explicitly
-                    input_stream = ffmpeg.input(input_path, f='webm')
-                    output_options = {
-                        'vn': None,  # No video
-                        'c:a': 'aac',  # AAC audio codec for MP4
-                        'b:a': '127k',  # Audio bitrate - 127 kbps as requested
-                        'ar': 32000,  # Sample rate - 32 kHz as requested
-                        'ac': 1,  # Mono channel as requested
-                        'f': 'mp4',  # Force MP4 format
-                        'movflags': 'frag_keyframe+empty_moov'  # Better MP4 compatibility
-                    }
-                else:
-                    # For other formats
-                    input_stream = ffmpeg.input(input_path)
-                    output_options = {
-                        'vn': None,  # No video
-                        'c:a': 'aac',  # AAC audio codec for MP4
-                        'b:a': '127k',  # Audio bitrate - 127 kbps as requested
-                        'ar': 32000,  # Sample rate - 32 kHz as requested
-                        'ac': 1,  # Mono channel as requested
-                        'f': 'mp4'  # Force MP4 format
-                    }
-                
-                # Convert using ffmpeg-python
-                result = (
-                    input_stream
-                    .output(output_path, **output_options)
-                    .overwrite_output()
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
-                
-                # Check if output file was created and has content
-                if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-                    raise RuntimeError("FFmpeg conversion produced empty output file")
-                
-                # Read the converted MP4 data
-                with open(output_path, 'rb') as f:
-                    mp4_data = f.read()
-                
-                logger.info(f"Successfully converted audio from {source_format} to MP4 using ffmpeg")
-                logger.info(f"Original size: {len(audio_data)} bytes, Converted size: {len(mp4_data)} bytes")
-                return mp4_data
+            # Check if output file was created and has content
+            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+                raise RuntimeError("FFmpeg conversion produced empty output file")
+            
+            logger.info(f"Original size: {os.path.getsize(input_path)} bytes, Converted size: {os.path.getsize(output_path)} bytes")
+            return output_path
                 
-            except ffmpeg.Error as e:
-                # Log detailed ffmpeg error information
-                stderr_output = e.stderr.decode('utf-8') if e.stderr else 'No stderr available'
-                stdout_output = e.stdout.decode('utf-8') if e.stdout else 'No stdout available'
-                logger.error(f"FFmpeg conversion failed:")
-                logger.error(f"  Command: {' '.join(e.cmd) if hasattr(e, 'cmd') else 'Unknown command'}")
-                logger.error(f"  Return code: {e.returncode if hasattr(e, 'returncode') else 'Unknown'}")
-                logger.error(f"  STDERR: {stderr_output}")
-                logger.error(f"  STDOUT: {stdout_output}")
-                raise
+        except ffmpeg.Error as e:
+            # Log detailed ffmpeg error information
+            stderr_output = e.stderr.decode('utf-8') if e.stderr else 'No stderr available'
+            stdout_output = e.stdout.decode('utf-8') if e.stdout else 'No stdout available'
+            logger.error(f"FFmpeg conversion failed:")
+            logger.error(f"  Command: {' '.join(e.cmd) if hasattr(e, 'cmd') else 'Unknown command'}")
+            logger.error(f"  Return code: {e.returncode if hasattr(e, 'returncode') else 'Unknown'}")
+            logger.error(f"  STDERR: {stderr_output}")
+            logger.error(f"  STDOUT: {stdout_output}")
+            self._remove_temp_file(output_path)
+            raise
                 
-            finally:
-                # Clean up temporary files
-                try:
-                    os.unlink(input_path)
-                    os.unlink(output_path)
-                except OSError:
-                    pass
-                    
-        except Exception as e:
-            logger.error(f"Failed to convert audio from {source_format} to MP4 using ffmpeg: {e}")
-            # Don't return original data if conversion fails - raise the error instead
+        except Exception:
+            self._remove_temp_file(output_path)
             raise
     
-    def upload_audio_file(
-        self, 
-        audio_data: bytes, 
-        session_id: Optional[str] = None,
-        audio_format: str = "mp4"
-    ) -> tuple[str, str]:
+    def _convert_to_mp4_with_ffmpeg_pipe(
+        self,
+        audio_file: BinaryIO,
+        source_format: str,
+        timeout: Optional[float] = None,
+        trim: Optional[TrimPlan] = None
+    ) -> BinaryIO:
         """
-        Upload audio file to Blob Storage
+        Convert audio to fragmented MP4 by piping through ffmpeg stdin/stdout
+        
+        Validation is derived from the same ffmpeg run (input stream info and exit
+        status) instead of a separate ffprobe pass, and no temp files are written.
+        
+        Args:
+            audio_file: Original audio file stream
+            source_format: Source audio format (webm, ogg, etc.)
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+            trim: Silence to cut out while converting (None = keep everything)
+        
+        Returns:
+            Stream of the converted MP4 data (caller is responsible for closing it)
+        """
+        output_options = dict(
+            TRANSCODE_OUTPUT_OPTIONS,
+            f='mp4',  # Force MP4 format
+            movflags='frag_keyframe+empty_moov'  # Fragmented MP4 (required for non-seekable output)
+        )
+        output_options.update(self._trim_output_options(trim, reencode=True))
+        
+        try:
+            logger.info(f"Starting piped conversion from {source_format} to MP4...")
+            result = self._run_ffmpeg_pipe(audio_file, source_format, output_options, timeout)
+        except ffmpeg.Error as e:
+            stderr_output = e.stderr.decode('utf-8', errors='replace') if e.stderr else 'No stderr available'
+            logger.error(f"FFmpeg conversion failed:")
+            logger.error(f"  STDERR: {stderr_output}")
+            raise ValueError(f"Invalid {source_format} audio file")
+        
+        if result.input_info is None or result.output_size == 0:
+            result.output.close()
+            logger.warning(f"No audio streams found in {source_format} file")
+            raise ValueError(f"Invalid {source_format} audio file")
+        
+        info = result.input_info
+        logger.info(f"Valid {source_format} file detected:")
+        logger.info(f"  Codec: {info.codec}, Duration: {info.duration}s, Sample Rate: {info.sample_rate}, Channels: {info.channels}")
+        logger.info(f"Successfully converted audio from {source_format} to MP4 using ffmpeg")
+        logger.info(f"Converted size: {result.output_size} bytes")
+        return result.output
+    
+    def _run_ffmpeg_pipe(
+        self,
+        audio_file: BinaryIO,
+        source_format: str,
+        output_options: dict,
+        timeout: Optional[float] = None
+    ) -> FfmpegPipeResult:
+        """Run ffmpeg over stdin/stdout with the given output options"""
+        input_options = {'f': 'webm'} if source_format.lower() == 'webm' else {}
+        return run_ffmpeg_pipe(
+            ffmpeg.input('pipe:0', **input_options).output('pipe:1', **output_options),
+            audio_file,
+            timeout=timeout
+        )
+    
+    def _remux_output_options(self, trim: Optional[TrimPlan] = None) -> dict:
+        """ffmpeg output options that copy the audio stream into the remux container"""
+        options = {
+            'vn': None,  # No video
+            'c:a': 'copy',  # Keep the original encoding
+            'f': self.remux_container
+        }
+        if self.remux_container == 'mp4':
+            options['movflags'] = 'frag_keyframe+empty_moov'  # Fragmented MP4 (required for non-seekable output)
+            options['strict'] = 'experimental'  # Opus in MP4 on older ffmpeg builds
+        options.update(self._trim_output_options(trim, reencode=False))
+        return options
+    
+    @staticmethod
+    def _trim_output_options(trim: Optional[TrimPlan], reencode: bool) -> dict:
+        """
+        ffmpeg output options that cut the removed silence out
+        
+        Stream copies can only be cut at the ends (packet accuracy); removing
+        internal gaps needs the audio filter and therefore re-encoding.
+        """
+        if trim is None:
+            return {}
+        if not reencode:
+            start, end = trim.keep[0]
+            return {'ss': f'{start:.3f}', 't': f'{end - start:.3f}'}
+        selection = '+'.join(f'between(t,{start:.3f},{end:.3f})' for start, end in trim.keep)
+        return {'af': f"aselect='{selection}',asetpts=N/SR/TB"}
+    
+    def _decode_for_pcm_stages(
+        self,
+        audio_file: BinaryIO,
+        audio_format: str,
+        timeout: Optional[float] = None
+    ) -> Optional[DecodedPcm]:
+        """
+        Decode the upload once for silence trimming and analysis
+        
+        Args:
+            audio_file: Audio file stream (seekable)
+            audio_format: Source file format extension
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+        
+        Returns:
+            Spooled mono PCM to be closed by the caller, or None if no stage is
+            enabled or decoding failed
+        """
+        if self.silence_trimmer is None and not self.analysis_enabled:
+            return None
+        try:
+            return open_pcm(audio_file, audio_format, timeout=timeout)
+        except ValueError:
+            # Invalid input is reported by the conversion itself
+            return None
+    
+    def _plan_silence_trim(self, pcm: Optional[DecodedPcm], audio_format: str) -> Optional[TrimPlan]:
+        """
+        Detect silence to remove before storage
+        
+        Args:
+            pcm: Decoded PCM (None if unavailable)
+            audio_format: Source file format extension
+        
+        Returns:
+            TrimPlan if anything should be removed, otherwise None
+        """
+        if self.silence_trimmer is None or pcm is None:
+            return None
+        
+        plan = self.silence_trimmer.plan_pcm(pcm)
+        if not plan.trims_anything:
+            return None
+        logger.info(f"Removing {plan.removed_seconds:.1f}s of silence from {plan.duration:.1f}s {audio_format} upload")
+        return plan
+    
+    def _analyze_audio(self, pcm: Optional[DecodedPcm], trim: Optional[TrimPlan]) -> Optional[AudioAnalysis]:
+        """Analyze the PCM of the audio as it will be stored (after trimming)"""
+        if not self.analysis_enabled or pcm is None:
+            return None
+        keep = trim.keep if trim is not None else None
+        return analyze_decoded_pcm(pcm, keep, peak_buckets=self.analysis_peak_buckets)
+    
+    def _should_try_remux(self, audio_format: str, sniffed: Optional[ContainerInfo] = None) -> bool:
+        """Whether the storage policy allows storing this upload without re-encoding"""
+        if self.storage_policy != STORAGE_POLICY_REMUX:
+            return False
+        if sniffed is not None and sniffed.codec is not None:
+            # The header already tells whether a stream copy can be stored
+            return self._is_remuxable_codec(sniffed.codec)
+        return audio_format.lower() not in PCM_FORMATS
+    
+    def _is_remuxable_codec(self, codec: Optional[str]) -> bool:
+        """Whether the codec can be stored in the remux container as-is"""
+        return codec is not None and codec.lower() in REMUX_CODECS[self.remux_container]
+    
+    def _remux_with_ffmpeg_pipe(
+        self,
+        audio_file: BinaryIO,
+        source_format: str,
+        timeout: Optional[float] = None,
+        trim: Optional[TrimPlan] = None
+    ) -> Optional[TranscodedAudio]:
+        """
+        Copy the audio stream into the remux container by piping through ffmpeg
+        
+        The codec is read from the same ffmpeg run, so no separate probe is needed.
+        
+        Args:
+            audio_file: Original audio file stream
+            source_format: Source audio format (webm, ogg, etc.)
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+            trim: Leading/trailing silence to cut (None = keep everything)
+        
+        Returns:
+            TranscodedAudio of the remuxed data, or None if the upload has to be transcoded
+        """
+        try:
+            logger.info(f"Starting piped remux from {source_format} to {self.remux_container}...")
+            result = self._run_ffmpeg_pipe(audio_file, source_format, self._remux_output_options(trim), timeout)
+        except ffmpeg.Error as e:
+            stderr_output = e.stderr.decode('utf-8', errors='replace') if e.stderr else 'No stderr available'
+            logger.info(f"Remux of {source_format} not possible, falling back to transcoding")
+            logger.debug(f"  STDERR: {stderr_output}")
+            return None
+        
+        codec = result.input_info.codec if result.input_info else None
+        if result.output_size == 0 or not self._is_remuxable_codec(codec):
+            result.output.close()
+            logger.info(f"Codec {codec} of {source_format} file cannot be stored as-is, falling back to transcoding")
+            return None
+        
+        logger.info(f"Remuxed {codec} audio from {source_format} to {self.remux_container} without re-encoding")
+        logger.info(f"Remuxed size: {result.output_size} bytes")
+        return TranscodedAudio(
+            stream=result.output,
+            container=self.remux_container,
+            processing=PROCESSING_REMUX,
+            codec=codec,
+            trim=trim
+        )
+    
+    def _remux_with_ffmpeg_file(
+        self,
+        input_path: str,
+        source_format: str,
+        codec: str,
+        timeout: Optional[float] = None,
+        trim: Optional[TrimPlan] = None
+    ) -> Optional[TranscodedAudio]:
+        """
+        Copy the audio stream of a spooled upload into the remux container
+        
+        Args:
+            input_path: Path of the original audio file
+            source_format: Source audio format (webm, ogg, etc.)
+            codec: Audio codec of the upload
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+            trim: Leading/trailing silence to cut (None = keep everything)
+        
+        Returns:
+            TranscodedAudio of the remuxed file, or None if the upload has to be transcoded
+        """
+        try:
+            logger.info(f"Remuxing {codec} audio from {source_format} to {self.remux_container} using ffmpeg")
+            output_path = self._run_ffmpeg_to_file(input_path, source_format, self._remux_output_options(trim), timeout)
+        except (ffmpeg.Error, RuntimeError):
+            # ffmpeg failed or produced no output (details are logged by _run_ffmpeg_to_file)
+            logger.info(f"Remux of {source_format} not possible, falling back to transcoding")
+            return None
+        
+        return TranscodedAudio(
+            stream=open(output_path, 'rb'),
+            temp_paths=[output_path],
+            container=self.remux_container,
+            processing=PROCESSING_REMUX,
+            codec=codec,
+            trim=trim
+        )
+    
+    def _remove_temp_file(self, path: str) -> None:
+        """Remove a temporary file, ignoring errors"""
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    def _sniff_upload(self, audio_file: BinaryIO, audio_format: str) -> tuple[str, Optional[ContainerInfo]]:
+        """
+        Identify the upload from its header before any ffmpeg process runs
         
         Args:
-            audio_data: Audio file binary data
+            audio_file: Audio file stream (seekable)
+            audio_format: File format extension given by the client
+        
+        Returns:
+            Tuple of (format to process the upload as, header information or None)
+        
+        Raises:
+            InvalidAudioError: If the upload is empty, corrupt or not the declared format
+        """
+        sniffed = sniff_audio_file(audio_file)
+        if sniffed is None:
+            if audio_format.lower() in SNIFFED_FORMATS:
+                raise InvalidAudioError(f"Upload is not a valid {audio_format} file")
+            return audio_format, None
+        
+        if sniffed.format == "mp4" and audio_format.lower() in ["mp4", "m4a"]:
+            return audio_format, sniffed
+        if sniffed.format != audio_format.lower():
+            logger.info(f"Upload declared as {audio_format} is {sniffed.format}")
+        return sniffed.format, sniffed
+    
+    def _transcode(
+        self,
+        audio_file: BinaryIO,
+        audio_format: str,
+        timeout: Optional[float] = None,
+        sniffed: Optional[ContainerInfo] = None
+    ) -> TranscodedAudio:
+        """
+        Convert the upload to the storage format if needed
+        
+        MP4/M4A uploads are stored as-is. With the remux storage policy, uploads whose
+        codec is accepted by the remux container are copied into it without
+        re-encoding (-c:a copy); everything else is transcoded to AAC in MP4.
+        If silence trimming is enabled, detected silence is cut out in the same
+        ffmpeg run (internal gaps force re-encoding). The PCM decoded for trimming
+        is also used for the analysis of the stored audio.
+        
+        Args:
+            audio_file: Audio file stream (seekable)
+            audio_format: Source file format extension
+            timeout: Seconds after which ffmpeg is killed (None = no limit)
+            sniffed: Header information from _sniff_upload (None = unknown)
+        
+        Returns:
+            TranscodedAudio to be uploaded and then released
+        """
+        if audio_format.lower() in ["mp4", "m4a"]:
+            analysis = None
+            if self.analysis_enabled:
+                pcm = self._decode_for_pcm_stages(audio_file, audio_format, timeout)
+                try:
+                    analysis = self._analyze_audio(pcm, None)
+                finally:
+                    if pcm is not None:
+                        pcm.close()
+            audio_file.seek(0)
+            return TranscodedAudio(stream=audio_file, owns_stream=False, analysis=analysis)
+        
+        started_at = time.perf_counter()
+        processing = "failed"
+        pcm = None
+        try:
+            pcm = self._decode_for_pcm_stages(audio_file, audio_format, timeout=timeout)
+            trim = self._plan_silence_trim(pcm, audio_format)
+            if self.transcode_mode == TRANSCODE_MODE_PIPE:
+                transcoded = self._transcode_pipe(audio_file, audio_format, timeout, trim, sniffed)
+            else:
+                transcoded = self._transcode_file(audio_file, audio_format, timeout, trim, sniffed)
+            processing = transcoded.processing
+            if trim is not None:
+                SILENCE_REMOVED_SECONDS.inc(trim.removed_seconds)
+            transcoded.analysis = self._analyze_audio(pcm, trim)
+            return transcoded
+        finally:
+            if pcm is not None:
+                pcm.close()
+            TRANSCODE_SECONDS.observe(
+                time.perf_counter() - started_at,
+                mode=self.transcode_mode,
+                processing=processing
+            )
+    
+    def _transcode_pipe(
+        self,
+        audio_file: BinaryIO,
+        audio_format: str,
+        timeout: Optional[float],
+        trim: Optional[TrimPlan] = None,
+        sniffed: Optional[ContainerInfo] = None
+    ) -> TranscodedAudio:
+        """Remux or transcode the upload through ffmpeg stdin/stdout"""
+        if self._should_try_remux(audio_format, sniffed) and (trim is None or trim.is_contiguous):
+            remuxed = self._remux_with_ffmpeg_pipe(audio_file, audio_format, timeout=timeout, trim=trim)
+            if remuxed is not None:
+                return remuxed
+        
+        logger.info(f"Converting audio from {audio_format} to MP4 using ffmpeg (pipe)")
+        return TranscodedAudio(
+            stream=self._convert_to_mp4_with_ffmpeg_pipe(audio_file, audio_format, timeout=timeout, trim=trim),
+            processing=PROCESSING_TRANSCODE,
+            codec="aac",
+            trim=trim
+        )
+    
+    def _transcode_file(
+        self,
+        audio_file: BinaryIO,
+        audio_format: str,
+        timeout: Optional[float],
+        trim: Optional[TrimPlan] = None,
+        sniffed: Optional[ContainerInfo] = None
+    ) -> TranscodedAudio:
+        """Remux or transcode the upload through temporary files"""
+        input_path = self._spool_to_temp_file(audio_file, f'.{audio_format}')
+        try:
+            if self._should_try_remux(audio_format, sniffed) and (trim is None or trim.is_contiguous):
+                if sniffed is not None and sniffed.is_complete:
+                    codec = sniffed.codec
+                else:
+                    codec = self._probe_audio_codec(input_path, audio_format)
+                if self._is_remuxable_codec(codec):
+                    remuxed = self._remux_with_ffmpeg_file(input_path, audio_format, codec, timeout=timeout, trim=trim)
+                    if remuxed is not None:
+                        return remuxed
+            
+            logger.info(f"Converting audio from {audio_format} to MP4 using ffmpeg")
+            output_path = self._convert_to_mp4_with_ffmpeg(
+                input_path, audio_format, timeout=timeout, trim=trim, sniffed=sniffed
+            )
+        finally:
+            self._remove_temp_file(input_path)
+        return TranscodedAudio(
+            stream=open(output_path, 'rb'),
+            temp_paths=[output_path],
+            processing=PROCESSING_TRANSCODE,
+            codec="aac",
+            trim=trim
+        )
+    
+    def _upload_transcoded(
+        self,
+        transcoded: TranscodedAudio,
+        session_id: Optional[str],
+        audio_format: str
+    ) -> tuple[str, str, Optional[AudioAnalysis]]:
+        """
+        Upload transcoded audio to Blob Storage and release it
+        
+        The analysis (if any) is stored as a JSON sidecar blob named
+        "<audio blob name>.analysis.json".
+        
+        Args:
+            transcoded: Output of _transcode
             session_id: Session ID for organizing files
-            audio_format: File format extension
+            audio_format: Original file format extension
             
         Returns:
-            Tuple of (audio_id, blob_url)
+            Tuple of (audio_id, blob_url, analysis)
         """
         try:
             audio_id = str(uuid.uuid4())
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            
-            # Convert to MP4 if source format is not MP4
-            final_audio_data = audio_data
-            final_format = "mp4"  # Always save as MP4
-            
-            if audio_format.lower() not in ["mp4", "m4a"]:
-                logger.info(f"Converting audio from {audio_format} to MP4 using ffmpeg")
-                final_audio_data = self._convert_to_mp4_with_ffmpeg(audio_data, audio_format)
+            final_format = transcoded.container
             
             # Organize files by session if provided
             if session_id:
@@ -224,34 +926,148 @@ class AudioBlobStorageClient:
             else:
                 blob_name = f"audio/{audio_id}_{timestamp}.{final_format}"
             
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
+            metadata = {
+                'audio_id': audio_id,
+                'session_id': session_id or 'no-session',
+                'uploaded_at': datetime.utcnow().isoformat(),
+                'format': final_format,
+                'original_format': audio_format,
+                'processing': transcoded.processing,
+                'storage_policy': self.storage_policy
+            }
+            if transcoded.codec:
+                metadata['codec'] = transcoded.codec
+            if transcoded.trim is not None:
+                metadata['silence_removed_seconds'] = f"{transcoded.trim.removed_seconds:.2f}"
+                metadata['silence_removed_ranges'] = json.dumps(
+                    [[round(start, 2), round(end, 2)] for start, end in transcoded.trim.removed[:MAX_RECORDED_TRIM_RANGES]],
+                    separators=(',', ':')
+                )
+            if transcoded.analysis is not None:
+                metadata['duration'] = f"{transcoded.analysis.duration:.3f}"
             
-            # Upload file with metadata
-            blob_client.upload_blob(
-                final_audio_data,
-                overwrite=True,
-                metadata={
-                    'audio_id': audio_id,
-                    'session_id': session_id or 'no-session',
-                    'uploaded_at': datetime.utcnow().isoformat(),
-                    'format': final_format,
-                    'original_format': audio_format
-                }
-            )
+            # Container may need to be re-checked after a reconnect
+            self._ensure_container_exists()
+            
+            size = transcoded.stream.seek(0, os.SEEK_END)
+            use_block_upload = size >= self.block_upload_threshold
             
-            blob_url = blob_client.url
-            logger.info(f"Uploaded audio file: {blob_name}")
+            def upload(client: BlobServiceClient) -> str:
+                blob_client = client.get_blob_client(
+                    container=self.container_name,
+                    blob=blob_name
+                )
+                transcoded.stream.seek(0)
+                if use_block_upload:
+                    # Large recordings: stage blocks in parallel and commit the list.
+                    # A retry after reconnect resumes without re-sending staged blocks.
+                    self.block_uploader.upload(blob_client, transcoded.stream, metadata=metadata)
+                else:
+                    # Upload file with metadata (streamed in blocks by the SDK)
+                    blob_client.upload_blob(transcoded.stream, overwrite=True, metadata=metadata)
+                return blob_client.url
             
-            return audio_id, blob_url
+            with BLOB_UPLOAD_SECONDS.time(method="block" if use_block_upload else "single"):
+                blob_url = self._call_with_reconnect(upload)
+            self.remember_audio_blob(audio_id, blob_name)
+            logger.info(f"Uploaded audio file: {blob_name} ({size} bytes, block_upload={use_block_upload})")
             
+            if transcoded.analysis is not None:
+                self._upload_analysis_sidecar(blob_name, transcoded.analysis)
+            
+            return audio_id, blob_url, transcoded.analysis
+        
         except AzureError as e:
             logger.error(f"Error uploading audio file: {e}")
             raise
+        finally:
+            transcoded.release()
+    
+    def _upload_analysis_sidecar(self, blob_name: str, analysis: AudioAnalysis) -> None:
+        """Store the analysis next to the audio blob (a failure only loses the sidecar)"""
+        def upload(client: BlobServiceClient) -> None:
+            client.get_blob_client(
+                container=self.container_name,
+                blob=f"{blob_name}{ANALYSIS_SIDECAR_SUFFIX}"
+            ).upload_blob(
+                analysis.model_dump_json(),
+                overwrite=True,
+                content_settings=ContentSettings(content_type='application/json')
+            )
+        
+        try:
+            self._call_with_reconnect(upload)
+        except AzureError as e:
+            logger.warning(f"Failed to upload analysis of {blob_name}: {e}")
+    
+    def upload_audio_file(
+        self, 
+        audio_file: BinaryIO, 
+        session_id: Optional[str] = None,
+        audio_format: str = "mp4"
+    ) -> tuple[str, str, Optional[AudioAnalysis]]:
+        """
+        Upload audio file to Blob Storage
+        
+        The audio is read from the given stream in chunks; it is never loaded
+        into memory as a whole.
+        
+        Args:
+            audio_file: Audio file stream (seekable)
+            session_id: Session ID for organizing files
+            audio_format: File format extension
+            
+        Returns:
+            Tuple of (audio_id, blob_url, analysis)
+        
+        Raises:
+            InvalidAudioError: If the upload is rejected by the header check
+        """
+        detected_format, sniffed = self._sniff_upload(audio_file, audio_format)
+        transcoded = self._transcode(audio_file, detected_format, sniffed=sniffed)
+        return self._upload_transcoded(transcoded, session_id, audio_format)
+    
+    async def upload_audio_file_async(
+        self,
+        audio_file: BinaryIO,
+        session_id: Optional[str] = None,
+        audio_format: str = "mp4"
+    ) -> tuple[str, str, Optional[AudioAnalysis]]:
+        """
+        Upload audio file to Blob Storage without blocking the event loop
+        
+        Transcoding runs on the bounded transcoding pool (with a per-job timeout)
+        and the Blob SDK upload runs on the shared upload executor.
+        
+        Args:
+            audio_file: Audio file stream (seekable)
+            session_id: Session ID for organizing files
+            audio_format: File format extension
+            
+        Returns:
+            Tuple of (audio_id, blob_url, analysis)
+        
+        Raises:
+            InvalidAudioError: If the upload is rejected by the header check
+            TranscodingQueueFullError: If the transcoding queue is full
+        """
+        loop = asyncio.get_running_loop()
+        # Reads only the first bytes; broken uploads never reach the transcoding queue
+        detected_format, sniffed = await asyncio.to_thread(self._sniff_upload, audio_file, audio_format)
+        if detected_format.lower() in ["mp4", "m4a"] and not self.analysis_enabled:
+            # Stored as-is without ffmpeg; only the analysis decode needs a pool slot
+            transcoded = self._transcode(audio_file, detected_format, sniffed=sniffed)
+        else:
+            transcoded = await self.transcoding_pool.run(
+                partial(self._transcode, sniffed=sniffed), audio_file, detected_format
+            )
+        
+        return await loop.run_in_executor(
+            get_blocking_executor(),
+            partial(contextvars.copy_context().run, self._upload_transcoded, transcoded, session_id, audio_format)
+        )
     
-    def generate_sas_url(self, blob_url: str, expire_hours: int = 1) -> tuple[str, datetime]:
+    def generate_sas_url(self, blob_url: str, expire_hours: float = 1) -> tuple[str, datetime]:
         """
         Generate SAS URL for blob access
         
@@ -262,28 +1078,119 @@ class AudioBlobStorageClient:
         Returns:
             Tuple of (sas_url, expiry_datetime)
         """
+        return self.generate_blob_sas_url(
+            self.blob_name_from_url(blob_url),
+            expire_seconds=int(expire_hours * 3600)
+        )
+    
+    def generate_blob_sas_url(self, blob_name: str, expire_seconds: int = 3600) -> tuple[str, datetime]:
+        """
+        Generate a read-only SAS URL for a blob, reusing a memoized URL when possible
+        
+        The token is signed locally with the account key (no service round trip).
+        A URL is reused for the same blob and lifetime until SAS_REUSE_FRACTION of
+        its lifetime has elapsed, so callers always get at least the remaining
+        fraction of the requested validity.
+        
+        Args:
+            blob_name: Blob name within the container
+            expire_seconds: SAS token lifetime in seconds
+        
+        Returns:
+            Tuple of (sas_url, expiry_datetime)
+        """
+        started_at = time.perf_counter()
+        cache_key = (blob_name, expire_seconds)
+        cached = self._sas_cache.get(cache_key)
+        if cached is not None:
+            SAS_GENERATION_SECONDS.observe(time.perf_counter() - started_at, cached="true")
+            return cached
+        
         try:
-            # Extract blob name from URL
-            blob_name = blob_url.split(f'{self.container_name}/')[-1]
-            
-            # Generate SAS token
+            expiry = datetime.utcnow() + timedelta(seconds=expire_seconds)
             sas_token = generate_blob_sas(
                 account_name=self.account_name,
                 container_name=self.container_name,
                 blob_name=blob_name,
                 account_key=self.account_key,
                 permission=BlobSasPermissions(read=True),
-                expiry=datetime.utcnow() + timedelta(hours=expire_hours)
+                expiry=expiry
             )
-            
-            sas_url = f"{blob_url}?{sas_token}"
-            expiry = datetime.utcnow() + timedelta(hours=expire_hours)
-            
-            return sas_url, expiry
-            
         except AzureError as e:
             logger.error(f"Error generating SAS URL: {e}")
             raise
+        
+        result = (f"{self.get_blob_url(blob_name)}?{sas_token}", expiry)
+        self._sas_cache.set(cache_key, result, ttl_seconds=expire_seconds * SAS_REUSE_FRACTION)
+        SAS_GENERATION_SECONDS.observe(time.perf_counter() - started_at, cached="false")
+        return result
+    
+    def blob_name_from_url(self, blob_url: str) -> str:
+        """
+        Blob name within the audio container for a full blob URL
+        
+        Only the leading container segment is removed: blob names start with
+        "audio/" as well, which is also the default container name.
+        
+        Raises:
+            ValueError: If the URL does not point into the audio container
+        """
+        path = unquote(urlparse(blob_url).path)
+        # Path-style endpoints (Azurite, local stand-ins) put the account name before the container
+        account_path = unquote(urlparse(self.blob_service_client.url).path).rstrip('/')
+        prefix = f'{account_path}/{self.container_name}/'
+        if not path.startswith(prefix):
+            raise ValueError(f"Blob URL is not in container '{self.container_name}'")
+        return path[len(prefix):]
+    
+    def get_blob_url(self, blob_name: str) -> str:
+        """Full URL of a blob in the audio container"""
+        account_url = self.blob_service_client.url.rstrip('/')
+        return f"{account_url}/{self.container_name}/{quote(blob_name)}"
+    
+    def remember_audio_blob(self, audio_id: str, blob_name: str) -> None:
+        """Record the blob name of an uploaded recording for later lookups"""
+        self._audio_blob_names.set(audio_id, blob_name)
+    
+    def get_cached_audio_blob(self, audio_id: str) -> Optional[str]:
+        """Blob name of a recording if it is known locally (no service call)"""
+        return self._audio_blob_names.get(audio_id)
+    
+    def find_audio_blob(self, audio_id: str, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve a recording's blob name from its audio_id
+        
+        Recently uploaded recordings are resolved from memory. Otherwise the
+        blobs under the recording's prefix are listed, which requires the
+        session_id for recordings that were uploaded with one.
+        
+        Args:
+            audio_id: Audio ID returned by the upload
+            session_id: Session ID the recording was uploaded with (if any)
+        
+        Returns:
+            Blob name, or None if the recording was not found
+        """
+        blob_name = self.get_cached_audio_blob(audio_id)
+        if blob_name is not None:
+            return blob_name
+        
+        if session_id and session_id != 'no-session':
+            prefix = f"audio/{session_id}/{audio_id}_"
+        else:
+            prefix = f"audio/{audio_id}_"
+        
+        def list_first(client: BlobServiceClient) -> Optional[str]:
+            container_client = client.get_container_client(self.container_name)
+            for blob in container_client.list_blobs(name_starts_with=prefix, results_per_page=2):
+                if not blob.name.endswith(ANALYSIS_SIDECAR_SUFFIX):
+                    return blob.name
+            return None
+        
+        blob_name = self._call_with_reconnect(list_first)
+        if blob_name is not None:
+            self.remember_audio_blob(audio_id, blob_name)
+        return blob_name
     
     def delete_audio_file(self, blob_url: str) -> bool:
         """
@@ -296,16 +1203,168 @@ class AudioBlobStorageClient:
             True if deleted successfully
         """
         try:
-            blob_name = blob_url.split(f'{self.container_name}/')[-1]
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
+            blob_name = self.blob_name_from_url(blob_url)
             
-            blob_client.delete_blob()
+            self._call_with_reconnect(
+                lambda client: client.get_blob_client(
+                    container=self.container_name,
+                    blob=blob_name
+                ).delete_blob()
+            )
             logger.info(f"Deleted audio file: {blob_name}")
+            self._delete_analysis_sidecar(blob_name)
             return True
             
         except AzureError as e:
             logger.error(f"Error deleting audio file: {e}")
             return False
+    
+    def _delete_analysis_sidecar(self, blob_name: str) -> None:
+        """Delete the analysis sidecar of a recording (if there is one)"""
+        try:
+            self._call_with_reconnect(
+                lambda client: client.get_blob_client(
+                    container=self.container_name,
+                    blob=f"{blob_name}{ANALYSIS_SIDECAR_SUFFIX}"
+                ).delete_blob()
+            )
+        except ResourceNotFoundError:
+            pass
+        except AzureError as e:
+            logger.warning(f"Failed to delete analysis of {blob_name}: {e}")
+    
+    def _stream_blob_name(self, session_id: str) -> str:
+        """Staging blob that collects the chunks of an in-progress recording"""
+        return f"{STREAM_BLOB_PREFIX}/{session_id}/recording"
+    
+    @staticmethod
+    def _stream_block_id(sequence: int) -> str:
+        """Fixed-length block id for a chunk sequence number"""
+        return base64.b64encode(f"{sequence:08d}".encode('ascii')).decode('ascii')
+    
+    @staticmethod
+    def _stream_sequence(block_id: str) -> Optional[int]:
+        """Inverse of _stream_block_id (None for foreign block ids)"""
+        try:
+            return int(base64.b64decode(block_id).decode('ascii'))
+        except (ValueError, UnicodeDecodeError):
+            return None
+    
+    def stage_stream_chunk(self, session_id: str, sequence: int, data: bytes) -> None:
+        """
+        Stage one recording chunk as an uncommitted block of the staging blob
+        
+        Re-sending the same sequence number replaces the staged chunk, so client
+        retries are idempotent and chunks may arrive out of order.
+        
+        Args:
+            session_id: Recording session ID
+            sequence: Zero-based chunk sequence number
+            data: Chunk bytes
+        """
+        self._ensure_container_exists()
+        blob_name = self._stream_blob_name(session_id)
+        block_id = self._stream_block_id(sequence)
+        self._call_with_reconnect(
+            lambda client: client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            ).stage_block(block_id=block_id, data=data, length=len(data))
+        )
+    
+    def get_stream_chunks(self, session_id: str) -> tuple[Dict[int, int], Dict[int, int]]:
+        """
+        List the chunks of a recording
+        
+        Args:
+            session_id: Recording session ID
+        
+        Returns:
+            Tuple of (committed, uncommitted) maps of sequence number -> size in bytes
+        """
+        blob_name = self._stream_blob_name(session_id)
+        try:
+            committed, uncommitted = self._call_with_reconnect(
+                lambda client: client.get_blob_client(
+                    container=self.container_name,
+                    blob=blob_name
+                ).get_block_list('all')
+            )
+        except ResourceNotFoundError:
+            return {}, {}
+        
+        def to_map(blocks) -> Dict[int, int]:
+            chunks = {}
+            for block in blocks:
+                sequence = self._stream_sequence(block.id)
+                if sequence is not None:
+                    chunks[sequence] = block.size
+            return chunks
+        
+        return to_map(committed), to_map(uncommitted)
+    
+    def commit_stream(self, session_id: str, sequences: List[int]) -> None:
+        """
+        Commit staged chunks into the staging blob in the given order
+        
+        Args:
+            session_id: Recording session ID
+            sequences: Chunk sequence numbers in playback order
+        """
+        blob_name = self._stream_blob_name(session_id)
+        block_list = [BlobBlock(block_id=self._stream_block_id(sequence)) for sequence in sequences]
+        self._call_with_reconnect(
+            lambda client: client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            ).commit_block_list(block_list)
+        )
+        logger.info(f"Committed {len(sequences)} chunks for stream: {blob_name}")
+    
+    def download_stream(self, session_id: str) -> BinaryIO:
+        """
+        Download the committed staging blob into a spooled temporary file
+        
+        Args:
+            session_id: Recording session ID
+        
+        Returns:
+            Seekable stream positioned at the start (the caller must close it)
+        """
+        blob_name = self._stream_blob_name(session_id)
+        spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_MEMORY)
+        
+        def download(client: BlobServiceClient) -> None:
+            spool.seek(0)
+            spool.truncate()
+            client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            ).download_blob(max_concurrency=self.block_uploader.max_concurrency).readinto(spool)
+        
+        try:
+            self._call_with_reconnect(download)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+    
+    def delete_stream(self, session_id: str) -> None:
+        """
+        Delete the staging blob of a recording (including uncommitted chunks)
+        
+        Args:
+            session_id: Recording session ID
+        """
+        blob_name = self._stream_blob_name(session_id)
+        try:
+            self._call_with_reconnect(
+                lambda client: client.get_blob_client(
+                    container=self.container_name,
+                    blob=blob_name
+                ).delete_blob()
+            )
+            logger.info(f"Deleted stream staging blob: {blob_name}")
+        except ResourceNotFoundError:
+            pass
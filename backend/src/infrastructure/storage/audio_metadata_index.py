@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    audio_id TEXT PRIMARY KEY,
+    session_id TEXT,
+    blob_name TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    duration REAL,
+    format TEXT,
+    original_format TEXT,
+    audio_type TEXT,
+    uploaded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recordings_session_time ON recordings (session_id, uploaded_at, audio_id);
+CREATE INDEX IF NOT EXISTS idx_recordings_time ON recordings (uploaded_at, audio_id);
+"""
+
+_COLUMNS = "audio_id, session_id, blob_name, size_bytes, duration, format, original_format, audio_type, uploaded_at"
+
+
+@dataclass
+class AudioRecord:
+    """Index entry for one stored recording"""
+    audio_id: str
+    session_id: Optional[str]
+    blob_name: str
+    size_bytes: int
+    duration: Optional[float]
+    format: str
+    original_format: Optional[str]
+    audio_type: Optional[str]
+    uploaded_at: datetime
+
+
+def _format_time(value: datetime) -> str:
+    # Fixed-width ISO timestamps sort correctly as text
+    return value.isoformat(timespec='microseconds')
+
+
+class AudioMetadataIndex:
+    """
+    Local SQLite index of stored recordings
+    
+    Maps audio_id / session_id / upload time to the blob name and basic audio
+    properties so lookups do not need Blob listing. The database uses WAL mode
+    so several worker processes can share one file. The index is a cache of the
+    blob metadata: entries missing from it are still found by listing.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the index database
+        
+        Args:
+            db_path: SQLite database file path (":memory:" for an in-memory index)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory and db_path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        logger.info(f"Opened audio metadata index: {db_path}")
+    
+    def add(self, record: AudioRecord) -> None:
+        """Insert or replace a recording"""
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO recordings ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.audio_id,
+                    record.session_id,
+                    record.blob_name,
+                    record.size_bytes,
+                    record.duration,
+                    record.format,
+                    record.original_format,
+                    record.audio_type,
+                    _format_time(record.uploaded_at)
+                )
+            )
+            self._conn.commit()
+    
+    def get(self, audio_id: str) -> Optional[AudioRecord]:
+        """Look up a recording by audio_id"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM recordings WHERE audio_id = ?",
+                (audio_id,)
+            ).fetchone()
+        return self._to_record(row) if row else None
+    
+    def query(
+        self,
+        session_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[AudioRecord]:
+        """
+        List recordings in upload order (keyset pagination)
+        
+        Args:
+            session_id: Only recordings of this session
+            start: Only recordings uploaded at or after this time
+            end: Only recordings uploaded before this time
+            limit: Maximum number of recordings
+            after: (uploaded_at, audio_id) of the last recording of the previous page
+        
+        Returns:
+            Recordings ordered by (uploaded_at, audio_id)
+        """
+        conditions = []
+        params: list = []
+        if session_id is not None:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        if start is not None:
+            conditions.append("uploaded_at >= ?")
+            params.append(_format_time(start))
+        if end is not None:
+            conditions.append("uploaded_at < ?")
+            params.append(_format_time(end))
+        if after is not None:
+            conditions.append("(uploaded_at, audio_id) > (?, ?)")
+            params.extend([_format_time(after[0]), after[1]])
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM recordings {where} ORDER BY uploaded_at, audio_id LIMIT ?",
+                params
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> AudioRecord:
+        return AudioRecord(
+            audio_id=row["audio_id"],
+            session_id=row["session_id"],
+            blob_name=row["blob_name"],
+            size_bytes=row["size_bytes"],
+            duration=row["duration"],
+            format=row["format"],
+            original_format=row["original_format"],
+            audio_type=row["audio_type"],
+            uploaded_at=datetime.fromisoformat(row["uploaded_at"])
+        )
@@ -0,0 +1,162 @@
+import base64
+import hashlib
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import BinaryIO, Dict, List, Optional, Set
+from azure.storage.blob import BlobBlock
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying when staging a block
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def make_block_id(index: int, data: bytes) -> str:
+    """
+    Build a deterministic block id from the block position and content
+    
+    All ids have the same length (required by Blob Storage), and an id only
+    matches a previously staged block if both position and content are equal.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    return base64.b64encode(f"{index:06d}-{digest}".encode('ascii')).decode('ascii')
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a Blob SDK error is worth retrying"""
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+    if isinstance(error, HttpResponseError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+class BlockBlobUploader:
+    """
+    Staged block upload for large blobs
+    
+    The stream is split into fixed-size blocks which are staged in parallel with
+    a bounded number of blocks in memory, then committed with a single
+    commit_block_list call. Each block is retried on transient failures.
+    
+    Uploads are resumable: block ids are derived from position and content, so
+    calling upload() again for the same blob and stream skips blocks that are
+    already staged (uncommitted) and only sends the missing ones.
+    """
+    
+    def __init__(
+        self,
+        block_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        max_block_retries: int = 3,
+        retry_backoff_seconds: float = 0.5
+    ):
+        """
+        Initialize the uploader
+        
+        Args:
+            block_size: Size of each staged block in bytes
+            max_concurrency: Number of blocks staged in parallel
+            max_block_retries: Retries per block on transient errors
+            retry_backoff_seconds: Base delay for exponential backoff between retries
+        """
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.block_size = block_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_block_retries = max_block_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+    
+    def _staged_blocks(self, blob_client) -> Set[str]:
+        """Ids of blocks already staged but not yet committed"""
+        try:
+            _, uncommitted = blob_client.get_block_list('uncommitted')
+        except HttpResponseError as e:
+            if e.status_code == 404:
+                return set()
+            raise
+        return {block.id for block in uncommitted}
+    
+    def _stage_block(self, blob_client, block_id: str, data: bytes) -> None:
+        """Stage one block, retrying transient failures with exponential backoff"""
+        attempt = 0
+        while True:
+            try:
+                blob_client.stage_block(block_id=block_id, data=data, length=len(data))
+                return
+            except Exception as e:
+                if attempt >= self.max_block_retries or not is_transient_error(e):
+                    raise
+                delay = self.retry_backoff_seconds * (2 ** attempt)
+                attempt += 1
+                logger.warning(f"Retrying block {block_id} in {delay:.1f}s (attempt {attempt}): {e}")
+                time.sleep(delay)
+    
+    def upload(
+        self,
+        blob_client,
+        stream: BinaryIO,
+        metadata: Optional[Dict[str, str]] = None,
+        content_settings=None
+    ) -> int:
+        """
+        Upload a stream as a block blob
+        
+        Args:
+            blob_client: azure.storage.blob.BlobClient for the target blob
+            stream: Readable stream positioned at the start of the data
+            metadata: Blob metadata set on commit
+            content_settings: Optional ContentSettings set on commit
+        
+        Returns:
+            Number of blocks in the committed blob
+        """
+        already_staged = self._staged_blocks(blob_client)
+        block_ids: List[str] = []
+        skipped = 0
+        # Bound memory to a window of blocks being staged
+        window = self.max_concurrency * 2
+        in_flight: Set[Future] = set()
+        
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix='blob-block'
+        ) as executor:
+            try:
+                index = 0
+                while True:
+                    data = stream.read(self.block_size)
+                    if not data:
+                        break
+                    block_id = make_block_id(index, data)
+                    block_ids.append(block_id)
+                    index += 1
+                    
+                    if block_id in already_staged:
+                        skipped += 1
+                        continue
+                    
+                    if len(in_flight) >= window:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    in_flight.add(executor.submit(self._stage_block, blob_client, block_id, data))
+                
+                for future in in_flight:
+                    future.result()
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+        
+        blob_client.commit_block_list(
+            [BlobBlock(block_id=block_id) for block_id in block_ids],
+            metadata=metadata,
+            content_settings=content_settings
+        )
+        
+        if skipped:
+            logger.info(f"Resumed block upload: {skipped}/{len(block_ids)} blocks were already staged")
+        return len(block_ids)
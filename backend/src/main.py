@@ -1,22 +1,82 @@
 """
 FastAPI アプリケーション
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-import uvicorn
+from typing import List
 import os
 
 from presentation.middleware.cors_middleware import setup_cors_middleware
+from presentation.middleware.upload_size_limit_middleware import setup_upload_size_limit_middleware
+from presentation.middleware.metrics_middleware import setup_metrics_middleware
+from presentation.middleware.request_context_middleware import setup_request_context_middleware
 from presentation.api.controllers.health_controller import HealthController
 from presentation.api.controllers.sessions_proxy_controller import SessionsProxyController
-from presentation.api.controllers import audio_upload_controller
-from shared.monitoring.health import HealthCheckService, SimpleHealthCheck
-from shared.utils.logging import setup_logging, get_logger
+from presentation.api.controllers.webrtc_proxy_controller import WebRTCProxyController
+from presentation.api.controllers import audio_upload_controller, audio_stream_controller, metrics_controller
+from application.services.audio_upload_service import MAX_AUDIO_FILE_SIZE_BYTES
+from application.services.audio_stream_service import MAX_STREAM_CHUNK_SIZE_BYTES
+from infrastructure.azure.azure_health_check import AzureOpenAIHealthCheck
+from infrastructure.configuration.dependencies import (
+    get_azure_openai_client,
+    startup_dependencies,
+    shutdown_dependencies
+)
+from shared.monitoring.health import CachedHealthCheck, HealthCheckService, IHealthCheck, SimpleHealthCheck
+from shared.utils.logging import setup_logging, shutdown_logging, get_logger
 
 # ログ設定
 log_level = os.getenv("LOG_LEVEL", "INFO")
-setup_logging(level=log_level, format_type="detailed")
+setup_logging(
+    level=log_level,
+    format_type=os.getenv("LOG_FORMAT", "detailed"),
+    async_handler=os.getenv("LOG_ASYNC", "true").lower() == "true",
+    sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+)
 logger = get_logger("main")
 
+# multipart/form-data の境界やメタデータフィールド分の許容量
+UPLOAD_MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+# /metrics とリクエストのメトリクス収集を有効にするか
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリケーションのライフサイクル管理（共有クライアントの開始・終了）"""
+    logger.info("Starting shared clients...")
+    await startup_dependencies()
+    await app.state.health_service.start()
+    yield
+    logger.info("Shutting down shared clients...")
+    await app.state.health_service.close()
+    await shutdown_dependencies()
+    shutdown_logging()
+
+
+def create_health_checks() -> List[IHealthCheck]:
+    """ヘルスチェックを作成
+    
+    Azure OpenAI への確認はロードバランサーのプローブごとに行わないよう、
+    結果をキャッシュしてバックグラウンドで更新します。
+    """
+    health_checks: List[IHealthCheck] = [SimpleHealthCheck(name="api")]
+    
+    azure_configured = bool(os.getenv("AZURE_OPENAI_ENDPOINTS") or os.getenv("AZURE_OPENAI_ENDPOINT"))
+    if azure_configured and os.getenv("AZURE_HEALTH_CHECK_ENABLED", "true").lower() == "true":
+        refresh_interval = float(os.getenv("AZURE_HEALTH_CHECK_REFRESH_SECONDS", "15"))
+        health_checks.append(CachedHealthCheck(
+            AzureOpenAIHealthCheck(get_azure_openai_client),
+            ttl_seconds=float(os.getenv("AZURE_HEALTH_CHECK_TTL_SECONDS", "30")),
+            stale_seconds=float(os.getenv("AZURE_HEALTH_CHECK_STALE_SECONDS", "60")),
+            refresh_interval=refresh_interval if refresh_interval > 0 else None,
+            timeout_seconds=float(os.getenv("AZURE_HEALTH_CHECK_TIMEOUT_SECONDS", "5"))
+        ))
+    
+    return health_checks
+
 
 def create_app() -> FastAPI:
     """FastAPIアプリケーション作成"""
@@ -27,7 +87,21 @@ def create_app() -> FastAPI:
         description="Azure OpenAI Realtime API プロキシサーバー",
         version="0.1.0",
         # トレイリングスラッシュの有無に関わらず同じハンドラーを使用
-        redirect_slashes=True
+        redirect_slashes=True,
+        lifespan=lifespan
+    )
+    
+    # アップロードサイズ制限（multipartのオーバーヘッド分を許容）
+    # CORSヘッダーを413レスポンスにも付与するため、CORSより内側に登録する
+    setup_upload_size_limit_middleware(
+        app,
+        max_body_size=MAX_AUDIO_FILE_SIZE_BYTES + UPLOAD_MULTIPART_OVERHEAD_BYTES,
+        path_prefixes=["/audio/upload"]
+    )
+    setup_upload_size_limit_middleware(
+        app,
+        max_body_size=MAX_STREAM_CHUNK_SIZE_BYTES,
+        path_prefixes=["/audio/streams"]
     )
     
     # CORS設定
@@ -38,15 +112,23 @@ def create_app() -> FastAPI:
     logger.info(f"Configuring CORS for origins: {frontend_origins}")
     setup_cors_middleware(app, frontend_origins)
     
+    # メトリクス収集（413・CORSのプリフライトを含め全リクエストを計測するため最も外側に登録）
+    if METRICS_ENABLED:
+        setup_metrics_middleware(app)
+    
+    # リクエストIDをログの相関IDとして設定（全ミドルウェアのログに付与するため最も外側に登録）
+    setup_request_context_middleware(app)
+    
     # ヘルスチェックサービス
-    health_service = HealthCheckService(
-        health_checks=[SimpleHealthCheck(name="api")]
-    )
+    health_service = HealthCheckService(health_checks=create_health_checks())
+    app.state.health_service = health_service
     
     # コントローラー登録
     logger.info("Registering API controllers...")
     health_controller = HealthController(health_service)
     app.include_router(health_controller.router)
+    if METRICS_ENABLED:
+        app.include_router(metrics_controller.router)
     
     # プロキシコントローラー登録
     try:
@@ -55,10 +137,19 @@ def create_app() -> FastAPI:
         app.include_router(sessions_controller.router)
         logger.info("Sessions proxy controller registered")
         
+        # WebRTC SDP シグナリングプロキシ登録
+        webrtc_controller = WebRTCProxyController()
+        app.include_router(webrtc_controller.router)
+        logger.info("WebRTC proxy controller registered")
+        
         # 音声アップロードコントローラー登録
         app.include_router(audio_upload_controller.router)
         logger.info("Audio upload controller registered")
         
+        # 分割アップロードコントローラー登録
+        app.include_router(audio_stream_controller.router)
+        logger.info("Audio stream controller registered")
+    
     except Exception as e:
         logger.error(f"Failed to register proxy controllers: {e}")
         raise
@@ -71,11 +162,10 @@ app = create_app()
 
 
 if __name__ == "__main__":
-    host = os.getenv("HOST", "0.0.0.0")
-    port = int(os.getenv("PORT", "8000"))
+    import server
     
-    logger.info(f"Starting server on {host}:{port}")
     logger.info(f"Azure OpenAI Endpoint: {os.getenv('AZURE_OPENAI_ENDPOINT', 'Not configured')}")
     logger.info(f"API Version: {os.getenv('AZURE_OPENAI_API_VERSION', '2024-10-01-preview')}")
     
-    uvicorn.run("main:app", host=host, port=port, reload=True)
+    # APP_ENV=development でホットリロード、それ以外は複数ワーカーで起動
+    server.run()
@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Body, HTTPException, Depends, Path, Request
+import logging
+from application.services.audio_upload_service import AudioUploadService
+from application.services.audio_stream_service import AudioStreamService
+from application.dto.audio_dto import AudioStreamChunkResponse, AudioStreamCompleteRequest, AudioUploadResponse
+from infrastructure.configuration.dependencies import (
+    get_audio_blob_storage_client,
+    get_audio_metadata_index,
+    get_upload_deduplicator
+)
+from infrastructure.audio.transcoding_pool import TranscodingQueueFullError, TranscodingTimeoutError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/audio/streams", tags=["audio"])
+
+
+# Dependency to get AudioStreamService
+def get_audio_stream_service() -> AudioStreamService:
+    """分割アップロードサービスの依存性注入"""
+    blob_storage_client = get_audio_blob_storage_client()
+    return AudioStreamService(
+        blob_storage_client,
+        AudioUploadService(
+            blob_storage_client,
+            deduplicator=get_upload_deduplicator(),
+            metadata_index=get_audio_metadata_index()
+        )
+    )
+
+
+@router.put("/{session_id}/chunks/{sequence}", response_model=AudioStreamChunkResponse)
+async def upload_audio_chunk(
+    request: Request,
+    session_id: str = Path(..., description="Session ID"),
+    sequence: int = Path(..., ge=0, description="Zero-based chunk sequence number"),
+    stream_service: AudioStreamService = Depends(get_audio_stream_service)
+) -> AudioStreamChunkResponse:
+    """
+    録音中の音声チャンクを受け付けます
+    
+    - **session_id**: 録音セッションID
+    - **sequence**: チャンクの連番（0始まり、再送時は同じ番号で上書き）
+    - **body**: チャンクのバイト列（MediaRecorder の dataavailable の Blob をそのまま送信）
+    
+    Returns:
+        AudioStreamChunkResponse: 受信結果
+    """
+    try:
+        data = await request.body()
+        return await stream_service.append_chunk(session_id, sequence, data)
+    except ValueError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error staging audio chunk: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error during chunk upload")
+
+
+@router.post(
+    "/{session_id}/complete",
+    response_model=AudioUploadResponse,
+    status_code=201,
+    responses={
+        503: {"description": "Transcoding queue is full (see Retry-After)"},
+        504: {"description": "Transcoding did not finish within its timeout"}
+    }
+)
+async def complete_audio_stream(
+    session_id: str = Path(..., description="Session ID"),
+    complete_request: AudioStreamCompleteRequest = Body(...),
+    stream_service: AudioStreamService = Depends(get_audio_stream_service)
+) -> AudioUploadResponse:
+    """
+    受信済みチャンクを結合し、変換してAzure Blob Storageに保存します
+    
+    失敗時はチャンクが保持されるため、同じリクエストを再送できます。
+    
+    Returns:
+        AudioUploadResponse: アップロード結果とBlob URL
+    """
+    try:
+        result = await stream_service.complete(
+            session_id=session_id,
+            total_chunks=complete_request.total_chunks,
+            audio_format=complete_request.format.lower().lstrip('.'),
+            metadata=complete_request.metadata
+        )
+        logger.info(f"Successfully completed audio stream: {result.audio_id}")
+        return result
+    except TranscodingQueueFullError as e:
+        logger.warning(f"Transcoding queue full, rejecting stream completion: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Audio processing is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except TranscodingTimeoutError as e:
+        logger.warning(f"Transcoding timed out, rejecting stream completion: {e}")
+        raise HTTPException(status_code=504, detail="Audio processing timed out")
+    except ValueError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error completing audio stream: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error during audio upload")
+
+
+@router.delete("/{session_id}", status_code=204)
+async def abort_audio_stream(
+    session_id: str = Path(..., description="Session ID"),
+    stream_service: AudioStreamService = Depends(get_audio_stream_service)
+) -> None:
+    """受信済みチャンクを破棄します"""
+    try:
+        await stream_service.abort(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error aborting audio stream: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,9 +1,27 @@
-from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Depends, Path, Query
 from typing import Optional
+from datetime import datetime
+import asyncio
 import logging
+import os
 from application.services.audio_upload_service import AudioUploadService
-from application.dto.audio_dto import AudioUploadResponse
-from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient
+from application.services.audio_sas_service import AudioNotFoundError, AudioSasService
+from application.services.audio_recording_service import AudioRecordingService
+from application.dto.audio_dto import (
+    AudioRecordingInfo,
+    AudioRecordingListResponse,
+    AudioSasBatchRequest,
+    AudioSasBatchResponse,
+    AudioSasResponse,
+    AudioUploadResponse
+)
+from application.services.upload_deduplicator import IdempotencyKeyConflictError
+from infrastructure.configuration.dependencies import (
+    get_audio_blob_storage_client,
+    get_audio_metadata_index,
+    get_upload_deduplicator
+)
+from infrastructure.audio.transcoding_pool import TranscodingQueueFullError, TranscodingTimeoutError
 
 logger = logging.getLogger(__name__)
 
@@ -13,15 +31,44 @@ router = APIRouter(prefix="/audio", tags=["audio"])
 # Dependency to get AudioUploadService
 def get_audio_upload_service() -> AudioUploadService:
     """音声アップロードサービスの依存性注入"""
-    blob_storage_client = AudioBlobStorageClient()
-    return AudioUploadService(blob_storage_client)
+    blob_storage_client = get_audio_blob_storage_client()
+    return AudioUploadService(
+        blob_storage_client,
+        deduplicator=get_upload_deduplicator(),
+        metadata_index=get_audio_metadata_index()
+    )
 
 
-@router.post("/upload", response_model=AudioUploadResponse, status_code=201)
+# Dependency to get AudioSasService
+def get_audio_sas_service() -> AudioSasService:
+    """SAS URL発行サービスの依存性注入"""
+    return AudioSasService(get_audio_blob_storage_client(), metadata_index=get_audio_metadata_index())
+
+
+# Dependency to get AudioRecordingService
+def get_audio_recording_service() -> AudioRecordingService:
+    """音声ファイル検索サービスの依存性注入"""
+    metadata_index = get_audio_metadata_index()
+    if metadata_index is None:
+        raise HTTPException(status_code=503, detail="Audio metadata index is disabled")
+    return AudioRecordingService(get_audio_blob_storage_client(), metadata_index)
+
+
+@router.post(
+    "/upload",
+    response_model=AudioUploadResponse,
+    status_code=201,
+    responses={
+        422: {"description": "Idempotency-Key was reused for a different file"},
+        503: {"description": "Transcoding queue is full (see Retry-After)"},
+        504: {"description": "Transcoding did not finish within its timeout"}
+    }
+)
 async def upload_audio_file(
     audio_file: UploadFile = File(..., description="Audio file to upload"),
     metadata: Optional[str] = Form(None, description="Audio metadata as JSON string"),
     session_id: Optional[str] = Header(None, alias="session-id", description="Session ID"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Key identifying retries of the same upload"),
     audio_service: AudioUploadService = Depends(get_audio_upload_service)
 ) -> AudioUploadResponse:
     """
@@ -30,6 +77,7 @@ async def upload_audio_file(
     - **audio_file**: アップロードする音声ファイル (WebM/Opus推奨)
     - **metadata**: 音声メタデータ (JSON形式)
     - **session-id**: 関連するセッションID (ヘッダー)
+    - **Idempotency-Key**: 再送を識別するキー (ヘッダー、省略時は内容のハッシュで重複判定)
     
     Returns:
         AudioUploadResponse: アップロード結果とBlob URL
@@ -39,28 +87,48 @@ async def upload_audio_file(
         if not audio_file.filename:
             raise HTTPException(status_code=400, detail="Audio file is required")
         
-        # ファイル内容を読み取り
-        audio_data = await audio_file.read()
+        # ファイルサイズを取得（内容はメモリに読み込まない）
+        file_size = audio_file.size
+        if file_size is None:
+            file_size = audio_file.file.seek(0, os.SEEK_END)
+            audio_file.file.seek(0)
         
         # ファイルサイズとタイプの検証
         audio_service.validate_audio_file(
             content_type=audio_file.content_type or "audio/webm",
-            file_size=len(audio_data)
+            file_size=file_size
         )
         
-        logger.info(f"Uploading audio file: {audio_file.filename} ({len(audio_data)} bytes)")
+        logger.info(f"Uploading audio file: {audio_file.filename} ({file_size} bytes)")
         
-        # 音声ファイルをアップロード
+        # 音声ファイルをアップロード（スプールされたファイルからストリーミング）
         result = await audio_service.upload_audio(
-            audio_data=audio_data,
+            audio_file=audio_file.file,
             filename=audio_file.filename,
             metadata_json=metadata,
-            session_id=session_id
+            session_id=session_id,
+            size_bytes=file_size,
+            idempotency_key=idempotency_key
         )
         
         logger.info(f"Successfully uploaded audio file: {result.audio_id}")
         return result
-        
+    
+    except HTTPException:
+        raise
+    except IdempotencyKeyConflictError as e:
+        logger.warning(f"Idempotency key conflict: {e}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except TranscodingQueueFullError as e:
+        logger.warning(f"Transcoding queue full, rejecting upload: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Audio processing is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except TranscodingTimeoutError as e:
+        logger.warning(f"Transcoding timed out, rejecting upload: {e}")
+        raise HTTPException(status_code=504, detail="Audio processing timed out")
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -73,15 +141,119 @@ async def upload_audio_file(
 async def audio_service_health():
     """音声サービスのヘルスチェック"""
     try:
-        # Azure Blob Storage接続テスト
-        blob_client = AudioBlobStorageClient()
-        # 単純な接続確認
+        # 共有クライアントを利用（コンテナ確認は作成時に一度だけ行われる）
+        blob_client = await asyncio.to_thread(get_audio_blob_storage_client)
         return {
             "status": "healthy",
             "service": "audio-upload",
-            "timestamp": logger.info("Audio service health check passed"),
-            "storage": "connected"
+            "timestamp": datetime.utcnow().isoformat(),
+            "storage": "connected" if blob_client.container_ready else "pending"
         }
     except Exception as e:
         logger.error(f"Audio service health check failed: {e}")
         raise HTTPException(status_code=503, detail="Audio service unavailable")
+
+
+@router.post("/sas/batch", response_model=AudioSasBatchResponse)
+async def issue_audio_sas_batch(
+    batch_request: AudioSasBatchRequest,
+    sas_service: AudioSasService = Depends(get_audio_sas_service)
+) -> AudioSasBatchResponse:
+    """
+    複数の音声ファイルのSAS URLを一括で発行します
+    
+    - **items**: 音声IDと（アップロード時に指定していれば）セッションID、最大500件
+    - **expire_minutes**: 有効期間（分）
+    
+    見つからなかった音声IDは not_found に含まれます。
+    """
+    try:
+        return await sas_service.get_sas_batch(batch_request.items, batch_request.expire_minutes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error issuing SAS URLs: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/{audio_id}/sas", response_model=AudioSasResponse)
+async def issue_audio_sas(
+    audio_id: str,
+    session_id: Optional[str] = Query(None, description="Session ID the audio was uploaded with"),
+    expire_minutes: int = Query(60, ge=1, le=1440, description="SAS URL lifetime in minutes"),
+    sas_service: AudioSasService = Depends(get_audio_sas_service)
+) -> AudioSasResponse:
+    """
+    既存の音声ファイルのSAS URLを発行します
+    
+    - **audio_id**: アップロード時に返された音声ID
+    - **session_id**: アップロード時のセッションID
+    - **expire_minutes**: 有効期間（分）
+    """
+    try:
+        return await sas_service.get_sas(audio_id, session_id, expire_minutes)
+    except AudioNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error issuing SAS URL: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/recordings", response_model=AudioRecordingListResponse)
+async def list_audio_recordings(
+    session_id: Optional[str] = Query(None, description="Filter by session ID"),
+    start: Optional[datetime] = Query(None, description="Uploaded at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Uploaded before (UTC)"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    recording_service: AudioRecordingService = Depends(get_audio_recording_service)
+) -> AudioRecordingListResponse:
+    """
+    保存済みの音声ファイルをアップロード順に一覧します（Blob一覧は使用しません）
+    
+    - **session_id**: セッションIDで絞り込み
+    - **start** / **end**: アップロード日時の範囲
+    - **limit** / **cursor**: ページング
+    """
+    try:
+        return await recording_service.list_recordings(session_id, start, end, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing audio recordings: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/recordings/{audio_id}", response_model=AudioRecordingInfo)
+async def get_audio_recording(
+    audio_id: str,
+    recording_service: AudioRecordingService = Depends(get_audio_recording_service)
+) -> AudioRecordingInfo:
+    """音声IDで保存済みの音声ファイルの情報を取得します"""
+    try:
+        recording = await recording_service.get_recording(audio_id)
+    except Exception as e:
+        logger.error(f"Error getting audio recording: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if recording is None:
+        raise HTTPException(status_code=404, detail=f"Audio not found: {audio_id}")
+    return recording
+
+
+@router.get("/sessions/{session_id}/recordings", response_model=AudioRecordingListResponse)
+async def list_session_audio_recordings(
+    session_id: str = Path(..., description="Session ID"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    recording_service: AudioRecordingService = Depends(get_audio_recording_service)
+) -> AudioRecordingListResponse:
+    """セッションの音声ファイルをアップロード順に一覧します"""
+    try:
+        return await recording_service.list_recordings(session_id=session_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing session audio recordings: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,17 @@
+"""
+メトリクスコントローラー
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from shared.monitoring.metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus テキスト形式の Content-Type
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus 形式のメトリクス（値はワーカープロセスごと）"""
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,10 +1,12 @@
 """
 Azure OpenAI Sessions API プロキシコントローラー
 """
-from fastapi import APIRouter, HTTPException, Header, Depends
+import math
+from fastapi import APIRouter, HTTPException, Header, Depends, Request
 from typing import Optional
 from application.interfaces.azure_proxy_service import IAzureProxyService
-from infrastructure.configuration.dependencies import get_azure_proxy_service
+from application.services.session_rate_limiter import RateLimitExceededError, SessionRateLimiter
+from infrastructure.configuration.dependencies import get_azure_proxy_service, get_session_rate_limiter
 from presentation.dto.proxy_dto import SessionCreateRequest, SessionCreateResponse, ErrorResponse
 from shared.utils.logging import get_logger
 
@@ -36,15 +38,24 @@ class SessionsProxyController:
                 401: {"model": ErrorResponse, "description": "Authentication error"},
                 429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
                 502: {"model": ErrorResponse, "description": "Azure OpenAI API error"},
+                503: {"model": ErrorResponse, "description": "Azure OpenAI temporarily unavailable (circuit open)"},
                 500: {"model": ErrorResponse, "description": "Internal server error"}
             }
         )
     
+    @staticmethod
+    def _client_key(rate_limiter: SessionRateLimiter, http_request: Request, client_id: Optional[str]) -> str:
+        """レート制限に使うクライアントの識別子（信頼できる送信元の X-Client-Id、それ以外はIPアドレス）"""
+        return rate_limiter.client_key(http_request.client.host if http_request.client else None, client_id)
+    
     async def create_session_proxy(
         self,
         request: SessionCreateRequest,
+        http_request: Request,
         api_key: Optional[str] = Header(None, alias="api-key"),  # フロントエンドから受信するが無視
-        azure_proxy_service: IAzureProxyService = Depends(get_azure_proxy_service)
+        client_id: Optional[str] = Header(None, alias="X-Client-Id"),
+        azure_proxy_service: IAzureProxyService = Depends(get_azure_proxy_service),
+        rate_limiter: Optional[SessionRateLimiter] = Depends(get_session_rate_limiter)
     ) -> SessionCreateResponse:
         """Azure OpenAI Sessions API プロキシエンドポイント
         
@@ -53,12 +64,15 @@ class SessionsProxyController:
         
         Args:
             request: セッション作成リクエスト
+            http_request: HTTPリクエスト（クライアントのIPアドレス取得用）
             api_key: フロントエンドからのapi-keyヘッダー（使用しない）
+            client_id: クライアントID（信頼できる送信元からの場合のみレート制限の単位）
             azure_proxy_service: Azure プロキシサービス
-            
+            rate_limiter: セッション作成のレート制限（無効時はNone）
+        
         Returns:
             Azure OpenAI APIからのセッション作成レスポンス
-            
+        
         Raises:
             HTTPException: プロキシ処理中のエラー
         """
@@ -67,14 +81,24 @@ class SessionsProxyController:
             if api_key:
                 logger.debug("Received api-key header from frontend (ignored for security)")
             
-            logger.info(f"Session creation request: model={request.model}, voice={request.voice}")
+            logger.info("Session creation request: model=%s, voice=%s", request.model, request.voice)
+            
+            # Azure のクォータを特定のクライアントが使い切らないよう制限
+            if rate_limiter is not None:
+                await rate_limiter.acquire(self._client_key(rate_limiter, http_request, client_id), request.model)
             
             # Azure プロキシサービスに処理を委譲
             response = await azure_proxy_service.create_session_proxy(request)
             
-            logger.info(f"Session created successfully: {response.id}")
+            logger.info("Session created successfully: %s", response.id)
             return response
-            
+        
+        except RateLimitExceededError as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
         except HTTPException:
             # HTTPExceptionはそのまま再発生
             raise
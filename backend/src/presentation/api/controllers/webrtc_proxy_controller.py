@@ -0,0 +1,152 @@
+"""
+WebRTC SDP シグナリングプロキシコントローラー
+"""
+import math
+from fastapi import APIRouter, HTTPException, Header, Depends, Query, Request
+from fastapi.responses import Response
+from typing import Optional
+from application.interfaces.azure_proxy_service import IAzureProxyService
+from application.services.session_rate_limiter import RateLimitExceededError, SessionRateLimiter
+from infrastructure.configuration.dependencies import get_azure_proxy_service, get_session_rate_limiter
+from presentation.api.controllers.sessions_proxy_controller import SessionsProxyController
+from presentation.dto.proxy_dto import WebRTCSessionCreateRequest, WebRTCSessionCreateResponse, ErrorResponse
+from shared.utils.logging import get_logger
+
+logger = get_logger("webrtc_proxy")
+
+# SDP Offer の最大サイズ（通常は数KB）
+MAX_SDP_OFFER_BYTES = 64 * 1024
+
+
+class WebRTCProxyController:
+    """WebRTC SDP シグナリングプロキシコントローラー
+    
+    フロントエンドの SDP Offer を受け取り、セッション作成と同じ接続プールを使って
+    Azure OpenAI Realtime API に転送します。セッション作成と SDP 交換を1回の
+    リクエストで行うエンドポイントも提供します。
+    """
+    
+    def __init__(self):
+        """初期化"""
+        self.router = APIRouter(prefix="/webrtc", tags=["webrtc-proxy"])
+        self._setup_routes()
+    
+    def _setup_routes(self):
+        """ルート設定"""
+        error_responses = {
+            400: {"model": ErrorResponse, "description": "Invalid ephemeral key or SDP"},
+            401: {"model": ErrorResponse, "description": "Ephemeral key rejected by Azure OpenAI"},
+            429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+            502: {"model": ErrorResponse, "description": "Azure OpenAI API error"},
+            503: {"model": ErrorResponse, "description": "Azure OpenAI temporarily unavailable (circuit open)"},
+            500: {"model": ErrorResponse, "description": "Internal server error"}
+        }
+        self.router.add_api_route(
+            "/sdp",
+            self.exchange_sdp,
+            methods=["POST"],
+            status_code=201,  # Azure APIに合わせて201
+            response_class=Response,
+            responses={201: {"content": {"application/sdp": {}}, "description": "SDP answer"}, **error_responses}
+        )
+        self.router.add_api_route(
+            "/session",
+            self.create_session_with_sdp,
+            methods=["POST"],
+            status_code=200,
+            response_model=WebRTCSessionCreateResponse,
+            responses=error_responses
+        )
+    
+    async def exchange_sdp(
+        self,
+        http_request: Request,
+        model: str = Query(..., description="Azure OpenAI deployment model name"),
+        authorization: Optional[str] = Header(None),
+        azure_proxy_service: IAzureProxyService = Depends(get_azure_proxy_service)
+    ) -> Response:
+        """WebRTC SDP プロキシエンドポイント
+        
+        フロントエンドが Azure OpenAI に直接送っていた SDP Offer（application/sdp、
+        Authorization: Bearer <エフェメラルキー>）をそのまま受け取り、SDP Answer を返します。
+        
+        Args:
+            http_request: HTTPリクエスト（SDP Offer の本文）
+            model: デプロイメント名
+            authorization: エフェメラルキーを含む Authorization ヘッダー
+            azure_proxy_service: Azure プロキシサービス
+        
+        Returns:
+            SDP Answer（application/sdp）
+        
+        Raises:
+            HTTPException: プロキシ処理中のエラー
+        """
+        body = await http_request.body()
+        if len(body) > MAX_SDP_OFFER_BYTES:
+            raise HTTPException(status_code=413, detail="SDP offer is too large")
+        
+        ephemeral_key = ""
+        if authorization and authorization.lower().startswith("bearer "):
+            ephemeral_key = authorization[len("bearer "):].strip()
+        
+        try:
+            sdp_offer = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid SDP format")
+        
+        sdp_answer = await azure_proxy_service.webrtc_sdp_proxy(model, ephemeral_key, sdp_offer)
+        return Response(content=sdp_answer, status_code=201, media_type="application/sdp")
+    
+    async def create_session_with_sdp(
+        self,
+        request: WebRTCSessionCreateRequest,
+        http_request: Request,
+        client_id: Optional[str] = Header(None, alias="X-Client-Id"),
+        azure_proxy_service: IAzureProxyService = Depends(get_azure_proxy_service),
+        rate_limiter: Optional[SessionRateLimiter] = Depends(get_session_rate_limiter)
+    ) -> WebRTCSessionCreateResponse:
+        """セッション作成と SDP 交換を1回で行うエンドポイント
+        
+        クライアントは RTCPeerConnection の Offer を作成してから呼び出します。
+        セッション作成と SDP 交換の2往復がサーバー内で完結し、エフェメラルキーは
+        クライアントに渡しません。
+        
+        Args:
+            request: セッション作成の内容と SDP Offer
+            http_request: HTTPリクエスト（クライアントのIPアドレス取得用）
+            client_id: クライアントID（信頼できる送信元からの場合のみレート制限の単位）
+            azure_proxy_service: Azure プロキシサービス
+            rate_limiter: セッション作成のレート制限（無効時はNone）
+        
+        Returns:
+            作成したセッションと SDP Answer
+        
+        Raises:
+            HTTPException: プロキシ処理中のエラー
+        """
+        if len(request.sdp.encode("utf-8")) > MAX_SDP_OFFER_BYTES:
+            raise HTTPException(status_code=413, detail="SDP offer is too large")
+        
+        try:
+            logger.info("WebRTC session request: model=%s, voice=%s", request.model, request.voice)
+            
+            if rate_limiter is not None:
+                await rate_limiter.acquire(SessionsProxyController._client_key(rate_limiter, http_request, client_id), request.model)
+            
+            response = await azure_proxy_service.create_session_with_sdp(request)
+            
+            logger.info("WebRTC session negotiated successfully: %s", response.id)
+            return response
+        
+        except RateLimitExceededError as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in WebRTC proxy controller: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail="Internal server error")
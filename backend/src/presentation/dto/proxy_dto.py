@@ -48,6 +48,41 @@ class SessionCreateResponse(BaseModel):
         }
 
 
+class WebRTCSessionCreateRequest(SessionCreateRequest):
+    """セッション作成と SDP 交換を1回で行うリクエスト"""
+    sdp: str = Field(..., description="SDP offer created by the client's RTCPeerConnection")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model": "gpt-4o-realtime-preview",
+                "voice": "alloy",
+                "instructions": "あなたはとても優秀なAIアシスタントです。",
+                "sdp": "v=0\r\no=- 4611731400430051336 2 IN IP4 127.0.0.1\r\n..."
+            }
+        }
+
+
+class WebRTCSessionCreateResponse(BaseModel):
+    """セッション作成と SDP 交換の結果"""
+    id: str = Field(..., description="Session ID")
+    object: str = Field(..., description="Object type")
+    model: str = Field(..., description="Model name")
+    expires_at: Optional[int] = Field(None, description="Session expiration timestamp")
+    sdp: str = Field(..., description="SDP answer to set as the remote description")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "sess_001T4brAO1EhxMhTN6DbHEEW",
+                "object": "realtime.session",
+                "model": "gpt-4o-realtime-preview",
+                "expires_at": 1704067200,
+                "sdp": "v=0\r\no=- 2890844526 2890844527 IN IP4 20.12.34.56\r\n..."
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     """エラーレスポンス"""
     error: Dict[str, Any] = Field(..., description="Error details")
@@ -0,0 +1,63 @@
+"""
+HTTPリクエストのメトリクス収集ミドルウェア
+"""
+import time
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from shared.monitoring.metrics import metrics
+
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    ["method"]
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+
+
+class MetricsMiddleware:
+    """リクエスト数・処理中の件数・レイテンシを記録するASGIミドルウェア
+    
+    ラベルにはリクエストのパスではなくルートのテンプレート（/audio/{audio_id}/sas 等）を
+    使用し、一致するルートがない場合は "unmatched" とします（系列数の増加を防ぐため）。
+    """
+    
+    def __init__(self, app: ASGIApp, excluded_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        started_at = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started_at,
+                method=method,
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code)
+            )
+
+
+def setup_metrics_middleware(app: FastAPI) -> None:
+    """メトリクス収集ミドルウェアを設定"""
+    app.add_middleware(MetricsMiddleware)
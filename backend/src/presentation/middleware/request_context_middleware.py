@@ -0,0 +1,59 @@
+"""
+リクエストIDの付与ミドルウェア
+"""
+import re
+import uuid
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from shared.utils.logging import request_id_var, session_id_var
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# クライアントから受け取るリクエストIDの形式（ログへの不正な値の混入を防ぐ）
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestContextMiddleware:
+    """リクエストごとの相関IDを設定するASGIミドルウェア
+    
+    X-Request-ID ヘッダーがあればその値を、なければ新しいIDをログの相関IDとして設定し、
+    レスポンスの X-Request-ID ヘッダーで返します。
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        request_token = request_id_var.set(request_id)
+        session_token = session_id_var.set(None)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(request_token)
+            session_id_var.reset(session_token)
+
+
+def setup_request_context_middleware(app: FastAPI) -> None:
+    """リクエストID付与ミドルウェアを設定"""
+    app.add_middleware(RequestContextMiddleware)
@@ -0,0 +1,96 @@
+"""
+アップロードサイズ制限ミドルウェア
+"""
+import json
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class UploadSizeLimitMiddleware:
+    """リクエストボディのサイズをストリーミング中に検証するASGIミドルウェア
+    
+    Content-Length が上限を超える場合はボディを読む前に、チャンク転送の場合は
+    上限を超えた時点で受信を打ち切り、413 を返します。
+    """
+    
+    def __init__(self, app: ASGIApp, max_body_size: int, path_prefixes: tuple[str, ...]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_prefixes = path_prefixes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        # Content-Length による事前チェック（ボディを読まずに拒否）
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    if int(value) > self.max_body_size:
+                        await self._send_too_large(send)
+                        return
+                except ValueError:
+                    pass
+                break
+        
+        received = 0
+        exceeded = False
+        response_started = False
+        
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # 上限超過時点で受信を打ち切る（以降のボディは読まない）
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+        
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded and not response_started:
+                # アプリケーション側のエラーレスポンスは破棄し、413 に置き換える
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        
+        if exceeded and not response_started:
+            await self._send_too_large(send)
+    
+    async def _send_too_large(self, send: Send) -> None:
+        """413 レスポンスを送信"""
+        body = json.dumps({
+            "detail": f"Request body exceeds maximum size ({self.max_body_size} bytes)"
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close")
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def setup_upload_size_limit_middleware(app: FastAPI, max_body_size: int, path_prefixes: list[str]):
+    """アップロードサイズ制限ミドルウェア設定"""
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_body_size=max_body_size,
+        path_prefixes=tuple(path_prefixes),
+    )
@@ -0,0 +1,142 @@
+"""
+サーバー起動モジュール
+
+APP_ENV=development の場合はホットリロード付きの単一プロセス、それ以外は
+WEB_CONCURRENCY 個（既定は1）のワーカープロセスで起動します。uvloop / httptools が
+インストールされていればイベントループとHTTPパーサーに使用します
+（uvicorn[standard] に含まれます）。
+
+ワーカーはプロセスごとに独立した状態を持ちます。複数ワーカーで起動する場合、
+/metrics はリクエストを受けた1ワーカーのカウンターのみを返し、アップロードの重複排除、
+セッションのウォームプール、ロードバランサーのエフェメラルキーと接続先の対応も
+ワーカーごとになります（レート制限のみ SQLite ストアで共有します）。
+そのため既定は1ワーカーとし、スケールはコンテナ（レプリカ）単位で行う想定です。
+
+各ワーカーはライフスパンで共有クライアントを初期化し終えてから接続を受け付け、
+SIGTERM を受け取ると新規接続の受付を止めて処理中のリクエスト（アップロードを含む）
+の完了を SERVER_GRACEFUL_SHUTDOWN_SECONDS まで待ってから終了します。
+"""
+import importlib.util
+import os
+from typing import Any, Dict, Mapping, MutableMapping, Optional
+
+import uvicorn
+
+from shared.utils.logging import get_logger, setup_logging
+
+logger = get_logger("server")
+
+APP_IMPORT_STRING = "main:app"
+
+
+def _is_installed(module_name: str) -> bool:
+    return importlib.util.find_spec(module_name) is not None
+
+
+def available_cpu_count() -> int:
+    """このプロセスが使用できるCPUコア数（コンテナのCPU割り当てを考慮）"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def build_server_options(env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    環境変数から uvicorn の起動オプションを作成
+    
+    Args:
+        env: 環境変数（省略時は os.environ）
+    
+    Returns:
+        uvicorn.run に渡すキーワード引数
+    """
+    env = os.environ if env is None else env
+    development = env.get("APP_ENV", "production").lower() == "development"
+    
+    options: Dict[str, Any] = {
+        "host": env.get("HOST", "0.0.0.0"),
+        "port": int(env.get("PORT", "8000")),
+        "timeout_keep_alive": int(env.get("SERVER_KEEPALIVE_SECONDS", "5")),
+        "access_log": env.get("SERVER_ACCESS_LOG", "true" if development else "false").lower() == "true"
+    }
+    
+    if development:
+        options["reload"] = True
+        return options
+    
+    workers = env.get("WEB_CONCURRENCY")
+    options.update({
+        "workers": int(workers) if workers else 1,
+        "loop": "uvloop" if _is_installed("uvloop") else "asyncio",
+        "http": "httptools" if _is_installed("httptools") else "h11",
+        "timeout_graceful_shutdown": int(env.get("SERVER_GRACEFUL_SHUTDOWN_SECONDS", "30"))
+    })
+    
+    backlog = env.get("SERVER_BACKLOG")
+    if backlog:
+        options["backlog"] = int(backlog)
+    limit_concurrency = env.get("SERVER_LIMIT_CONCURRENCY")
+    if limit_concurrency:
+        options["limit_concurrency"] = int(limit_concurrency)
+    return options
+
+
+def _share_cpu_between_workers(workers: int, env: Optional[MutableMapping[str, str]] = None) -> None:
+    """ffmpeg 変換の同時実行数をワーカー間で分け合う（未指定時のみ）
+    
+    変換プールの既定値はCPUコア数のため、ワーカーごとに既定値のままだと
+    コア数 × ワーカー数の ffmpeg が同時に動いてしまいます。
+    
+    Args:
+        workers: ワーカープロセス数
+        env: ワーカーに引き継ぐ環境変数（省略時は os.environ）
+    """
+    env = os.environ if env is None else env
+    if workers > 1 and not env.get("TRANSCODE_MAX_WORKERS"):
+        env["TRANSCODE_MAX_WORKERS"] = str(max(1, available_cpu_count() // workers))
+
+
+def _share_rate_limits_between_workers(workers: int, env: Optional[MutableMapping[str, str]] = None) -> None:
+    """セッション作成のレート制限の状態をワーカー間で共有する
+    
+    プロセス内のストアではワーカーごとにバケットを持つため、制限がワーカー数倍に
+    緩んでしまいます。RATE_LIMIT_BACKEND が未指定の場合は SQLite ストアを使い、
+    memory が明示されている場合は警告します。
+    
+    Args:
+        workers: ワーカープロセス数
+        env: ワーカーに引き継ぐ環境変数（省略時は os.environ）
+    """
+    env = os.environ if env is None else env
+    if workers <= 1 or env.get("RATE_LIMIT_ENABLED", "true").lower() != "true":
+        return
+    backend = env.get("RATE_LIMIT_BACKEND")
+    if not backend:
+        env["RATE_LIMIT_BACKEND"] = "sqlite"
+        logger.info(f"Rate limits are shared between {workers} workers (RATE_LIMIT_BACKEND=sqlite)")
+    elif backend.lower() == "memory":
+        logger.warning(
+            f"RATE_LIMIT_BACKEND=memory with {workers} workers: "
+            f"each worker keeps its own buckets, so rate limits are {workers}x the configured values"
+        )
+
+
+def run() -> None:
+    """サーバーを起動（ワーカーは環境変数を引き継いで起動されます）"""
+    # 起動処理のログ用（ワーカーは main の読み込み時に改めて設定します）
+    setup_logging(level=os.getenv("LOG_LEVEL", "INFO"), format_type=os.getenv("LOG_FORMAT", "detailed"))
+    
+    options = build_server_options()
+    _share_cpu_between_workers(options.get("workers", 1))
+    _share_rate_limits_between_workers(options.get("workers", 1))
+    
+    mode = "development (reload)" if options.get("reload") else (
+        f"production (workers={options['workers']}, loop={options['loop']}, http={options['http']})"
+    )
+    logger.info(f"Starting server on {options['host']}:{options['port']} in {mode} mode")
+    
+    uvicorn.run(APP_IMPORT_STRING, **options)
+
+
+if __name__ == "__main__":
+    run()
@@ -4,10 +4,11 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 import time
 from datetime import datetime
 import asyncio
+from shared.utils.logging import get_logger
 
 
 class HealthStatus(str, Enum):
@@ -30,9 +31,26 @@ class HealthCheckResult:
 class IHealthCheck(ABC):
     """ヘルスチェックインターフェース"""
     
+    # 確認自体が例外・タイムアウトで失敗した場合に報告するステータス
+    failure_status: HealthStatus = HealthStatus.UNHEALTHY
+    _name: str = "unknown"
+    
+    @property
+    def name(self) -> str:
+        """ヘルスチェック名（結果の name と同じ）"""
+        return self._name
+    
     @abstractmethod
     async def check(self) -> HealthCheckResult:
         pass
+    
+    async def start(self) -> None:
+        """バックグラウンド処理を開始（必要な実装のみ）"""
+        pass
+    
+    async def close(self) -> None:
+        """バックグラウンド処理を停止（必要な実装のみ）"""
+        pass
 
 
 class SimpleHealthCheck(IHealthCheck):
@@ -51,12 +69,130 @@ class SimpleHealthCheck(IHealthCheck):
         )
 
 
+class CachedHealthCheck(IHealthCheck):
+    """結果をキャッシュするヘルスチェック
+    
+    外部サービスへの確認を頻繁なプローブのたびに行わないよう、結果を ttl_seconds 秒
+    キャッシュします。同時に呼び出された場合は実行中の1件の確認結果を共有し、
+    refresh_interval が指定されている場合はバックグラウンドで定期的に更新します。
+    キャッシュが期限切れでも stale_seconds 秒以内であれば古い結果を返し、裏で更新します。
+    """
+    
+    def __init__(
+        self,
+        health_check: IHealthCheck,
+        ttl_seconds: float = 10.0,
+        stale_seconds: float = 30.0,
+        refresh_interval: Optional[float] = None,
+        timeout_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """初期化
+        
+        Args:
+            health_check: キャッシュ対象のヘルスチェック
+            ttl_seconds: 結果をそのまま返す秒数
+            stale_seconds: 期限切れ後も古い結果を返しつつ更新する秒数
+            refresh_interval: バックグラウンド更新の間隔秒数（Noneの場合は更新しない）
+            timeout_seconds: 1回の確認のタイムアウト秒数
+            clock: 現在時刻を返す関数
+        """
+        self._health_check = health_check
+        self._name = health_check.name
+        self.failure_status = health_check.failure_status
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.refresh_interval = refresh_interval
+        self.timeout_seconds = timeout_seconds
+        self._clock = clock
+        self._result: Optional[HealthCheckResult] = None
+        self._checked_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.logger = get_logger("health_check")
+        self.probes = 0
+        self.cache_hits = 0
+    
+    async def _probe(self) -> HealthCheckResult:
+        """確認を1回実行（例外・タイムアウトは対象の failure_status として記録）"""
+        self.probes += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._health_check.check(), timeout=self.timeout_seconds)
+        except Exception as e:
+            self.logger.warning(f"Health check failed: {type(e).__name__}: {e}")
+            result = HealthCheckResult(
+                name=self.name,
+                status=self.failure_status,
+                message=f"Health check failed: {type(e).__name__}",
+                response_time_ms=(time.perf_counter() - start) * 1000
+            )
+        self._result = result
+        self._checked_at = self._clock()
+        return result
+    
+    def _refresh(self) -> asyncio.Task:
+        """確認を開始（実行中の確認があればそれを返す）"""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._probe())
+        return self._inflight
+    
+    async def check(self) -> HealthCheckResult:
+        """キャッシュされた結果を返す（期限切れの場合は確認を実行）"""
+        if self._result is not None:
+            age = self._clock() - self._checked_at
+            if age < self.ttl_seconds:
+                self.cache_hits += 1
+                return self._result
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.cache_hits += 1
+                self._refresh()
+                return self._result
+        
+        # 呼び出し元がキャンセルされても共有している確認は継続する
+        return await asyncio.shield(self._refresh())
+    
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.shield(self._refresh())
+            await asyncio.sleep(self.refresh_interval)
+    
+    async def start(self) -> None:
+        """バックグラウンド更新を開始"""
+        await self._health_check.start()
+        if self.refresh_interval and self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+    
+    async def close(self) -> None:
+        """バックグラウンド更新を停止"""
+        for task in (self._refresher, self._inflight):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher = None
+        self._inflight = None
+        await self._health_check.close()
+
+
 class HealthCheckService:
     """ヘルスチェックサービス"""
     
     def __init__(self, health_checks: Optional[List[IHealthCheck]] = None):
         self._health_checks = health_checks or [SimpleHealthCheck()]
     
+    async def start(self) -> None:
+        """各ヘルスチェックのバックグラウンド処理を開始"""
+        for check in self._health_checks:
+            await check.start()
+    
+    async def close(self) -> None:
+        """各ヘルスチェックのバックグラウンド処理を停止"""
+        for check in self._health_checks:
+            await check.close()
+    
     async def check_all(self) -> Dict[str, Any]:
         """全ヘルスチェック実行"""
         results = await asyncio.gather(
@@ -67,10 +203,14 @@ class HealthCheckService:
         overall_status = HealthStatus.HEALTHY
         check_results = {}
         
-        for result in results:
+        for check, result in zip(self._health_checks, results):
             if isinstance(result, Exception):
-                overall_status = HealthStatus.UNHEALTHY
-                continue
+                result = HealthCheckResult(
+                    name=check.name,
+                    status=check.failure_status,
+                    message=f"Health check failed: {type(result).__name__}",
+                    response_time_ms=0.0
+                )
             
             check_results[result.name] = {
                 "status": result.status.value,
@@ -1,60 +1,235 @@
 """
 ログ設定モジュール
 """
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import zlib
+from datetime import datetime, timezone
 from typing import Optional
 
+# リクエスト・セッションの相関ID（非同期タスクごとに保持）
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+session_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
 
-def setup_logging(level: str = "INFO", format_type: str = "simple") -> logging.Logger:
+# LogRecord の標準属性（これ以外は extra として JSON に出力）
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id", "session_id"
+}
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def set_log_context(request_id: Optional[str] = None, session_id: Optional[str] = None) -> None:
+    """
+    現在のリクエストの相関IDを設定
+
+    Args:
+        request_id: リクエストID
+        session_id: セッションID
+    """
+    if request_id is not None:
+        request_id_var.set(request_id)
+    if session_id is not None:
+        session_id_var.set(session_id)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """ログレコードにリクエスト・セッションの相関IDを付与"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    INFO 以下のログをリクエスト単位でサンプリング
+
+    リクエストIDのハッシュで判定するため、採用されたリクエストのログは全て残ります。
+    WARNING 以上とリクエスト外のログは常に出力します。
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._threshold = int(rate * 0xFFFFFFFF)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno > logging.INFO:
+            return True
+        request_id = getattr(record, "request_id", None) or request_id_var.get()
+        if request_id is None:
+            return True
+        return zlib.crc32(request_id.encode()) <= self._threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """1行1オブジェクトのJSON形式で出力"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        session_id = getattr(record, "session_id", None)
+        if session_id:
+            entry["session_id"] = session_id
+
+        # logger.info(..., extra={...}) で渡された項目
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    ログ出力を別スレッドに渡すハンドラー
+
+    呼び出し元ではメッセージの組み立てのみ行い、整形と書き込みは QueueListener の
+    スレッドで行います。キューが満杯の場合は待たずに破棄し、件数を記録します。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 引数は呼び出し時点の値で確定させる（後から変更されるオブジェクトに備える）
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def shutdown_logging() -> None:
+    """
+    キューに残ったログを書き出して出力スレッドを停止
+
+    ルートロガーのキューハンドラーは出力先のハンドラーに置き換え、
+    停止後のログ（同じプロセスで再度起動したアプリのログを含む）は同期的に書き出します。
+    """
+    global _queue_listener
+
+    if _queue_listener is None:
+        return
+    listener, _queue_listener = _queue_listener, None
+    listener.stop()
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler) and handler.queue is listener.queue:
+            for target in listener.handlers:
+                for log_filter in handler.filters:
+                    target.addFilter(log_filter)
+                root_logger.addHandler(target)
+            root_logger.removeHandler(handler)
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logging(
+    level: str = "INFO",
+    format_type: str = "simple",
+    async_handler: bool = False,
+    sample_rate: float = 1.0,
+    queue_size: int = 10000
+) -> logging.Logger:
     """
     アプリケーション用のログ設定を行う
-    
+
     Args:
         level: ログレベル (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         format_type: ログフォーマット (simple, detailed, json)
-    
+        async_handler: 標準出力への書き込みを別スレッドで行うか
+        sample_rate: INFO 以下のログを残すリクエストの割合 (0.0〜1.0)
+        queue_size: 非同期出力のキューの上限件数
+
     Returns:
         設定済みのロガー
     """
+    global _queue_listener
+
     log_level = getattr(logging, level.upper(), logging.INFO)
-    
+
     # フォーマット設定
     if format_type == "detailed":
         formatter = logging.Formatter(
             '[%(asctime)s] %(levelname)s in %(name)s: %(message)s'
         )
     elif format_type == "json":
-        formatter = logging.Formatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s"}'
-        )
+        formatter = JsonFormatter()
     else:  # simple
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
-    
+
     # ハンドラー設定
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
-    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    shutdown_logging()
+    if async_handler:
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        _queue_listener = logging.handlers.QueueListener(handler.queue, stream_handler)
+        _queue_listener.start()
+    else:
+        handler = stream_handler
+
+    # 相関IDは呼び出し元のタスクで取得する必要があるため、キューに入れる前に付与
+    handler.addFilter(CorrelationIdFilter())
+    if sample_rate < 1.0:
+        handler.addFilter(SamplingFilter(sample_rate))
+
     # ルートロガー設定
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    
+
     # 既存のハンドラーをクリア
     root_logger.handlers.clear()
     root_logger.addHandler(handler)
-    
+
     return root_logger
 
 
 def get_logger(name: str) -> logging.Logger:
     """
     指定された名前のロガーを取得
-    
+
     Args:
         name: ロガー名
-    
+
     Returns:
         ロガーインスタンス
     """
@@ -0,0 +1,102 @@
+"""
+サーバー起動オプションのテスト
+"""
+import logging
+
+from src import server
+
+
+def test_development_mode_uses_reload_without_workers():
+    """開発モードではホットリロード付きの単一プロセス"""
+    options = server.build_server_options({"APP_ENV": "development", "PORT": "9000"})
+    
+    assert options["reload"] is True
+    assert options["port"] == 9000
+    assert "workers" not in options
+
+
+def test_production_mode_defaults_to_one_worker(monkeypatch):
+    """本番モードの既定ワーカー数は1（状態がワーカーごとのため）"""
+    monkeypatch.setattr(server, "available_cpu_count", lambda: 6)
+    
+    options = server.build_server_options({})
+    
+    assert "reload" not in options
+    assert options["workers"] == 1
+    assert options["timeout_graceful_shutdown"] == 30
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+
+
+def test_production_mode_respects_environment():
+    """ワーカー数・終了待ち時間・同時接続数を環境変数で指定"""
+    options = server.build_server_options({
+        "WEB_CONCURRENCY": "3",
+        "SERVER_GRACEFUL_SHUTDOWN_SECONDS": "60",
+        "SERVER_LIMIT_CONCURRENCY": "500"
+    })
+    
+    assert options["workers"] == 3
+    assert options["timeout_graceful_shutdown"] == 60
+    assert options["limit_concurrency"] == 500
+
+
+def test_falls_back_when_uvloop_and_httptools_missing(monkeypatch):
+    """uvloop / httptools が無い環境では標準の実装を使う"""
+    monkeypatch.setattr(server, "_is_installed", lambda name: False)
+    
+    options = server.build_server_options({})
+    
+    assert options["loop"] == "asyncio"
+    assert options["http"] == "h11"
+
+
+def test_transcoding_workers_are_shared_between_workers(monkeypatch):
+    """ffmpeg の同時実行数をワーカー数で分け合う（明示指定を優先）"""
+    monkeypatch.setattr(server, "available_cpu_count", lambda: 8)
+    env = {}
+    
+    server._share_cpu_between_workers(4, env)
+    assert env["TRANSCODE_MAX_WORKERS"] == "2"
+    
+    env["TRANSCODE_MAX_WORKERS"] = "5"
+    server._share_cpu_between_workers(4, env)
+    assert env["TRANSCODE_MAX_WORKERS"] == "5"
+
+
+def test_rate_limits_are_shared_between_workers():
+    """複数ワーカーでは未指定時に SQLite のレート制限ストアを使う"""
+    env = {}
+    
+    server._share_rate_limits_between_workers(1, env)
+    assert "RATE_LIMIT_BACKEND" not in env
+    
+    server._share_rate_limits_between_workers(4, env)
+    assert env["RATE_LIMIT_BACKEND"] == "sqlite"
+
+
+def test_in_memory_rate_limits_with_workers_are_warned(caplog):
+    """memory を明示して複数ワーカーで起動する場合は警告する"""
+    env = {"RATE_LIMIT_BACKEND": "memory"}
+    
+    with caplog.at_level("WARNING"):
+        server._share_rate_limits_between_workers(4, env)
+    
+    assert env["RATE_LIMIT_BACKEND"] == "memory"
+    assert "4x" in caplog.text
+
+
+def test_startup_is_logged(monkeypatch, capsys):
+    """ログ設定前に出力した起動メッセージが失われない"""
+    monkeypatch.setattr(server.uvicorn, "run", lambda app, **options: None)
+    monkeypatch.setenv("APP_ENV", "development")
+    root_logger = logging.getLogger()
+    handlers, level = list(root_logger.handlers), root_logger.level
+    
+    try:
+        server.run()
+    finally:
+        root_logger.handlers[:] = handlers
+        root_logger.setLevel(level)
+    
+    assert "Starting server on" in capsys.readouterr().out
@@ -0,0 +1,75 @@
+"""
+SAS URL発行サービスのユニットテスト
+"""
+import uuid
+import pytest
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from application.dto.audio_dto import AudioSasBatchItem
+from application.services.audio_sas_service import AudioNotFoundError, AudioSasService
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient
+
+
+@pytest.fixture
+def blob_storage_client(monkeypatch):
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client = AudioBlobStorageClient()
+    client.find_audio_blob = lambda audio_id, session_id=None: client.get_cached_audio_blob(audio_id)
+    return client
+
+
+@pytest.mark.asyncio
+class TestAudioSasService:
+    """SAS URL発行サービスのテスト"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, blob_storage_client):
+        """テストセットアップ"""
+        self.blob_storage_client = blob_storage_client
+        self.service = AudioSasService(blob_storage_client)
+        self.audio_id = str(uuid.uuid4())
+        self.blob_name = f"audio/sess-1/{self.audio_id}_20240101_000000.mp4"
+        blob_storage_client.remember_audio_blob(self.audio_id, self.blob_name)
+    
+    async def test_get_sas(self):
+        """既存の音声ファイルにSAS URLが発行されること"""
+        result = await self.service.get_sas(self.audio_id, expire_minutes=30)
+        
+        assert result.blob_url.endswith(f"/audio/{self.blob_name}")
+        assert result.sas_url.startswith(result.blob_url + "?")
+        expiry = parse_qs(urlparse(result.sas_url).query)["se"][0]
+        assert expiry == result.sas_expires_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    async def test_sas_url_is_memoized(self):
+        """同じBlob・有効期間のSAS URLは再利用されること"""
+        first = await self.service.get_sas(self.audio_id, expire_minutes=30)
+        second = await self.service.get_sas(self.audio_id, expire_minutes=30)
+        other = await self.service.get_sas(self.audio_id, expire_minutes=60)
+        
+        assert second.sas_url == first.sas_url
+        assert other.sas_url != first.sas_url
+    
+    async def test_get_sas_not_found(self):
+        """見つからない音声IDは AudioNotFoundError となること"""
+        with pytest.raises(AudioNotFoundError):
+            await self.service.get_sas(str(uuid.uuid4()))
+    
+    async def test_get_sas_invalid_audio_id(self):
+        """UUID形式でない音声IDは拒否されること"""
+        with pytest.raises(ValueError):
+            await self.service.get_sas("../audio")
+    
+    async def test_get_sas_batch(self):
+        """一括発行で見つからない音声IDが not_found に含まれること"""
+        missing_id = str(uuid.uuid4())
+        
+        result = await self.service.get_sas_batch([
+            AudioSasBatchItem(audio_id=self.audio_id, session_id="sess-1"),
+            AudioSasBatchItem(audio_id=missing_id)
+        ])
+        
+        assert [item.audio_id for item in result.items] == [self.audio_id]
+        assert result.not_found == [missing_id]
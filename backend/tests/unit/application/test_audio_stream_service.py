@@ -0,0 +1,111 @@
+"""
+分割アップロードサービスのユニットテスト
+"""
+import io
+import pytest
+from unittest.mock import AsyncMock
+
+from application.services.audio_stream_service import AudioStreamService
+
+
+class FakeStreamStorage:
+    """ステージングBlobをメモリ上で再現するストレージクライアント"""
+    
+    def __init__(self):
+        self.uncommitted = {}
+        self.committed = {}
+        self.commits = 0
+        self.deleted = False
+    
+    def stage_stream_chunk(self, session_id, sequence, data):
+        self.uncommitted[sequence] = data
+    
+    def get_stream_chunks(self, session_id):
+        return (
+            {sequence: len(data) for sequence, data in self.committed.items()},
+            {sequence: len(data) for sequence, data in self.uncommitted.items()}
+        )
+    
+    def commit_stream(self, session_id, sequences):
+        chunks = {**self.committed, **self.uncommitted}
+        self.committed = {sequence: chunks[sequence] for sequence in sequences}
+        self.uncommitted = {}
+        self.commits += 1
+    
+    def download_stream(self, session_id):
+        return io.BytesIO(b"".join(self.committed[sequence] for sequence in sorted(self.committed)))
+    
+    def delete_stream(self, session_id):
+        self.deleted = True
+
+
+@pytest.mark.asyncio
+class TestAudioStreamService:
+    """分割アップロードサービスのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.storage = FakeStreamStorage()
+        self.upload_service = AsyncMock()
+        self.uploaded = []
+        
+        async def upload_audio(audio_file, filename, metadata_json=None, session_id=None, size_bytes=None):
+            self.uploaded.append((audio_file.read(), filename, session_id, size_bytes))
+            return "result"
+        self.upload_service.upload_audio.side_effect = upload_audio
+        
+        self.service = AudioStreamService(self.storage, self.upload_service)
+    
+    async def test_complete_joins_out_of_order_chunks(self):
+        """順不同で届いたチャンクが sequence 順に結合されること"""
+        await self.service.append_chunk("sess-1", 1, b"bbb")
+        await self.service.append_chunk("sess-1", 0, b"aa")
+        await self.service.append_chunk("sess-1", 2, b"c")
+        
+        result = await self.service.complete("sess-1", total_chunks=3, audio_format="webm")
+        
+        assert result == "result"
+        assert self.uploaded == [(b"aabbbc", "recording.webm", "sess-1", 6)]
+        assert self.storage.deleted
+    
+    async def test_resent_chunk_replaces_previous(self):
+        """同じ sequence の再送は上書きされること"""
+        await self.service.append_chunk("sess-1", 0, b"old")
+        await self.service.append_chunk("sess-1", 0, b"new")
+        
+        await self.service.complete("sess-1", total_chunks=1)
+        
+        assert self.uploaded[0][0] == b"new"
+    
+    async def test_complete_with_missing_chunks(self):
+        """欠落したチャンクがある場合はエラーとなりチャンクが保持されること"""
+        await self.service.append_chunk("sess-1", 0, b"a")
+        await self.service.append_chunk("sess-1", 2, b"c")
+        
+        with pytest.raises(ValueError, match="Missing chunks: \\[1\\]"):
+            await self.service.complete("sess-1", total_chunks=3)
+        assert self.storage.commits == 0
+        assert not self.storage.deleted
+    
+    async def test_complete_retry_after_commit(self):
+        """コミット後に変換が失敗しても、再送時に再コミットせず完了できること"""
+        await self.service.append_chunk("sess-1", 0, b"a")
+        await self.service.append_chunk("sess-1", 1, b"b")
+        self.upload_service.upload_audio.side_effect = [RuntimeError("upload failed"), "result"]
+        
+        with pytest.raises(RuntimeError):
+            await self.service.complete("sess-1", total_chunks=2)
+        result = await self.service.complete("sess-1", total_chunks=2)
+        
+        assert result == "result"
+        assert self.storage.commits == 1
+    
+    async def test_invalid_session_id(self):
+        """Blob名に使用できないセッションIDは拒否されること"""
+        with pytest.raises(ValueError):
+            await self.service.append_chunk("../other", 0, b"a")
+    
+    async def test_empty_chunk(self):
+        """空のチャンクは拒否されること"""
+        with pytest.raises(ValueError):
+            await self.service.append_chunk("sess-1", 0, b"")
@@ -0,0 +1,61 @@
+"""
+音声アップロードサービスのユニットテスト
+"""
+import io
+import pytest
+from unittest.mock import patch
+
+from application.services.audio_upload_service import AudioUploadService
+from infrastructure.audio.transcoding_pool import TranscodingQueueFullError, TranscodingTimeoutError
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient
+from infrastructure.storage.audio_metadata_index import AudioMetadataIndex
+
+
+@pytest.fixture
+def blob_storage_client(monkeypatch):
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        return AudioBlobStorageClient()
+
+
+@pytest.fixture
+def metadata_index(tmp_path):
+    index = AudioMetadataIndex(str(tmp_path / "audio.db"))
+    yield index
+    index.close()
+
+
+async def test_indexed_blob_name_matches_uploaded_blob(blob_storage_client, metadata_index):
+    """インデックスに登録される Blob 名がアップロードした Blob 名と一致すること"""
+    blob_name = "audio/sess-1/a1_20240101_000000.mp4"
+    
+    async def fake_upload(audio_file, session_id, audio_format):
+        return "a1", blob_storage_client.get_blob_url(blob_name), None
+    
+    blob_storage_client.upload_audio_file_async = fake_upload
+    service = AudioUploadService(blob_storage_client, metadata_index=metadata_index)
+    
+    response = await service.upload_audio(io.BytesIO(b"data"), "recording.webm", session_id="sess-1")
+    
+    record = metadata_index.get("a1")
+    assert record.blob_name == blob_name
+    assert record.format == "mp4"
+    assert record.original_format == "webm"
+    assert response.sas_url.startswith(f"{response.blob_url}?")
+
+
+@pytest.mark.parametrize("error", [
+    TranscodingQueueFullError("queue is full", retry_after=1.0),
+    TranscodingTimeoutError("ffmpeg did not finish within 1 seconds")
+])
+async def test_transcoding_errors_are_not_wrapped(blob_storage_client, error):
+    """変換キューの満杯・タイムアウトは RuntimeError に変換されずそのまま送出されること"""
+    async def failing_upload(audio_file, session_id, audio_format):
+        raise error
+    
+    blob_storage_client.upload_audio_file_async = failing_upload
+    service = AudioUploadService(blob_storage_client)
+    
+    with pytest.raises(type(error)):
+        await service.upload_audio(io.BytesIO(b"data"), "recording.webm", session_id="sess-1")
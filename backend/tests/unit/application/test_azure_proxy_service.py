@@ -7,7 +7,7 @@ from fastapi import HTTPException
 
 from application.services.azure_proxy_service import AzureProxyService
 from infrastructure.azure.azure_openai_client import AzureOpenAIException
-from presentation.dto.proxy_dto import SessionCreateRequest, SessionCreateResponse
+from presentation.dto.proxy_dto import SessionCreateRequest, SessionCreateResponse, WebRTCSessionCreateRequest
 from application.dto.azure_dto import AzureSessionResponse
 
 
@@ -65,6 +65,28 @@ class TestAzureProxyService:
         assert exc_info.value.status_code == 502
         assert "Azure OpenAI authentication failed" in str(exc_info.value.detail)
     
+    async def test_create_session_proxy_circuit_open(self):
+        """サーキットブレーカーが開いている場合は503とRetry-Afterを返すこと"""
+        # Arrange
+        request = SessionCreateRequest(
+            model="gpt-4o-realtime-preview",
+            voice="alloy"
+        )
+        
+        self.mock_azure_client.create_session.side_effect = AzureOpenAIException(
+            "Azure OpenAI circuit breaker is open",
+            status_code=503,
+            error_code="circuit_open",
+            retry_after=12.3
+        )
+        
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await self.service.create_session_proxy(request)
+        
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "13"}
+    
     async def test_create_session_proxy_rate_limit_error(self):
         """レート制限エラーの場合"""
         # Arrange
@@ -149,3 +171,49 @@ class TestAzureProxyService:
         
         assert exc_info.value.status_code == 400
         assert "Invalid SDP format" in str(exc_info.value.detail)
+    
+    async def test_webrtc_sdp_proxy_rejected_ephemeral_key(self):
+        """Azure がエフェメラルキーを拒否した場合は 401 を返すこと"""
+        self.mock_azure_client.proxy_webrtc_sdp.side_effect = AzureOpenAIException(
+            "Unauthorized", status_code=401
+        )
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await self.service.webrtc_sdp_proxy("gpt-4o-realtime-preview", "ek_expired", "v=0\r\n")
+        
+        assert exc_info.value.status_code == 401
+    
+    async def test_create_session_with_sdp(self):
+        """セッション作成と SDP 交換を1回で行い、エフェメラルキーを返さないこと"""
+        self.mock_azure_client.create_session.return_value = AzureSessionResponse(
+            id="sess_test123",
+            object="realtime.session",
+            model="gpt-4o-realtime-preview",
+            expires_at=1704067200,
+            client_secret={"value": "ek_test123", "expires_at": 1704067200}
+        )
+        self.mock_azure_client.proxy_webrtc_sdp.return_value = "v=0\r\no=- answer\r\n"
+        request = WebRTCSessionCreateRequest(
+            model="gpt-4o-realtime-preview",
+            voice="alloy",
+            sdp="v=0\r\no=- offer\r\n"
+        )
+        
+        result = await self.service.create_session_with_sdp(request)
+        
+        assert result.id == "sess_test123"
+        assert result.sdp == "v=0\r\no=- answer\r\n"
+        assert "client_secret" not in result.model_dump()
+        self.mock_azure_client.proxy_webrtc_sdp.assert_called_once_with(
+            "gpt-4o-realtime-preview", "ek_test123", "v=0\r\no=- offer\r\n"
+        )
+    
+    async def test_create_session_with_invalid_sdp_does_not_create_session(self):
+        """SDP が不正な場合はセッションを作成しないこと"""
+        request = WebRTCSessionCreateRequest(model="gpt-4o-realtime-preview", voice="alloy", sdp="invalid")
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await self.service.create_session_with_sdp(request)
+        
+        assert exc_info.value.status_code == 400
+        self.mock_azure_client.create_session.assert_not_called()
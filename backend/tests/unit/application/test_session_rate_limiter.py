@@ -0,0 +1,167 @@
+"""
+セッション作成レート制限のユニットテスト
+"""
+import pytest
+
+from application.interfaces.rate_limit_store import TokenBucketRule
+from application.services.session_rate_limiter import RateLimitExceededError, SessionRateLimiter
+from infrastructure.rate_limit.token_bucket_store import InMemoryRateLimitStore, SqliteRateLimitStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+class TestSessionRateLimiter:
+    """レート制限のテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+        self.store = InMemoryRateLimitStore(clock=self.clock)
+    
+    async def test_burst_then_reject(self):
+        """バーストを使い切ると待機時間付きで拒否されること"""
+        limiter = SessionRateLimiter(
+            self.store,
+            client_rule=TokenBucketRule(rate=0.1, burst=2),
+            max_wait_seconds=0
+        )
+        
+        await limiter.acquire("client-a")
+        await limiter.acquire("client-a")
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            await limiter.acquire("client-a")
+        
+        assert exc_info.value.retry_after == pytest.approx(10.0)
+        # 他のクライアントは影響を受けない
+        await limiter.acquire("client-b")
+        assert limiter.stats["rejected"] == 1
+    
+    async def test_tokens_refill_over_time(self):
+        """時間の経過でトークンが補充されること"""
+        limiter = SessionRateLimiter(
+            self.store,
+            client_rule=TokenBucketRule(rate=1.0, burst=1),
+            max_wait_seconds=0
+        )
+        
+        await limiter.acquire("client-a")
+        self.clock.now += 1.0
+        await limiter.acquire("client-a")
+    
+    async def test_global_limit_does_not_consume_client_tokens(self):
+        """全体の制限で拒否された場合はクライアントのトークンを消費しないこと"""
+        limiter = SessionRateLimiter(
+            self.store,
+            client_rule=TokenBucketRule(rate=1.0, burst=1),
+            global_rule=TokenBucketRule(rate=1.0, burst=1),
+            max_wait_seconds=0
+        )
+        
+        await limiter.acquire("client-a")
+        with pytest.raises(RateLimitExceededError):
+            await limiter.acquire("client-b")
+        self.clock.now += 1.0
+        await limiter.acquire("client-b")
+    
+    async def test_model_limit(self):
+        """モデルごとの制限が他のモデルに影響しないこと"""
+        limiter = SessionRateLimiter(
+            self.store,
+            model_rules={"gpt-4o-realtime-preview": TokenBucketRule(rate=1.0, burst=1)},
+            max_wait_seconds=0
+        )
+        
+        await limiter.acquire("client-a", "gpt-4o-realtime-preview")
+        await limiter.acquire("client-a", "gpt-4o-mini-realtime-preview")
+        with pytest.raises(RateLimitExceededError):
+            await limiter.acquire("client-b", "gpt-4o-realtime-preview")
+    
+    async def test_short_wait_is_admitted(self):
+        """トークンが待機上限内に揃う場合は待機して許可されること"""
+        limiter = SessionRateLimiter(
+            InMemoryRateLimitStore(),
+            client_rule=TokenBucketRule(rate=50.0, burst=1),
+            max_wait_seconds=1.0
+        )
+        
+        await limiter.acquire("client-a")
+        await limiter.acquire("client-a")
+        
+        assert limiter.stats["delayed"] == 1
+    
+    async def test_stale_buckets_are_pruned(self):
+        """満杯に戻ったバケットが破棄されること"""
+        store = InMemoryRateLimitStore(max_keys=2, clock=self.clock)
+        limiter = SessionRateLimiter(store, client_rule=TokenBucketRule(rate=1.0, burst=1))
+        
+        await limiter.acquire("client-a")
+        await limiter.acquire("client-b")
+        self.clock.now += 5.0
+        await limiter.acquire("client-c")
+        
+        assert len(store) == 1
+    
+    async def test_sqlite_store_shares_state(self, tmp_path):
+        """SQLite ストアは同じファイルを開いた別インスタンスと状態を共有すること"""
+        db_path = str(tmp_path / "rate_limit.db")
+        rule = TokenBucketRule(rate=0.1, burst=1)
+        first = SessionRateLimiter(SqliteRateLimitStore(db_path, clock=self.clock), client_rule=rule, max_wait_seconds=0)
+        second = SessionRateLimiter(SqliteRateLimitStore(db_path, clock=self.clock), client_rule=rule, max_wait_seconds=0)
+        try:
+            await first.acquire("client-a")
+            with pytest.raises(RateLimitExceededError):
+                await second.acquire("client-a")
+        finally:
+            first.store.close()
+            second.store.close()
+
+
+class TestClientKey:
+    """レート制限のクライアント識別子のテスト"""
+    
+    def test_client_id_is_ignored_by_default(self):
+        """既定ではクライアントIDを無視してIPアドレスで識別すること"""
+        limiter = SessionRateLimiter(InMemoryRateLimitStore())
+        
+        assert limiter.client_key("203.0.113.5", "tenant-a") == "ip:203.0.113.5"
+        assert limiter.client_key("203.0.113.5", "tenant-b") == "ip:203.0.113.5"
+    
+    def test_client_id_from_trusted_source(self):
+        """信頼できる送信元からのクライアントIDのみ識別子に使うこと"""
+        limiter = SessionRateLimiter(InMemoryRateLimitStore(), trusted_client_id_sources=["10.0.0.0/8", " ::1 "])
+        
+        assert limiter.client_key("10.1.2.3", "tenant-a") == "id:tenant-a"
+        assert limiter.client_key("::1", "tenant-a") == "id:tenant-a"
+        assert limiter.client_key("203.0.113.5", "tenant-a") == "ip:203.0.113.5"
+        assert limiter.client_key("10.1.2.3", None) == "ip:10.1.2.3"
+    
+    def test_unknown_client(self):
+        """送信元が不明な場合はクライアントIDを使わないこと"""
+        limiter = SessionRateLimiter(InMemoryRateLimitStore(), trusted_client_id_sources=["10.0.0.0/8"])
+        
+        assert limiter.client_key(None, "tenant-a") == "ip:unknown"
+        assert limiter.client_key("testclient", "tenant-a") == "ip:testclient"
+    
+    def test_invalid_source_is_rejected(self):
+        """不正なアドレスの設定はエラーになること"""
+        with pytest.raises(ValueError):
+            SessionRateLimiter(InMemoryRateLimitStore(), trusted_client_id_sources=["gateway"])
+    
+    async def test_rotating_client_id_does_not_bypass_limit(self):
+        """クライアントIDを変えても同じIPアドレスの制限を回避できないこと"""
+        limiter = SessionRateLimiter(
+            InMemoryRateLimitStore(),
+            client_rule=TokenBucketRule(rate=0.1, burst=1),
+            max_wait_seconds=0
+        )
+        
+        await limiter.acquire(limiter.client_key("203.0.113.5", "tenant-a"))
+        with pytest.raises(RateLimitExceededError):
+            await limiter.acquire(limiter.client_key("203.0.113.5", "tenant-b"))
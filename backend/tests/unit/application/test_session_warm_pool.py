@@ -0,0 +1,90 @@
+"""
+セッション事前作成プールのユニットテスト
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from application.dto.azure_dto import AzureSessionRequest, AzureSessionResponse
+from application.services.session_warm_pool import SessionWarmPool
+
+
+class FakeClock:
+    """テスト用の時計"""
+    
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def _session(session_id: str, expires_at: float) -> AzureSessionResponse:
+    return AzureSessionResponse(
+        id=session_id,
+        object="realtime.session",
+        model="gpt-4o-realtime-preview",
+        client_secret={"value": f"ek_{session_id}", "expires_at": expires_at}
+    )
+
+
+@pytest.mark.asyncio
+class TestSessionWarmPool:
+    """セッション事前作成プールのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+        self.counter = 0
+        self.mock_azure_client = AsyncMock()
+        
+        async def create_session(request):
+            self.counter += 1
+            return _session(f"sess_{self.counter}", self.clock.now + 60)
+        
+        self.mock_azure_client.create_session.side_effect = create_session
+        self.pool = SessionWarmPool(
+            self.mock_azure_client,
+            pool_size=2,
+            expiry_margin_seconds=15,
+            clock=self.clock
+        )
+        self.request = AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy")
+    
+    @pytest.fixture(autouse=True)
+    async def close_pool(self):
+        """テスト終了時にプールを閉じる"""
+        yield
+        await self.pool.close()
+    
+    async def test_first_acquire_misses_and_refills(self):
+        """初回はミスし、バックグラウンドで補充されること"""
+        assert self.pool.acquire(self.request) is None
+        await asyncio.sleep(0)
+        await asyncio.gather(*self.pool._tasks)
+        
+        assert self.pool.stats["pooled_sessions"] == 2
+        session = self.pool.acquire(self.request)
+        assert session is not None
+        assert session.id == "sess_1"
+        assert self.pool.hits == 1
+        assert self.pool.misses == 1
+    
+    async def test_expiring_sessions_are_discarded(self):
+        """有効期限間近のセッションは払い出されないこと"""
+        self.pool.acquire(self.request)
+        await asyncio.gather(*self.pool._tasks)
+        
+        # 有効期限（60秒）からマージン（15秒）を引いた時刻を過ぎる
+        self.clock.now += 50
+        assert self.pool.acquire(self.request) is None
+        assert self.pool.discarded == 2
+    
+    async def test_pool_is_keyed_by_session_parameters(self):
+        """異なるパラメータのリクエストではプールが共有されないこと"""
+        self.pool.acquire(self.request)
+        await asyncio.gather(*self.pool._tasks)
+        
+        other_request = AzureSessionRequest(model="gpt-4o-realtime-preview", voice="shimmer")
+        assert self.pool.acquire(other_request) is None
+        assert self.pool.acquire(self.request) is not None
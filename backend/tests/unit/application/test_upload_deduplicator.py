@@ -0,0 +1,119 @@
+"""
+音声アップロード重複排除のユニットテスト
+"""
+import asyncio
+import io
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+
+from application.dto.audio_dto import AudioMetadata, AudioUploadResponse
+from application.services.audio_upload_service import AudioUploadService
+from application.services.upload_deduplicator import (
+    IdempotencyKeyConflictError,
+    UploadDeduplicator,
+    hash_audio_stream
+)
+
+
+def make_response(audio_id: str) -> AudioUploadResponse:
+    return AudioUploadResponse(
+        audio_id=audio_id,
+        session_id="sess-1",
+        audio_type="user_speech",
+        blob_url=f"https://example.blob.core.windows.net/audio/{audio_id}.mp4",
+        sas_url="https://old-sas",
+        sas_expires_at=datetime(2024, 1, 1),
+        size_bytes=3,
+        metadata=AudioMetadata(),
+        uploaded_at=datetime(2024, 1, 1)
+    )
+
+
+@pytest.mark.asyncio
+class TestUploadDeduplicator:
+    """重複排除のテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.deduplicator = UploadDeduplicator(max_entries=8, ttl_seconds=60)
+        self.calls = 0
+    
+    async def upload(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return make_response(f"audio-{self.calls}")
+    
+    async def test_retry_returns_existing_result(self):
+        """同じ内容の再送は既存の結果を返すこと"""
+        key = self.deduplicator.make_key("hash", "sess-1", "webm")
+        
+        first, first_dedup = await self.deduplicator.run(key, "hash", self.upload)
+        second, second_dedup = await self.deduplicator.run(key, "hash", self.upload)
+        
+        assert self.calls == 1
+        assert (first_dedup, second_dedup) == (False, True)
+        assert second.audio_id == first.audio_id
+    
+    async def test_concurrent_duplicates_share_one_upload(self):
+        """処理中の重複アップロードは完了を待って同じ結果を返すこと"""
+        key = self.deduplicator.make_key("hash", "sess-1", "webm")
+        
+        results = await asyncio.gather(*[
+            self.deduplicator.run(key, "hash", self.upload) for _ in range(3)
+        ])
+        
+        assert self.calls == 1
+        assert {response.audio_id for response, _ in results} == {"audio-1"}
+        assert self.deduplicator.joined == 2
+    
+    async def test_failed_upload_is_not_cached(self):
+        """失敗したアップロードは記録されず、再送時に再実行されること"""
+        key = self.deduplicator.make_key("hash", "sess-1", "webm")
+        
+        async def failing_upload():
+            raise RuntimeError("upload failed")
+        
+        with pytest.raises(RuntimeError):
+            await self.deduplicator.run(key, "hash", failing_upload)
+        response, deduplicated = await self.deduplicator.run(key, "hash", self.upload)
+        
+        assert not deduplicated
+        assert self.calls == 1
+    
+    async def test_idempotency_key_conflict(self):
+        """同じ Idempotency-Key で異なる内容を送ると拒否されること"""
+        key = self.deduplicator.make_key("hash-a", "sess-1", "webm", idempotency_key="retry-1")
+        await self.deduplicator.run(key, "hash-a", self.upload)
+        
+        other_key = self.deduplicator.make_key("hash-b", "sess-1", "webm", idempotency_key="retry-1")
+        with pytest.raises(IdempotencyKeyConflictError):
+            await self.deduplicator.run(other_key, "hash-b", self.upload)
+    
+    async def test_upload_service_skips_upload_and_refreshes_sas(self):
+        """サービス経由の再送で変換・アップロードを行わず、SAS URLを再発行すること"""
+        blob_storage_client = Mock()
+        upload_calls = []
+        
+        async def upload_audio_file_async(audio_file, session_id=None, audio_format="mp4"):
+            upload_calls.append(audio_file.read())
+            return "audio-1", "https://example.blob.core.windows.net/audio/audio-1.mp4", None
+        blob_storage_client.upload_audio_file_async.side_effect = upload_audio_file_async
+        blob_storage_client.generate_sas_url.side_effect = [
+            ("https://sas-1", datetime(2024, 1, 1, 1)),
+            ("https://sas-2", datetime(2024, 1, 1, 2))
+        ]
+        service = AudioUploadService(blob_storage_client, deduplicator=self.deduplicator)
+        
+        first = await service.upload_audio(io.BytesIO(b"abc"), "a.webm", session_id="sess-1")
+        second = await service.upload_audio(io.BytesIO(b"abc"), "a.webm", session_id="sess-1")
+        
+        assert upload_calls == [b"abc"]
+        assert second.audio_id == first.audio_id
+        assert second.sas_url == "https://sas-2"
+    
+    async def test_hash_rewinds_stream(self):
+        """ハッシュ算出後にストリームが先頭に戻ること"""
+        stream = io.BytesIO(b"abc")
+        hash_audio_stream(stream)
+        assert stream.tell() == 0
@@ -0,0 +1,146 @@
+"""
+音声解析（長さ・音量・波形ピーク）のユニットテスト
+"""
+import io
+import json
+import shutil
+import subprocess
+import pytest
+from unittest.mock import patch
+
+np = pytest.importorskip("numpy")
+
+from infrastructure.audio.audio_analyzer import MIN_DBFS, analyze_decoded_pcm, analyze_pcm
+from infrastructure.audio.pcm_decoder import PCM_CHUNK_SAMPLES, DecodedPcm
+from infrastructure.storage.audio_blob_storage_client import ANALYSIS_SIDECAR_SUFFIX, AudioBlobStorageClient
+
+SAMPLE_RATE = 16000
+
+
+def _spool(samples) -> DecodedPcm:
+    """float PCM を DecodedPcm（16bit）に変換"""
+    data = np.round(samples * 32767).astype("<i2").tobytes()
+    return DecodedPcm(output=io.BytesIO(data), sample_rate=SAMPLE_RATE, sample_count=len(samples))
+
+
+class TestAnalyzePcm:
+    """analyze_pcm のテスト"""
+    
+    def test_loudness_of_sine(self):
+        """正弦波の長さ・RMS・ピークが算出されること"""
+        samples = (0.5 * np.sin(2 * np.pi * 440 * np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE)).astype(np.float32)
+        
+        analysis = analyze_pcm(samples, SAMPLE_RATE)
+        
+        assert analysis.duration == pytest.approx(2.0)
+        assert analysis.peak_dbfs == pytest.approx(-6.02, abs=0.05)
+        assert analysis.rms_dbfs == pytest.approx(-9.03, abs=0.05)
+        assert analysis.clipping_ratio == 0.0
+    
+    def test_clipping_ratio(self):
+        """フルスケールのサンプルの割合がクリッピング率になること"""
+        samples = np.zeros(1000, dtype=np.float32)
+        samples[:10] = 1.0
+        samples[10:20] = -1.0
+        
+        analysis = analyze_pcm(samples, SAMPLE_RATE)
+        
+        assert analysis.clipping_ratio == pytest.approx(0.02)
+        assert analysis.peak_dbfs == pytest.approx(0.0)
+    
+    def test_peaks_are_min_max_pairs(self):
+        """区間ごとの最小値・最大値が交互に並ぶこと"""
+        samples = np.concatenate([
+            np.full(SAMPLE_RATE, 0.5),
+            np.full(SAMPLE_RATE, -1.0)
+        ]).astype(np.float32)
+        
+        analysis = analyze_pcm(samples, SAMPLE_RATE, peak_buckets=4)
+        
+        assert analysis.peaks == [64, 64, 64, 64, -127, -127, -127, -127]
+        assert analysis.peaks_per_second == pytest.approx(2.0)
+    
+    def test_short_input_has_fewer_buckets(self):
+        """サンプル数が区間数より少ない場合はサンプル数分の区間になること"""
+        analysis = analyze_pcm(np.array([0.1, -0.1, 0.2], dtype=np.float32), SAMPLE_RATE, peak_buckets=500)
+        
+        assert len(analysis.peaks) == 6
+    
+    def test_empty_input(self):
+        """空の入力でも解析結果を返すこと"""
+        analysis = analyze_pcm(np.zeros(0, dtype=np.float32), SAMPLE_RATE)
+        
+        assert analysis.duration == 0.0
+        assert analysis.rms_dbfs == MIN_DBFS
+        assert analysis.peaks == []
+
+
+class TestAnalyzeDecodedPcm:
+    """analyze_decoded_pcm のテスト"""
+    
+    def test_chunked_analysis_matches_in_memory_analysis(self):
+        """チャンクごとに読み込んでもメモリ上の一括解析と同じ結果になること"""
+        count = 2 * PCM_CHUNK_SAMPLES + 12345
+        rng = np.random.default_rng(0)
+        pcm = _spool(rng.uniform(-1.0, 1.0, count).astype(np.float32))
+        samples = np.concatenate(list(pcm.chunks()))
+        
+        analysis = analyze_decoded_pcm(pcm, peak_buckets=7)
+        
+        assert analysis == analyze_pcm(samples, SAMPLE_RATE, peak_buckets=7)
+    
+    def test_only_kept_ranges_are_analyzed(self):
+        """残す範囲だけを1つの録音として解析すること"""
+        pcm = _spool(np.concatenate([
+            np.full(SAMPLE_RATE, 0.5),
+            np.full(SAMPLE_RATE, -1.0),
+            np.full(SAMPLE_RATE, 0.25)
+        ]).astype(np.float32))
+        
+        analysis = analyze_decoded_pcm(pcm, keep=[(0.0, 1.0), (2.0, 3.0)], peak_buckets=2)
+        
+        assert analysis.duration == pytest.approx(2.0)
+        assert analysis.peaks == [64, 64, 32, 32]
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_upload_stores_analysis_sidecar(monkeypatch):
+    """解析結果がサイドカーBlobに保存され、アップロード結果として返ること"""
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    monkeypatch.setenv("AUDIO_ANALYSIS_ENABLED", "true")
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client = AudioBlobStorageClient()
+    audio_file = io.BytesIO(subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "sine=frequency=440:duration=2:sample_rate=48000",
+            "-c:a", "libopus", "-f", "webm", "pipe:1"
+        ],
+        check=True,
+        capture_output=True
+    ).stdout)
+    uploads = {}
+    
+    class FakeBlobClient:
+        def __init__(self, blob):
+            self.blob = blob
+            self.url = f"https://testaccount.blob.core.windows.net/audio/{blob}"
+        
+        def upload_blob(self, data, overwrite, metadata=None, content_settings=None):
+            uploads[self.blob] = (data if isinstance(data, str) else data.read(), metadata)
+    
+    class FakeServiceClient:
+        def get_blob_client(self, container, blob):
+            return FakeBlobClient(blob)
+    
+    client.blob_service_client = FakeServiceClient()
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        audio_id, blob_url, analysis = client.upload_audio_file(audio_file, "sess-1", "webm")
+    
+    assert analysis.duration == pytest.approx(2.0, abs=0.05)
+    assert len(analysis.peaks) == 1000
+    audio_blob = next(name for name in uploads if not name.endswith(ANALYSIS_SIDECAR_SUFFIX))
+    assert uploads[audio_blob][1]["duration"] == f"{analysis.duration:.3f}"
+    sidecar, _ = uploads[f"{audio_blob}{ANALYSIS_SIDECAR_SUFFIX}"]
+    assert json.loads(sidecar)["peaks"] == analysis.peaks
@@ -0,0 +1,283 @@
+"""
+AudioBlobStorageClient のユニットテスト
+"""
+import io
+import threading
+import pytest
+from urllib.parse import urlparse
+from unittest.mock import patch
+from azure.core.exceptions import ClientAuthenticationError, ResourceNotFoundError, ServiceRequestError
+
+from infrastructure.storage import audio_blob_storage_client
+from infrastructure.storage.audio_blob_storage_client import (
+    AudioBlobStorageClient,
+    get_blocking_executor,
+    shutdown_blocking_executor
+)
+
+
+def _create_client(monkeypatch, **env) -> AudioBlobStorageClient:
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    monkeypatch.setenv("AUDIO_ANALYSIS_ENABLED", "false")
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        return AudioBlobStorageClient()
+
+
+class TestBlockingExecutor:
+    """アップロード用 executor のテスト"""
+    
+    @pytest.fixture(autouse=True)
+    def reset_executor(self):
+        shutdown_blocking_executor()
+        yield
+        shutdown_blocking_executor()
+    
+    async def test_async_upload_runs_blocking_work_on_executor(self, monkeypatch):
+        """非同期アップロードの Blob 書き込みがイベントループ外の executor で実行されること"""
+        client = _create_client(monkeypatch)
+        loop_thread = threading.current_thread()
+        upload_threads = []
+        
+        def fake_upload(transcoded, session_id, audio_format):
+            upload_threads.append(threading.current_thread())
+            return "audio-id", "https://testaccount.blob.core.windows.net/audio/x.mp4", None
+        
+        monkeypatch.setattr(client, "_sniff_upload", lambda audio_file, audio_format: ("mp4", None))
+        monkeypatch.setattr(client, "_transcode", lambda *args, **kwargs: object())
+        monkeypatch.setattr(client, "_upload_transcoded", fake_upload)
+        
+        result = await client.upload_audio_file_async(io.BytesIO(b"data"), "sess-1", "mp4")
+        
+        assert result[0] == "audio-id"
+        assert len(upload_threads) == 1
+        assert upload_threads[0] is not loop_thread
+        assert upload_threads[0].name.startswith("audio-upload")
+    
+    async def test_mp4_passthrough_skips_transcoding_pool(self, monkeypatch):
+        """解析が既定で無効なため、MP4 は変換プールを使わずにそのまま保存されること"""
+        monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+        monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+        monkeypatch.delenv("AUDIO_ANALYSIS_ENABLED", raising=False)
+        with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+            client = AudioBlobStorageClient()
+        
+        async def fail_run(*args, **kwargs):
+            raise AssertionError("transcoding pool must not be used")
+        
+        uploaded = []
+        monkeypatch.setattr(client.transcoding_pool, "run", fail_run)
+        monkeypatch.setattr(client, "_sniff_upload", lambda audio_file, audio_format: ("mp4", None))
+        monkeypatch.setattr(
+            client,
+            "_upload_transcoded",
+            lambda transcoded, session_id, audio_format: uploaded.append(transcoded) or ("audio-id", "url", None)
+        )
+        audio_file = io.BytesIO(b"mp4 data")
+        
+        await client.upload_audio_file_async(audio_file, "sess-1", "mp4")
+        
+        assert client.analysis_enabled is False
+        assert uploaded[0].stream is audio_file
+    
+    def test_executor_is_shared(self):
+        """executor はプロセス内で共有されること"""
+        assert get_blocking_executor() is get_blocking_executor()
+    
+    def test_shutdown_is_idempotent(self):
+        """shutdown を繰り返し呼んでもエラーにならず、次回は新しい executor を作ること"""
+        executor = get_blocking_executor()
+        
+        shutdown_blocking_executor()
+        shutdown_blocking_executor()
+        
+        assert audio_blob_storage_client._blocking_executor is None
+        assert get_blocking_executor() is not executor
+
+
+class FakeContainerClient:
+    def __init__(self, service):
+        self.service = service
+    
+    def exists(self):
+        self.service.exists_calls += 1
+        if self.service.error is not None:
+            raise self.service.error
+        return self.service.container_exists
+    
+    def create_container(self):
+        self.service.created = True
+
+
+class FakeServiceClient:
+    """コンテナ確認の呼び出しを記録する BlobServiceClient"""
+    
+    def __init__(self, container_exists=True, error=None):
+        self.container_exists = container_exists
+        self.error = error
+        self.exists_calls = 0
+        self.created = False
+        self.closed = False
+    
+    def get_container_client(self, container):
+        return FakeContainerClient(self)
+    
+    def close(self):
+        self.closed = True
+
+
+class TestContainerCheck:
+    """コンテナ存在確認のキャッシュのテスト"""
+    
+    def test_container_check_is_cached(self, monkeypatch):
+        """コンテナの確認は一度だけ行われること"""
+        client = _create_client(monkeypatch)
+        service = FakeServiceClient()
+        client.blob_service_client = service
+        assert not client.container_ready
+        
+        client._ensure_container_exists()
+        client._ensure_container_exists()
+        
+        assert service.exists_calls == 1
+        assert client.container_ready
+    
+    def test_missing_container_is_created(self, monkeypatch):
+        """コンテナが無い場合は作成されること"""
+        client = _create_client(monkeypatch)
+        service = FakeServiceClient(container_exists=False)
+        client.blob_service_client = service
+        
+        client._ensure_container_exists()
+        
+        assert service.created
+        assert client.container_ready
+    
+    def test_failed_check_is_not_cached(self, monkeypatch):
+        """確認に失敗した場合は次回に再確認すること"""
+        client = _create_client(monkeypatch)
+        service = FakeServiceClient(error=ResourceNotFoundError("unavailable"))
+        client.blob_service_client = service
+        
+        with pytest.raises(ResourceNotFoundError):
+            client._ensure_container_exists()
+        service.error = None
+        client._ensure_container_exists()
+        
+        assert service.exists_calls == 2
+        assert client.container_ready
+
+
+class TestReconnect:
+    """認証・通信エラー時の再接続のテスト"""
+    
+    @pytest.mark.parametrize("error", [ClientAuthenticationError("expired"), ServiceRequestError("reset")])
+    def test_reconnects_and_retries_once(self, monkeypatch, error):
+        """認証・通信エラーではクライアントを作り直して一度だけ再試行すること"""
+        client = _create_client(monkeypatch)
+        stale, fresh = FakeServiceClient(), FakeServiceClient()
+        client.blob_service_client = stale
+        client._container_ready = True
+        monkeypatch.setattr(client, "_create_blob_service_client", lambda: fresh)
+        calls = []
+        
+        def operation(service):
+            calls.append(service)
+            if service is stale:
+                raise error
+            return "ok"
+        
+        assert client._call_with_reconnect(operation) == "ok"
+        assert calls == [stale, fresh]
+        assert client.blob_service_client is fresh
+        assert stale.closed
+        assert not client.container_ready
+    
+    def test_second_failure_is_raised(self, monkeypatch):
+        """再試行も失敗した場合は例外を送出すること"""
+        client = _create_client(monkeypatch)
+        client.blob_service_client = FakeServiceClient()
+        monkeypatch.setattr(client, "_create_blob_service_client", FakeServiceClient)
+        calls = []
+        
+        def operation(service):
+            calls.append(service)
+            raise ClientAuthenticationError("invalid key")
+        
+        with pytest.raises(ClientAuthenticationError):
+            client._call_with_reconnect(operation)
+        assert len(calls) == 2
+    
+    def test_other_errors_do_not_reconnect(self, monkeypatch):
+        """認証・通信以外のエラーでは再接続しないこと"""
+        client = _create_client(monkeypatch)
+        service = FakeServiceClient()
+        client.blob_service_client = service
+        monkeypatch.setattr(client, "_create_blob_service_client", FakeServiceClient)
+        
+        def operation(service):
+            raise ResourceNotFoundError("missing")
+        
+        with pytest.raises(ResourceNotFoundError):
+            client._call_with_reconnect(operation)
+        assert client.blob_service_client is service
+    
+    def test_concurrent_failures_reconnect_once(self, monkeypatch):
+        """同じクライアントで失敗した呼び出しが重なっても再接続は一度だけであること"""
+        client = _create_client(monkeypatch)
+        stale = FakeServiceClient()
+        client.blob_service_client = stale
+        created = []
+        
+        def create():
+            created.append(FakeServiceClient())
+            return created[-1]
+        
+        monkeypatch.setattr(client, "_create_blob_service_client", create)
+        
+        client._reconnect(stale)
+        client._reconnect(stale)
+        
+        assert len(created) == 1
+        assert client.blob_service_client is created[0]
+
+
+class TestBlobUrls:
+    """Blob URL と Blob 名の変換のテスト"""
+    
+    BLOB_NAME = "audio/s/x.mp4"
+    
+    def test_blob_name_round_trip(self, monkeypatch):
+        """Blob名の先頭の audio/ がコンテナ名と混同されないこと"""
+        client = _create_client(monkeypatch)
+        
+        blob_url = client.get_blob_url(self.BLOB_NAME)
+        
+        assert urlparse(blob_url).path == "/audio/audio/s/x.mp4"
+        assert client.blob_name_from_url(blob_url) == self.BLOB_NAME
+    
+    def test_blob_name_round_trip_with_path_style_endpoint(self, monkeypatch):
+        """アカウント名がパスに含まれるエンドポイントでも Blob 名を復元できること"""
+        client = _create_client(monkeypatch, AZURE_STORAGE_BLOB_ENDPOINT="http://127.0.0.1:10000/testaccount")
+        
+        blob_url = client.get_blob_url(self.BLOB_NAME)
+        
+        assert client.blob_name_from_url(blob_url) == self.BLOB_NAME
+    
+    def test_sas_url_points_at_the_blob(self, monkeypatch):
+        """SAS URL がアップロードした Blob を指すこと"""
+        client = _create_client(monkeypatch)
+        blob_url = client.get_blob_url(self.BLOB_NAME)
+        
+        sas_url, _ = client.generate_sas_url(blob_url)
+        
+        assert sas_url.startswith(f"{blob_url}?")
+    
+    def test_url_outside_container_is_rejected(self, monkeypatch):
+        """コンテナ外の URL は拒否されること"""
+        client = _create_client(monkeypatch)
+        
+        with pytest.raises(ValueError):
+            client.blob_name_from_url("https://testaccount.blob.core.windows.net/other/audio/s/x.mp4")
@@ -0,0 +1,70 @@
+"""
+音声メタデータインデックスのユニットテスト
+"""
+from datetime import datetime, timedelta
+import pytest
+
+from infrastructure.storage.audio_metadata_index import AudioMetadataIndex, AudioRecord
+
+
+def make_record(audio_id: str, session_id: str, minutes: int) -> AudioRecord:
+    return AudioRecord(
+        audio_id=audio_id,
+        session_id=session_id,
+        blob_name=f"audio/{session_id}/{audio_id}_x.mp4",
+        size_bytes=100,
+        duration=1.5,
+        format="mp4",
+        original_format="webm",
+        audio_type="user_speech",
+        uploaded_at=datetime(2024, 1, 1) + timedelta(minutes=minutes)
+    )
+
+
+class TestAudioMetadataIndex:
+    """音声メタデータインデックスのテスト"""
+    
+    @pytest.fixture(autouse=True)
+    def index(self, tmp_path):
+        self.index = AudioMetadataIndex(str(tmp_path / "index" / "audio.db"))
+        for i in range(5):
+            self.index.add(make_record(f"a{i}", "sess-1", i))
+        self.index.add(make_record("b0", "sess-2", 2))
+        yield
+        self.index.close()
+    
+    def test_get(self):
+        """音声IDで登録内容を取得できること"""
+        record = self.index.get("a1")
+        
+        assert record == make_record("a1", "sess-1", 1)
+        assert self.index.get("missing") is None
+    
+    def test_query_by_session_with_pagination(self):
+        """セッションで絞り込み、カーソルで続きを取得できること"""
+        first_page = self.index.query(session_id="sess-1", limit=2)
+        last = first_page[-1]
+        second_page = self.index.query(
+            session_id="sess-1",
+            limit=10,
+            after=(last.uploaded_at, last.audio_id)
+        )
+        
+        assert [record.audio_id for record in first_page] == ["a0", "a1"]
+        assert [record.audio_id for record in second_page] == ["a2", "a3", "a4"]
+    
+    def test_query_by_time_range(self):
+        """アップロード日時の範囲で絞り込めること"""
+        records = self.index.query(
+            start=datetime(2024, 1, 1, 0, 2),
+            end=datetime(2024, 1, 1, 0, 4)
+        )
+        
+        assert [record.audio_id for record in records] == ["a2", "b0", "a3"]
+    
+    def test_add_replaces_existing(self):
+        """同じ音声IDの登録は上書きされること"""
+        self.index.add(make_record("a0", "sess-3", 10))
+        
+        assert self.index.get("a0").session_id == "sess-3"
+        assert len(self.index.query(session_id="sess-1")) == 4
@@ -0,0 +1,177 @@
+"""
+音声保存ポリシー（remux / transcode）のユニットテスト
+"""
+import io
+import shutil
+import subprocess
+import ffmpeg
+import pytest
+from unittest.mock import patch
+
+from infrastructure.audio.container_sniffer import ContainerInfo
+from infrastructure.storage.audio_blob_storage_client import (
+    AudioBlobStorageClient,
+    PROCESSING_PASSTHROUGH,
+    PROCESSING_REMUX,
+    PROCESSING_TRANSCODE
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+def _generate_audio(codec: str, container: str) -> io.BytesIO:
+    """ffmpeg で1秒のサイン波を生成"""
+    output = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "sine=frequency=440:duration=1:sample_rate=48000",
+            "-c:a", codec, "-f", container, "pipe:1"
+        ],
+        check=True,
+        capture_output=True
+    ).stdout
+    return io.BytesIO(output)
+
+
+def _create_client(monkeypatch, **env) -> AudioBlobStorageClient:
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    monkeypatch.setenv("AUDIO_ANALYSIS_ENABLED", "false")
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        return AudioBlobStorageClient()
+
+
+@pytest.mark.parametrize("transcode_mode", [
+    "pipe",
+    pytest.param("file", marks=pytest.mark.skipif(shutil.which("ffprobe") is None, reason="ffprobe is not installed"))
+])
+def test_opus_webm_is_remuxed_without_reencoding(monkeypatch, transcode_mode):
+    """WebM の Opus は再エンコードせずに MP4 に格納されること"""
+    client = _create_client(monkeypatch, AUDIO_TRANSCODE_MODE=transcode_mode)
+    
+    transcoded = client._transcode(_generate_audio("libopus", "webm"), "webm")
+    try:
+        assert transcoded.processing == PROCESSING_REMUX
+        assert transcoded.codec == "opus"
+        assert transcoded.container == "mp4"
+        transcoded.stream.seek(0)
+        assert transcoded.stream.read(12)[4:8] == b"ftyp"
+    finally:
+        transcoded.release()
+
+
+def test_failed_remux_falls_back_to_transcode_in_file_mode(monkeypatch):
+    """一時ファイル方式でもコピーに失敗した場合は再エンコードされること"""
+    client = _create_client(monkeypatch, AUDIO_TRANSCODE_MODE="file")
+    run_ffmpeg_to_file = client._run_ffmpeg_to_file
+    
+    def fail_stream_copy(input_path, source_format, output_options, timeout=None):
+        if output_options.get("c:a") == "copy":
+            raise ffmpeg.Error("ffmpeg", b"", b"Could not write header")
+        return run_ffmpeg_to_file(input_path, source_format, output_options, timeout)
+    
+    monkeypatch.setattr(client, "_run_ffmpeg_to_file", fail_stream_copy)
+    sniffed = ContainerInfo(format="webm", codec="opus", sample_rate=48000, channels=1, duration=1.0)
+    
+    transcoded = client._transcode(_generate_audio("libopus", "webm"), "webm", sniffed=sniffed)
+    try:
+        assert transcoded.processing == PROCESSING_TRANSCODE
+        assert transcoded.codec == "aac"
+        transcoded.stream.seek(0)
+        assert transcoded.stream.read(12)[4:8] == b"ftyp"
+    finally:
+        transcoded.release()
+
+
+def test_opus_webm_is_remuxed_into_ogg(monkeypatch):
+    """AUDIO_REMUX_CONTAINER=ogg の場合は Ogg に格納されること"""
+    client = _create_client(monkeypatch, AUDIO_REMUX_CONTAINER="ogg")
+    
+    transcoded = client._transcode(_generate_audio("libopus", "webm"), "webm")
+    try:
+        assert transcoded.processing == PROCESSING_REMUX
+        assert transcoded.container == "ogg"
+        transcoded.stream.seek(0)
+        assert transcoded.stream.read(4) == b"OggS"
+    finally:
+        transcoded.release()
+
+
+def test_wav_is_transcoded(monkeypatch):
+    """PCM の WAV は AAC に再エンコードされること"""
+    client = _create_client(monkeypatch)
+    
+    transcoded = client._transcode(_generate_audio("pcm_s16le", "wav"), "wav")
+    try:
+        assert transcoded.processing == PROCESSING_TRANSCODE
+        assert transcoded.codec == "aac"
+        assert transcoded.container == "mp4"
+    finally:
+        transcoded.release()
+
+
+def test_unsupported_codec_falls_back_to_transcode(monkeypatch):
+    """格納先コンテナが受け付けないコーデックは再エンコードされること"""
+    client = _create_client(monkeypatch, AUDIO_REMUX_CONTAINER="ogg")
+    
+    transcoded = client._transcode(_generate_audio("aac", "adts"), "aac")
+    try:
+        assert transcoded.processing == PROCESSING_TRANSCODE
+        assert transcoded.container == "mp4"
+    finally:
+        transcoded.release()
+
+
+def test_transcode_policy_always_reencodes(monkeypatch):
+    """AUDIO_STORAGE_POLICY=transcode の場合は常に AAC に再エンコードされること"""
+    client = _create_client(monkeypatch, AUDIO_STORAGE_POLICY="transcode")
+    
+    transcoded = client._transcode(_generate_audio("libopus", "webm"), "webm")
+    try:
+        assert transcoded.processing == PROCESSING_TRANSCODE
+        assert transcoded.codec == "aac"
+    finally:
+        transcoded.release()
+
+
+def test_mp4_is_stored_as_is(monkeypatch):
+    """MP4 はそのまま保存されること"""
+    client = _create_client(monkeypatch)
+    audio_file = io.BytesIO(b"mp4 data")
+    
+    transcoded = client._transcode(audio_file, "mp4")
+    
+    assert transcoded.processing == PROCESSING_PASSTHROUGH
+    assert transcoded.stream is audio_file
+
+
+def test_upload_records_processing_in_metadata(monkeypatch):
+    """保存方法がBlobメタデータに記録され、拡張子が格納コンテナに合うこと"""
+    client = _create_client(monkeypatch, AUDIO_REMUX_CONTAINER="ogg")
+    transcoded = client._transcode(_generate_audio("libopus", "webm"), "webm")
+    uploads = []
+    
+    class FakeBlobClient:
+        url = "https://testaccount.blob.core.windows.net/audio/x"
+        
+        def upload_blob(self, data, overwrite, metadata):
+            uploads.append(metadata)
+    
+    class FakeServiceClient:
+        def get_blob_client(self, container, blob):
+            uploads.append(blob)
+            return FakeBlobClient()
+    
+    client.blob_service_client = FakeServiceClient()
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client._upload_transcoded(transcoded, "sess-1", "webm")
+    
+    blob_name, metadata = uploads
+    assert blob_name.endswith(".ogg")
+    assert metadata["format"] == "ogg"
+    assert metadata["original_format"] == "webm"
+    assert metadata["processing"] == PROCESSING_REMUX
+    assert metadata["storage_policy"] == "remux"
+    assert metadata["codec"] == "opus"
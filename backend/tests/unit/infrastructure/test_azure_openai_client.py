@@ -0,0 +1,182 @@
+"""
+Azure OpenAI クライアントのユニットテスト
+"""
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from infrastructure.azure.azure_openai_client import AzureOpenAIClient, AzureOpenAIException
+from infrastructure.azure.resilience import CircuitBreaker, RetryPolicy
+from application.dto.azure_dto import AzureSessionRequest
+
+
+def _session_payload(session_id: str = "sess_test123") -> dict:
+    return {
+        "id": session_id,
+        "object": "realtime.session",
+        "model": "gpt-4o-realtime-preview",
+        "expires_at": 1704067200,
+        "client_secret": {"value": "ek_test123", "expires_at": 1704067200}
+    }
+
+
+async def _start_server(handler) -> TestServer:
+    """テスト用のAzure OpenAI スタブサーバーを起動"""
+    app = web.Application()
+    app.router.add_post("/openai/realtimeapi/sessions", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest.mark.asyncio
+class TestAzureOpenAIClient:
+    """Azure OpenAI クライアントのテスト"""
+    
+    async def test_create_session_reuses_pooled_connection(self):
+        """連続したセッション作成でキープアライブ接続が再利用されること"""
+        async def handler(request: web.Request) -> web.Response:
+            return web.json_response(_session_payload())
+        
+        server = await _start_server(handler)
+        client = AzureOpenAIClient(endpoint=str(server.make_url("")), api_key="test-key")
+        try:
+            await client.start()
+            for _ in range(3):
+                result = await client.create_session(
+                    AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy")
+                )
+                assert result.id == "sess_test123"
+            
+            stats = client.pool_stats
+            assert stats["new_connections"] == 1
+            assert stats["reused_connections"] == 2
+        finally:
+            await client.close()
+            await server.close()
+    
+    async def test_create_session_error_response(self):
+        """Azureのエラーレスポンスが例外に変換されること"""
+        async def handler(request: web.Request) -> web.Response:
+            return web.json_response(
+                {"error": {"code": "BadRequest", "message": "invalid voice"}}, status=400
+            )
+        
+        server = await _start_server(handler)
+        client = AzureOpenAIClient(endpoint=str(server.make_url("")), api_key="test-key")
+        try:
+            with pytest.raises(AzureOpenAIException) as exc_info:
+                await client.create_session(
+                    AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy")
+                )
+            assert exc_info.value.status_code == 400
+            assert exc_info.value.error_code == "BadRequest"
+        finally:
+            await client.close()
+            await server.close()
+    
+    async def test_create_session_retries_transient_errors(self):
+        """5xx・429 はリトライされ、Retry-After が尊重されること"""
+        statuses = [503, 429]
+        
+        async def handler(request: web.Request) -> web.Response:
+            if statuses:
+                return web.json_response(
+                    {"error": {"code": "Busy", "message": "busy"}},
+                    status=statuses.pop(0),
+                    headers={"retry-after-ms": "10"}
+                )
+            return web.json_response(_session_payload())
+        
+        server = await _start_server(handler)
+        client = AzureOpenAIClient(
+            endpoint=str(server.make_url("")),
+            api_key="test-key",
+            retry_policy=RetryPolicy(max_retries=3, base_delay=0.001)
+        )
+        try:
+            result = await client.create_session(
+                AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy")
+            )
+            assert result.id == "sess_test123"
+            assert client.resilience_stats["retries"] == 2
+        finally:
+            await client.close()
+            await server.close()
+    
+    async def test_create_session_fails_fast_when_circuit_open(self):
+        """連続した障害でサーキットが開き、Azureに送信せず失敗すること"""
+        calls = []
+        
+        async def handler(request: web.Request) -> web.Response:
+            calls.append(request)
+            return web.json_response({"error": {"message": "down"}}, status=500)
+        
+        server = await _start_server(handler)
+        client = AzureOpenAIClient(
+            endpoint=str(server.make_url("")),
+            api_key="test-key",
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        )
+        request = AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy")
+        try:
+            for _ in range(2):
+                with pytest.raises(AzureOpenAIException):
+                    await client.create_session(request)
+            
+            with pytest.raises(AzureOpenAIException) as exc_info:
+                await client.create_session(request)
+            assert exc_info.value.status_code == 503
+            assert exc_info.value.error_code == "circuit_open"
+            assert exc_info.value.retry_after > 0
+            assert len(calls) == 2
+        finally:
+            await client.close()
+            await server.close()
+    
+    async def test_proxy_webrtc_sdp_uses_ephemeral_key(self):
+        """SDP Offer がエフェメラルキーで送信され、Answer が返ること"""
+        received = {}
+        
+        async def handler(request: web.Request) -> web.Response:
+            received["authorization"] = request.headers.get("Authorization")
+            received["content_type"] = request.headers.get("Content-Type")
+            received["model"] = request.query.get("model")
+            received["body"] = await request.text()
+            return web.Response(text="v=0\r\no=- answer\r\n", content_type="application/sdp", status=201)
+        
+        app = web.Application()
+        app.router.add_post("/openai/realtime", handler)
+        server = TestServer(app)
+        await server.start_server()
+        client = AzureOpenAIClient(endpoint=str(server.make_url("")), api_key="test-key")
+        try:
+            answer = await client.proxy_webrtc_sdp("gpt-4o-realtime-preview", "ek_test123", "v=0\r\no=- offer\r\n")
+            
+            assert answer == "v=0\r\no=- answer\r\n"
+            assert received["authorization"] == "Bearer ek_test123"
+            assert received["content_type"] == "application/sdp"
+            assert received["model"] == "gpt-4o-realtime-preview"
+            assert received["body"] == "v=0\r\no=- offer\r\n"
+        finally:
+            await client.close()
+            await server.close()
+    
+    async def test_proxy_webrtc_sdp_error_response(self):
+        """SDP 交換のエラーが例外に変換されること"""
+        async def handler(request: web.Request) -> web.Response:
+            return web.Response(text="Unauthorized", status=401)
+        
+        app = web.Application()
+        app.router.add_post("/openai/realtime", handler)
+        server = TestServer(app)
+        await server.start_server()
+        client = AzureOpenAIClient(endpoint=str(server.make_url("")), api_key="test-key")
+        try:
+            with pytest.raises(AzureOpenAIException) as exc_info:
+                await client.proxy_webrtc_sdp("gpt-4o-realtime-preview", "ek_expired", "v=0\r\n")
+            assert exc_info.value.status_code == 401
+        finally:
+            await client.close()
+            await server.close()
@@ -0,0 +1,105 @@
+"""
+ブロック分割アップロードのユニットテスト
+"""
+import io
+import threading
+import pytest
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+from infrastructure.storage.block_uploader import BlockBlobUploader, make_block_id
+
+
+class FakeBlobClient:
+    """ステージ済みブロックをメモリに保持するBlobクライアント"""
+    
+    def __init__(self, fail_blocks=None):
+        self.staged = {}
+        self.committed = None
+        self.metadata = None
+        self.stage_calls = []
+        self.fail_blocks = dict(fail_blocks or {})
+        self._lock = threading.Lock()
+    
+    def get_block_list(self, block_list_type='committed'):
+        uncommitted = [type("Block", (), {"id": block_id})() for block_id in self.staged]
+        return [], uncommitted
+    
+    def stage_block(self, block_id, data, length=None):
+        with self._lock:
+            self.stage_calls.append(block_id)
+            remaining = self.fail_blocks.get(block_id, 0)
+            if remaining:
+                self.fail_blocks[block_id] = remaining - 1
+                raise ServiceRequestError("connection reset")
+            self.staged[block_id] = bytes(data)
+    
+    def commit_block_list(self, block_list, metadata=None, content_settings=None):
+        self.committed = b"".join(self.staged[block.id] for block in block_list)
+        self.metadata = metadata
+
+
+class TestBlockBlobUploader:
+    """ブロック分割アップロードのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.data = bytes(range(256)) * 40  # 10240 bytes
+        self.uploader = BlockBlobUploader(block_size=1024, max_concurrency=3, retry_backoff_seconds=0)
+    
+    def test_upload_commits_blocks_in_order(self):
+        """並列ステージングしても元の順序でコミットされること"""
+        blob_client = FakeBlobClient()
+        
+        count = self.uploader.upload(blob_client, io.BytesIO(self.data), metadata={"audio_id": "a"})
+        
+        assert count == 10
+        assert blob_client.committed == self.data
+        assert blob_client.metadata == {"audio_id": "a"}
+    
+    def test_transient_block_failure_is_retried(self):
+        """一時的なエラーのブロックのみ再送されること"""
+        failing_id = make_block_id(3, self.data[3072:4096])
+        blob_client = FakeBlobClient(fail_blocks={failing_id: 2})
+        
+        self.uploader.upload(blob_client, io.BytesIO(self.data))
+        
+        assert blob_client.committed == self.data
+        assert blob_client.stage_calls.count(failing_id) == 3
+        assert len(blob_client.stage_calls) == 12
+    
+    def test_resume_skips_already_staged_blocks(self):
+        """再実行時にステージ済みのブロックを再送しないこと"""
+        failing_id = make_block_id(5, self.data[5120:6144])
+        uploader = BlockBlobUploader(block_size=1024, max_concurrency=1, max_block_retries=0)
+        blob_client = FakeBlobClient(fail_blocks={failing_id: 1})
+        
+        with pytest.raises(ServiceRequestError):
+            uploader.upload(blob_client, io.BytesIO(self.data))
+        staged_before = set(blob_client.staged)
+        blob_client.stage_calls.clear()
+        
+        uploader.upload(blob_client, io.BytesIO(self.data))
+        
+        assert blob_client.committed == self.data
+        assert failing_id in blob_client.stage_calls
+        assert not staged_before & set(blob_client.stage_calls)
+    
+    def test_non_transient_error_is_not_retried(self):
+        """一時的でないエラーは再試行しないこと"""
+        failing_id = make_block_id(0, self.data[:1024])
+        blob_client = FakeBlobClient()
+        
+        def stage_block(block_id, data, length=None):
+            blob_client.stage_calls.append(block_id)
+            error = HttpResponseError("forbidden")
+            error.status_code = 403
+            raise error
+        blob_client.stage_block = stage_block
+        
+        with pytest.raises(HttpResponseError):
+            self.uploader.upload(blob_client, io.BytesIO(self.data[:1024]))
+        assert blob_client.stage_calls == [failing_id]
+    
+    def test_block_ids_have_equal_length(self):
+        """ブロックIDの長さが一定であること"""
+        assert len(make_block_id(0, b"a")) == len(make_block_id(123456, b"b" * 4096))
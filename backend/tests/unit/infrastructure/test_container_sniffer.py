@@ -0,0 +1,148 @@
+"""
+マジックバイトによるコンテナ判定・ヘッダー解析のユニットテスト
+"""
+import io
+import shutil
+import struct
+import subprocess
+import pytest
+from unittest.mock import patch
+
+from infrastructure.audio.container_sniffer import InvalidAudioError, sniff_audio_file, sniff_container
+from infrastructure.storage.audio_blob_storage_client import AudioBlobStorageClient
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+def _generate(codec: str, container: str, *extra_args: str) -> bytes:
+    """ffmpeg で1秒のサイン波を指定のコーデック・コンテナで生成"""
+    return subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "sine=frequency=440:duration=1:sample_rate=48000",
+            "-ac", "2", "-c:a", codec, *extra_args, "-f", container, "pipe:1"
+        ],
+        check=True,
+        capture_output=True
+    ).stdout
+
+
+def _encoder_available(name: str) -> bool:
+    """ffmpeg にエンコーダーが組み込まれているか"""
+    if shutil.which("ffmpeg") is None:
+        return False
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True)
+    return f" {name} " in result.stdout
+
+
+def _wav_header(data_size: int) -> bytes:
+    """16kHzモノラル16bitのWAVヘッダー"""
+    return (
+        b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+class TestSniffContainer:
+    """sniff_container のテスト"""
+    
+    def test_wav_header(self):
+        """WAVヘッダーから形式・長さが読めること"""
+        header = _wav_header(32000)
+        
+        info = sniff_container(header + b"\x00" * 32000, len(header) + 32000)
+        
+        assert info.format == "wav"
+        assert info.codec == "pcm_s16le"
+        assert info.sample_rate == 16000
+        assert info.channels == 1
+        assert info.duration == pytest.approx(1.0)
+        assert info.is_complete
+    
+    def test_empty_file_is_rejected(self):
+        """空のファイルは不正として扱うこと"""
+        with pytest.raises(InvalidAudioError):
+            sniff_container(b"", 0)
+    
+    def test_truncated_file_is_rejected(self):
+        """ヘッダーの途中で終わるファイルは不正として扱うこと"""
+        header = _wav_header(32000)[:30]
+        
+        with pytest.raises(InvalidAudioError):
+            sniff_container(header, len(header))
+    
+    def test_unknown_data_returns_none(self):
+        """判定できないデータは None を返すこと"""
+        assert sniff_container(b"not an audio file" * 10, 170) is None
+
+
+@requires_ffmpeg
+class TestSniffGeneratedAudio:
+    """ffmpeg で生成した音声ファイルの判定テスト"""
+    
+    @pytest.mark.parametrize("codec, container, expected_format, expected_codec, extra_args", [
+        ("libopus", "webm", "webm", "opus", ()),
+        ("libopus", "ogg", "ogg", "opus", ()),
+        ("pcm_s16le", "wav", "wav", "pcm_s16le", ()),
+        ("flac", "flac", "flac", "flac", ()),
+        ("aac", "mp4", "mp4", "aac", ("-movflags", "frag_keyframe+empty_moov")),
+    ])
+    def test_sniff(self, codec, container, expected_format, expected_codec, extra_args):
+        """コンテナ・コーデック・チャンネル数がヘッダーから読めること"""
+        audio_file = io.BytesIO(_generate(codec, container, *extra_args))
+        audio_file.seek(0)
+        
+        info = sniff_audio_file(audio_file)
+        
+        assert info.format == expected_format
+        assert info.codec == expected_codec
+        assert info.channels == 2
+        assert audio_file.tell() == 0
+    
+    @pytest.mark.skipif(not _encoder_available("libmp3lame"), reason="libmp3lame is not available")
+    def test_sniff_mp3(self):
+        """MP3 のフレームヘッダーから形式が読めること"""
+        info = sniff_audio_file(io.BytesIO(_generate("libmp3lame", "mp3")))
+        
+        assert info.format == "mp3"
+        assert info.codec == "mp3"
+        assert info.sample_rate == 48000
+    
+    def test_stream_position_is_restored(self):
+        """読み取り後にストリーム位置が元に戻ること"""
+        audio_file = io.BytesIO(_generate("libopus", "webm"))
+        audio_file.seek(16)
+        
+        info = sniff_audio_file(audio_file)
+        
+        assert info.format == "webm"
+        assert audio_file.tell() == 16
+
+
+def test_broken_upload_is_rejected_without_ffmpeg(monkeypatch):
+    """宣言された形式として読めないアップロードは ffmpeg を起動せずに拒否されること"""
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client = AudioBlobStorageClient()
+    
+    with patch.object(AudioBlobStorageClient, "_transcode") as transcode:
+        with pytest.raises(InvalidAudioError):
+            client.upload_audio_file(io.BytesIO(b"garbage" * 100), "sess-1", "webm")
+    
+    transcode.assert_not_called()
+
+
+@requires_ffmpeg
+def test_mislabelled_upload_uses_sniffed_format(monkeypatch):
+    """拡張子と中身が異なる場合はヘッダーから判定した形式で処理されること"""
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client = AudioBlobStorageClient()
+    
+    detected_format, sniffed = client._sniff_upload(io.BytesIO(_generate("libopus", "ogg")), "webm")
+    
+    assert detected_format == "ogg"
+    assert sniffed.codec == "opus"
@@ -0,0 +1,35 @@
+"""
+依存性注入設定のユニットテスト
+"""
+import os
+
+from infrastructure.configuration import dependencies
+
+
+class TestDataFilePath:
+    """SQLite データファイルのパスのテスト"""
+    
+    def test_default_is_under_backend_data_dir(self, monkeypatch, tmp_path):
+        """未指定時はカレントディレクトリではなく backend/data 配下になること"""
+        monkeypatch.delenv("APP_DATA_DIR", raising=False)
+        monkeypatch.delenv("AUDIO_INDEX_DB_PATH", raising=False)
+        monkeypatch.chdir(tmp_path)
+        
+        path = dependencies._data_file_path("AUDIO_INDEX_DB_PATH", "audio_index.db")
+        
+        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        assert path == os.path.join(backend_dir, "data", "audio_index.db")
+    
+    def test_data_dir_is_configurable(self, monkeypatch, tmp_path):
+        """APP_DATA_DIR を指定した場合はその配下になること"""
+        monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+        monkeypatch.delenv("RATE_LIMIT_DB_PATH", raising=False)
+        
+        assert dependencies._data_file_path("RATE_LIMIT_DB_PATH", "rate_limit.db") == str(tmp_path / "rate_limit.db")
+    
+    def test_explicit_path_wins(self, monkeypatch, tmp_path):
+        """個別のパスが指定されていればそれを使うこと"""
+        monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+        monkeypatch.setenv("AUDIO_INDEX_DB_PATH", "/var/lib/app/index.db")
+        
+        assert dependencies._data_file_path("AUDIO_INDEX_DB_PATH", "audio_index.db") == "/var/lib/app/index.db"
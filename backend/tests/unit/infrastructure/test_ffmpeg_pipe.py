@@ -0,0 +1,55 @@
+"""
+ffmpeg パイプ変換ユーティリティのユニットテスト
+"""
+from infrastructure.audio.ffmpeg_pipe import parse_input_audio_info
+
+
+WEBM_STDERR = """Input #0, matroska,webm, from 'pipe:0':
+  Metadata:
+    ENCODER         : Lavf61.1.100
+  Duration: 00:00:03.01, start: -0.007000, bitrate: N/A
+  Stream #0:0: Audio: opus, 48000 Hz, mono, fltp
+Stream mapping:
+  Stream #0:0 -> #0:0 (opus (native) -> aac (native))
+Output #0, mp4, to 'pipe:1':
+  Stream #0:0: Audio: aac (LC) (mp4a / 0x6134706D), 32000 Hz, mono, fltp, 127 kb/s
+size=      37KiB time=00:00:03.00 bitrate= 100.9kbits/s speed=  19x
+"""
+
+PIPED_WAV_STDERR = """Input #0, wav, from 'pipe:0':
+  Duration: N/A, bitrate: 1536 kb/s
+  Stream #0:0: Audio: pcm_s16le ([1][0][0][0] / 0x0001), 48000 Hz, stereo, s16, 1536 kb/s
+Stream mapping:
+  Stream #0:0 -> #0:0 (pcm_s16le (native) -> aac (native))
+Output #0, mp4, to 'pipe:1':
+  Stream #0:0: Audio: aac (LC), 32000 Hz, mono, fltp, 127 kb/s
+size=      80KiB time=00:00:05.12 bitrate= 127.0kbits/s speed=  40x
+"""
+
+
+def test_parse_input_audio_info_uses_input_section():
+    """入力ストリームの情報（出力側ではない）を取得すること"""
+    info = parse_input_audio_info(WEBM_STDERR)
+    
+    assert info is not None
+    assert info.codec == "opus"
+    assert info.sample_rate == 48000
+    assert info.channels == 1
+    assert info.duration == 3.01
+
+
+def test_parse_input_audio_info_falls_back_to_progress_time():
+    """パイプ入力で Duration が N/A の場合は最終進捗時刻を使うこと"""
+    info = parse_input_audio_info(PIPED_WAV_STDERR)
+    
+    assert info is not None
+    assert info.codec == "pcm_s16le"
+    assert info.channels == 2
+    assert info.duration == 5.12
+
+
+def test_parse_input_audio_info_without_audio_stream():
+    """音声ストリームがない場合は None を返すこと"""
+    stderr = "Input #0, matroska,webm, from 'pipe:0':\n  Stream #0:0: Video: vp8, yuv420p\n"
+    
+    assert parse_input_audio_info(stderr) is None
@@ -0,0 +1,225 @@
+"""
+負荷分散 Azure OpenAI クライアントのユニットテスト
+"""
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from application.dto.azure_dto import AzureSessionRequest
+from infrastructure.azure.azure_openai_client import AzureOpenAIClient, AzureOpenAIException
+from infrastructure.azure.load_balanced_client import (
+    ROUTING_LEAST_LATENCY,
+    AzureOpenAIBackend,
+    LoadBalancedAzureOpenAIClient
+)
+from infrastructure.azure.resilience import RetryPolicy
+
+
+def _session_payload(session_id: str) -> dict:
+    return {
+        "id": session_id,
+        "object": "realtime.session",
+        "model": "gpt-4o-realtime-preview",
+        "expires_at": 1704067200,
+        "client_secret": {"value": "ek_test123", "expires_at": 1704067200}
+    }
+
+
+async def _start_server(status: int, session_id: str, headers: dict = None, sdp_status: int = 201) -> TestServer:
+    """固定のレスポンスを返すスタブサーバーを起動"""
+    calls = []
+    sdp_calls = []
+    
+    async def handler(request: web.Request) -> web.Response:
+        calls.append(request)
+        if status == 200:
+            return web.json_response(_session_payload(session_id))
+        return web.json_response({"error": {"message": "failed"}}, status=status, headers=headers)
+    
+    async def sdp_handler(request: web.Request) -> web.Response:
+        sdp_calls.append(request)
+        if sdp_status != 201:
+            return web.json_response({"error": {"message": "invalid ephemeral key"}}, status=sdp_status)
+        return web.Response(text=f"v=0\r\ns={session_id}\r\n", content_type="application/sdp", status=201)
+    
+    app = web.Application()
+    app.router.add_post("/openai/realtimeapi/sessions", handler)
+    app.router.add_post("/openai/realtime", sdp_handler)
+    server = TestServer(app)
+    await server.start_server()
+    server.calls = calls
+    server.sdp_calls = sdp_calls
+    return server
+
+
+def _backend(name: str, server: TestServer, weight: float = 1.0) -> AzureOpenAIBackend:
+    client = AzureOpenAIClient(
+        endpoint=str(server.make_url("")),
+        api_key="test-key",
+        retry_policy=RetryPolicy(max_retries=0)
+    )
+    return AzureOpenAIBackend(name=name, client=client, weight=weight)
+
+
+@pytest.mark.asyncio
+class TestLoadBalancedAzureOpenAIClient:
+    """負荷分散クライアントのテスト"""
+    
+    @pytest.fixture(autouse=True)
+    async def servers(self):
+        self.servers = []
+        yield
+        for server in self.servers:
+            await server.close()
+    
+    async def _server(
+        self,
+        status: int,
+        session_id: str = "sess",
+        headers: dict = None,
+        sdp_status: int = 201
+    ) -> TestServer:
+        server = await _start_server(status, session_id, headers, sdp_status)
+        self.servers.append(server)
+        return server
+    
+    async def test_fails_over_on_throttling(self):
+        """429 のエンドポイントを Retry-After の間除外し、次のエンドポイントで作成すること"""
+        throttled = await self._server(429, headers={"Retry-After": "20"})
+        healthy = await self._server(200, session_id="sess_b")
+        client = LoadBalancedAzureOpenAIClient(
+            [_backend("a", throttled, weight=100), _backend("b", healthy, weight=1)],
+            rng=lambda: 0.0
+        )
+        try:
+            request = AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy")
+            first = await client.create_session(request)
+            second = await client.create_session(request)
+            
+            assert (first.id, second.id) == ("sess_b", "sess_b")
+            assert len(throttled.calls) == 1
+            stats = {stat["name"]: stat for stat in client.backend_stats}
+            assert not stats["a"]["available"]
+            assert stats["a"]["cooldown_remaining"] > 15
+            assert stats["b"]["requests"] == 2
+        finally:
+            await client.close()
+    
+    async def test_request_errors_are_not_failed_over(self):
+        """400 はフェイルオーバーせずにそのまま返すこと"""
+        bad_request = await self._server(400)
+        healthy = await self._server(200)
+        client = LoadBalancedAzureOpenAIClient(
+            [_backend("a", bad_request, weight=100), _backend("b", healthy, weight=1)],
+            rng=lambda: 0.0
+        )
+        try:
+            with pytest.raises(AzureOpenAIException) as exc_info:
+                await client.create_session(AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy"))
+            
+            assert exc_info.value.status_code == 400
+            assert len(healthy.calls) == 0
+        finally:
+            await client.close()
+    
+    async def test_all_endpoints_failed(self):
+        """全エンドポイントが失敗した場合は最後のエラーを返すこと"""
+        first = await self._server(503)
+        second = await self._server(500)
+        client = LoadBalancedAzureOpenAIClient(
+            [_backend("a", first), _backend("b", second)],
+            routing=ROUTING_LEAST_LATENCY
+        )
+        try:
+            with pytest.raises(AzureOpenAIException) as exc_info:
+                await client.create_session(AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy"))
+            
+            assert exc_info.value.status_code in (500, 503)
+            assert len(first.calls) == 1
+            assert len(second.calls) == 1
+        finally:
+            await client.close()
+    
+    async def test_least_latency_prefers_fastest_endpoint(self):
+        """least_latency ではレイテンシの小さいエンドポイントが優先されること"""
+        slow = await self._server(200, session_id="sess_slow")
+        fast = await self._server(200, session_id="sess_fast")
+        slow_backend = _backend("slow", slow)
+        fast_backend = _backend("fast", fast)
+        slow_backend.latency_ewma = 0.5
+        fast_backend.latency_ewma = 0.05
+        client = LoadBalancedAzureOpenAIClient(
+            [slow_backend, fast_backend],
+            routing=ROUTING_LEAST_LATENCY
+        )
+        try:
+            result = await client.create_session(AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy"))
+            
+            assert result.id == "sess_fast"
+            assert len(slow.calls) == 0
+        finally:
+            await client.close()
+    
+    async def test_sdp_exchange_goes_to_endpoint_that_issued_key(self):
+        """SDP 交換はエフェメラルキーを発行したエンドポイントに送信されること"""
+        first = await self._server(200, session_id="sess_first")
+        second = await self._server(200, session_id="sess_second")
+        first_backend = _backend("first", first)
+        second_backend = _backend("second", second)
+        first_backend.latency_ewma = 0.5
+        second_backend.latency_ewma = 0.05
+        client = LoadBalancedAzureOpenAIClient(
+            [first_backend, second_backend],
+            routing=ROUTING_LEAST_LATENCY
+        )
+        try:
+            session = await client.create_session(AzureSessionRequest(model="gpt-4o-realtime-preview", voice="alloy"))
+            assert session.id == "sess_second"
+            
+            # 発行後にルーティング順が変わってもキーの発行元に送る
+            first_backend.latency_ewma = 0.01
+            second_backend.latency_ewma = 1.0
+            answer = await client.proxy_webrtc_sdp("gpt-4o-realtime-preview", "ek_test123", "v=0\r\n")
+            
+            assert "sess_second" in answer
+            assert len(second.sdp_calls) == 1
+            assert len(first.sdp_calls) == 0
+        finally:
+            await client.close()
+    
+    async def test_sdp_exchange_with_unknown_key_finds_issuing_endpoint(self):
+        """発行元が不明なキーは 401 のエンドポイントを飛ばして受け付けるエンドポイントに送信されること"""
+        foreign = await self._server(200, session_id="sess_foreign", sdp_status=401)
+        owner = await self._server(200, session_id="sess_owner")
+        client = LoadBalancedAzureOpenAIClient(
+            [_backend("foreign", foreign, weight=100), _backend("owner", owner, weight=1)],
+            rng=lambda: 0.0
+        )
+        try:
+            # 別のワーカーが発行したキー
+            answer = await client.proxy_webrtc_sdp("gpt-4o-realtime-preview", "ek_other_worker", "v=0\r\n")
+            again = await client.proxy_webrtc_sdp("gpt-4o-realtime-preview", "ek_other_worker", "v=0\r\n")
+            
+            assert "sess_owner" in answer
+            assert "sess_owner" in again
+            assert len(foreign.sdp_calls) == 1
+            assert len(owner.sdp_calls) == 2
+            stats = {stat["name"]: stat for stat in client.backend_stats}
+            assert stats["foreign"]["available"]
+        finally:
+            await client.close()
+    
+    async def test_sdp_exchange_with_key_rejected_everywhere(self):
+        """どのエンドポイントもキーを受け付けない場合は 401 を返すこと"""
+        first = await self._server(200, sdp_status=401)
+        second = await self._server(200, sdp_status=401)
+        client = LoadBalancedAzureOpenAIClient([_backend("a", first), _backend("b", second)])
+        try:
+            with pytest.raises(AzureOpenAIException) as exc_info:
+                await client.proxy_webrtc_sdp("gpt-4o-realtime-preview", "ek_unknown", "v=0\r\n")
+            
+            assert exc_info.value.status_code == 401
+            assert len(first.sdp_calls) == 1
+            assert len(second.sdp_calls) == 1
+        finally:
+            await client.close()
@@ -0,0 +1,140 @@
+"""
+リトライ・サーキットブレーカーのユニットテスト
+"""
+import pytest
+
+from infrastructure.azure.resilience import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after
+)
+
+
+class FakeClock:
+    """テスト用の時計"""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRetryPolicy:
+    """リトライポリシーのテスト"""
+    
+    def test_full_jitter_backoff_is_capped(self):
+        """待機時間が指数的に増え、上限で頭打ちになること"""
+        policy = RetryPolicy(max_retries=10, base_delay=0.5, max_delay=4.0, rng=lambda: 1.0)
+        
+        delays = [policy.next_delay(attempt, 503) for attempt in range(5)]
+        
+        assert delays == [0.5, 1.0, 2.0, 4.0, 4.0]
+    
+    def test_retry_after_is_honored(self):
+        """Retry-After 以上待機し、上限を超える場合はリトライしないこと"""
+        policy = RetryPolicy(max_retries=3, max_retry_after=10.0, rng=lambda: 0.0)
+        
+        assert policy.next_delay(0, 429, retry_after=3.0) == 3.0
+        assert policy.next_delay(0, 429, retry_after=30.0) is None
+    
+    def test_non_retryable_and_exhausted(self):
+        """4xx（429除く）や回数超過ではリトライしないこと"""
+        policy = RetryPolicy(max_retries=2)
+        
+        assert policy.next_delay(0, 400) is None
+        assert policy.next_delay(2, 503) is None
+        assert policy.next_delay(0, None) is not None
+    
+    def test_parse_retry_after(self):
+        """秒数・ミリ秒・HTTP日付形式を解釈できること"""
+        assert parse_retry_after({"Retry-After": "5"}) == 5.0
+        assert parse_retry_after({"retry-after-ms": "1500", "Retry-After": "5"}) == 1.5
+        assert parse_retry_after(
+            {"Retry-After": "Thu, 01 Jan 1970 00:16:50 GMT"},
+            clock=lambda: 1000.0
+        ) == 10.0
+        assert parse_retry_after({}) is None
+
+
+class TestRetryBudget:
+    """リトライ量上限のテスト"""
+    
+    def test_budget_limits_retries_to_ratio(self):
+        """リクエスト数に対する割合を超えるリトライは拒否されること"""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.1, min_retries_per_second=0.0, window_seconds=10.0, clock=clock)
+        for _ in range(20):
+            budget.record_request()
+        
+        allowed = sum(budget.try_acquire() for _ in range(10))
+        
+        assert allowed == 2
+        assert budget.exhausted == 8
+    
+    def test_budget_recovers_after_window(self):
+        """集計期間が過ぎるとリトライが再び許可されること"""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.0, min_retries_per_second=0.1, window_seconds=10.0, clock=clock)
+        
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        clock.now += 11
+        assert budget.try_acquire()
+
+
+class TestCircuitBreaker:
+    """サーキットブレーカーのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30.0, clock=self.clock)
+    
+    def test_opens_after_consecutive_failures(self):
+        """連続失敗で開き、即座に失敗すること"""
+        for _ in range(3):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+        
+        with pytest.raises(CircuitBreakerOpenError) as exc_info:
+            self.breaker.before_call()
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert exc_info.value.retry_after == 30.0
+    
+    def test_success_resets_failures(self):
+        """成功すると失敗回数がリセットされること"""
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        
+        assert self.breaker.state == CircuitBreaker.CLOSED
+    
+    def test_half_open_allows_single_probe(self):
+        """遮断時間経過後は1件だけ試行でき、成功すると閉じること"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now += 30
+        
+        self.breaker.before_call()
+        with pytest.raises(CircuitBreakerOpenError):
+            self.breaker.before_call()
+        self.breaker.record_success()
+        
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        self.breaker.before_call()
+    
+    def test_failed_probe_reopens(self):
+        """half-open の試行が失敗すると再び開くこと"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now += 30
+        
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        
+        with pytest.raises(CircuitBreakerOpenError):
+            self.breaker.before_call()
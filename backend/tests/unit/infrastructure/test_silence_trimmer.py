@@ -0,0 +1,187 @@
+"""
+無音トリミング（VAD）のユニットテスト
+"""
+import io
+import json
+import shutil
+import subprocess
+import pytest
+from unittest.mock import patch
+
+np = pytest.importorskip("numpy")
+
+from infrastructure.audio.pcm_decoder import DecodedPcm, decode_pcm
+from infrastructure.audio.silence_trimmer import SilenceTrimmer
+from infrastructure.storage.audio_blob_storage_client import (
+    AudioBlobStorageClient,
+    PROCESSING_REMUX,
+    PROCESSING_TRANSCODE
+)
+
+SAMPLE_RATE = 16000
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+def _signal(*parts):
+    """(秒数, 音声あり) の並びからテスト用PCMを生成"""
+    chunks = []
+    for seconds, voiced in parts:
+        count = int(seconds * SAMPLE_RATE)
+        if voiced:
+            chunks.append(0.5 * np.sin(2 * np.pi * 440 * np.arange(count) / SAMPLE_RATE))
+        else:
+            chunks.append(np.zeros(count))
+    return np.concatenate(chunks).astype(np.float32)
+
+
+def _generate_webm(audio_filter: str) -> io.BytesIO:
+    """ffmpeg でサイン波の前後に無音を付けた WebM/Opus を生成"""
+    output = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", audio_filter,
+            "-c:a", "libopus", "-f", "webm", "pipe:1"
+        ],
+        check=True,
+        capture_output=True
+    ).stdout
+    return io.BytesIO(output)
+
+
+class TestSilenceTrimmer:
+    """SilenceTrimmer のテスト"""
+    
+    def test_trims_leading_and_trailing_silence(self):
+        """前後の無音が削除範囲になること"""
+        trimmer = SilenceTrimmer(padding_ms=100)
+        
+        plan = trimmer.plan(_signal((2, False), (1, True), (3, False)), SAMPLE_RATE)
+        
+        assert plan.duration == pytest.approx(6.0)
+        assert plan.is_contiguous
+        start, end = plan.keep[0]
+        assert start == pytest.approx(1.9, abs=0.03)
+        assert end == pytest.approx(3.1, abs=0.03)
+        assert plan.removed == [(0.0, start), (end, 6.0)]
+    
+    def test_keeps_internal_gaps_by_default(self):
+        """既定では途中の無音は残すこと"""
+        trimmer = SilenceTrimmer(padding_ms=0)
+        
+        plan = trimmer.plan(_signal((1, True), (5, False), (1, True)), SAMPLE_RATE)
+        
+        assert plan.keep == [(0.0, 7.0)]
+        assert not plan.trims_anything
+    
+    def test_compacts_long_internal_gaps(self):
+        """max_gap_ms より長い途中の無音は max_gap_ms に短縮されること"""
+        trimmer = SilenceTrimmer(padding_ms=0, max_gap_ms=1000)
+        
+        plan = trimmer.plan(_signal((1, True), (5, False), (1, True), (0.5, False), (1, True)), SAMPLE_RATE)
+        
+        assert not plan.is_contiguous
+        assert len(plan.removed) == 1
+        removed_start, removed_end = plan.removed[0]
+        assert removed_end - removed_start == pytest.approx(4.0, abs=0.05)
+        assert plan.keep[-1][1] == pytest.approx(8.5)
+    
+    def test_silent_recording_is_kept(self):
+        """無音のみの録音は削除しないこと"""
+        plan = SilenceTrimmer().plan(_signal((3, False)), SAMPLE_RATE)
+        
+        assert plan.keep == [(0.0, 3.0)]
+        assert not plan.trims_anything
+    
+    def test_short_silence_is_not_removed(self):
+        """MIN_REMOVED_SECONDS 未満の無音は削除しないこと"""
+        trimmer = SilenceTrimmer(padding_ms=0)
+        
+        plan = trimmer.plan(_signal((0.1, False), (2, True), (0.1, False)), SAMPLE_RATE)
+        
+        assert not plan.trims_anything
+    
+    def test_plan_from_spooled_pcm(self):
+        """チャンクごとに読み込んだPCMでもメモリ上のPCMと同じ範囲になること"""
+        trimmer = SilenceTrimmer(padding_ms=100, max_gap_ms=500)
+        samples = _signal((3, False), (4, True), (6, False), (2, True), (5.01, False))
+        pcm = DecodedPcm(
+            output=io.BytesIO(np.round(samples * 32767).astype("<i2").tobytes()),
+            sample_rate=SAMPLE_RATE,
+            sample_count=len(samples)
+        )
+        
+        assert trimmer.plan_pcm(pcm) == trimmer.plan(samples, SAMPLE_RATE)
+
+
+@requires_ffmpeg
+def test_decode_pcm():
+    """WebM を16kHzモノラルPCMに変換できること"""
+    samples = decode_pcm(_generate_webm("sine=frequency=440:duration=1:sample_rate=48000"), "webm")
+    
+    assert samples.dtype == np.float32
+    assert len(samples) == pytest.approx(SAMPLE_RATE, rel=0.05)
+    assert np.abs(samples).max() <= 1.0
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("max_gap_ms, processing", [("0", PROCESSING_REMUX), ("500", PROCESSING_TRANSCODE)])
+def test_upload_is_trimmed_before_storage(monkeypatch, max_gap_ms, processing):
+    """前後の無音はコピーのまま、途中の無音の短縮は再エンコードで削除されること"""
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    monkeypatch.setenv("AUDIO_TRIM_SILENCE", "true")
+    monkeypatch.setenv("AUDIO_TRIM_MAX_GAP_MS", max_gap_ms)
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client = AudioBlobStorageClient()
+    audio_file = _generate_webm(
+        "sine=frequency=440:duration=1:sample_rate=48000,adelay=2000,apad=pad_dur=1,"
+        "aloop=loop=1:size=192000,apad=pad_dur=2"
+    )
+    
+    transcoded = client._transcode(audio_file, "webm")
+    try:
+        assert transcoded.processing == processing
+        assert transcoded.trim is not None
+        assert transcoded.trim.removed_seconds > 2.0
+        
+        stored = decode_pcm(transcoded.stream, transcoded.container)
+        assert len(stored) / SAMPLE_RATE < transcoded.trim.duration - 2.0
+    finally:
+        transcoded.release()
+
+
+@requires_ffmpeg
+def test_trimmed_ranges_are_recorded_in_metadata(monkeypatch):
+    """削除した範囲がBlobメタデータに記録されること"""
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_NAME", "testaccount")
+    monkeypatch.setenv("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdGtleQ==")
+    monkeypatch.setenv("AUDIO_TRIM_SILENCE", "true")
+    monkeypatch.setenv("AUDIO_ANALYSIS_ENABLED", "false")
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client = AudioBlobStorageClient()
+    transcoded = client._transcode(
+        _generate_webm("sine=frequency=440:duration=1:sample_rate=48000,adelay=2000,apad=pad_dur=2"),
+        "webm"
+    )
+    uploads = []
+    
+    class FakeBlobClient:
+        url = "https://testaccount.blob.core.windows.net/audio/x"
+        
+        def upload_blob(self, data, overwrite, metadata):
+            uploads.append(metadata)
+    
+    class FakeServiceClient:
+        def get_blob_client(self, container, blob):
+            return FakeBlobClient()
+    
+    client.blob_service_client = FakeServiceClient()
+    with patch.object(AudioBlobStorageClient, "_ensure_container_exists"):
+        client._upload_transcoded(transcoded, "sess-1", "webm")
+    
+    metadata = uploads[0]
+    ranges = json.loads(metadata["silence_removed_ranges"])
+    assert len(ranges) == 2
+    assert ranges[0][0] == 0.0
+    assert float(metadata["silence_removed_seconds"]) > 3.0
@@ -0,0 +1,67 @@
+"""
+音声変換ワーカープールのユニットテスト
+"""
+import asyncio
+import threading
+import pytest
+
+from infrastructure.audio.transcoding_pool import (
+    TranscodingPool,
+    TranscodingQueueFullError,
+    TranscodingTimeoutError
+)
+
+
+@pytest.mark.asyncio
+class TestTranscodingPool:
+    """変換ワーカープールのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.pool = TranscodingPool(max_workers=1, max_queue_size=1, job_timeout=5.0)
+    
+    def teardown_method(self):
+        self.pool.shutdown(wait=True)
+    
+    async def test_run_passes_job_timeout(self):
+        """ジョブにタイムアウトが渡され、結果が返ること"""
+        def job(value, timeout=None):
+            return value, timeout
+        
+        result = await self.pool.run(job, "ok")
+        
+        assert result == ("ok", 5.0)
+        assert self.pool.stats["completed"] == 1
+    
+    async def test_rejects_when_queue_is_full(self):
+        """ワーカーと待ち行列が埋まっている場合は即座に拒否すること"""
+        release = threading.Event()
+        
+        def blocking_job(timeout=None):
+            release.wait(5)
+            return "done"
+        
+        running = asyncio.ensure_future(self.pool.run(blocking_job))
+        queued = asyncio.ensure_future(self.pool.run(blocking_job))
+        await asyncio.sleep(0.05)
+        
+        with pytest.raises(TranscodingQueueFullError) as exc_info:
+            await self.pool.run(blocking_job)
+        assert exc_info.value.retry_after >= 1
+        assert self.pool.stats["queue_depth"] == 1
+        assert self.pool.stats["rejected"] == 1
+        
+        release.set()
+        assert await asyncio.gather(running, queued) == ["done", "done"]
+        assert self.pool.stats["queue_depth"] == 0
+    
+    async def test_timeout_is_counted(self):
+        """タイムアウトしたジョブが集計されること"""
+        def slow_job(timeout=None):
+            raise TranscodingTimeoutError("ffmpeg did not finish")
+        
+        with pytest.raises(TranscodingTimeoutError):
+            await self.pool.run(slow_job)
+        
+        assert self.pool.stats["timed_out"] == 1
+        assert self.pool.stats["failed"] == 1
@@ -0,0 +1,74 @@
+"""
+音声アップロードAPIのエラー応答のテスト
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from infrastructure.audio.transcoding_pool import TranscodingQueueFullError, TranscodingTimeoutError
+from presentation.api.controllers import audio_stream_controller, audio_upload_controller
+
+
+class FailingUploadService:
+    """アップロード時に指定の例外を送出するサービス"""
+    
+    def __init__(self, error: Exception):
+        self.error = error
+    
+    def validate_audio_file(self, content_type, file_size):
+        pass
+    
+    async def upload_audio(self, **kwargs):
+        raise self.error
+
+
+class FailingStreamService:
+    """結合時に指定の例外を送出するサービス"""
+    
+    def __init__(self, error: Exception):
+        self.error = error
+    
+    async def complete(self, **kwargs):
+        raise self.error
+
+
+def _upload_client(error: Exception) -> TestClient:
+    app = FastAPI()
+    app.include_router(audio_upload_controller.router)
+    app.dependency_overrides[audio_upload_controller.get_audio_upload_service] = lambda: FailingUploadService(error)
+    return TestClient(app)
+
+
+def _stream_client(error: Exception) -> TestClient:
+    app = FastAPI()
+    app.include_router(audio_stream_controller.router)
+    app.dependency_overrides[audio_stream_controller.get_audio_stream_service] = lambda: FailingStreamService(error)
+    return TestClient(app)
+
+
+def _upload(client: TestClient):
+    return client.post("/audio/upload", files={"audio_file": ("test.webm", b"data", "audio/webm")})
+
+
+def test_transcoding_timeout_returns_504():
+    """変換のタイムアウトは500ではなく504を返すこと"""
+    response = _upload(_upload_client(TranscodingTimeoutError("ffmpeg did not finish within 300 seconds")))
+    
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Audio processing timed out"
+
+
+def test_transcoding_queue_full_returns_503_with_retry_after():
+    """変換キューが満杯の場合は Retry-After 付きの503を返すこと"""
+    response = _upload(_upload_client(TranscodingQueueFullError("Transcoding queue is full", retry_after=7)))
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_stream_completion_timeout_returns_504():
+    """チャンク結合後の変換のタイムアウトも504を返すこと"""
+    client = _stream_client(TranscodingTimeoutError("ffmpeg did not finish within 300 seconds"))
+    
+    response = client.post("/audio/streams/sess-1/complete", json={"total_chunks": 1})
+    
+    assert response.status_code == 504
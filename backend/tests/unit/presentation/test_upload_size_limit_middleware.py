@@ -0,0 +1,97 @@
+"""
+アップロードサイズ制限ミドルウェアのユニットテスト
+"""
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from presentation.middleware.upload_size_limit_middleware import UploadSizeLimitMiddleware
+
+MAX_BODY_SIZE = 1024
+
+
+def _create_app() -> tuple[FastAPI, list[int]]:
+    """受信したボディのサイズを記録するアプリ"""
+    app = FastAPI()
+    received = []
+    
+    @app.post("/audio/upload")
+    async def upload(request: Request):
+        body = await request.body()
+        received.append(len(body))
+        return {"size": len(body)}
+    
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+    
+    app.add_middleware(UploadSizeLimitMiddleware, max_body_size=MAX_BODY_SIZE, path_prefixes=("/audio/",))
+    return app, received
+
+
+def test_content_length_over_limit_is_rejected_before_reading():
+    """Content-Length が上限を超える場合はボディを読まずに413を返すこと"""
+    app, received = _create_app()
+    
+    response = TestClient(app).post("/audio/upload", content=b"x" * (MAX_BODY_SIZE + 1))
+    
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_streamed_body_over_limit_is_cut_off():
+    """Content-Length なしで上限を超えた場合は受信を打ち切り413を返すこと"""
+    app, received = _create_app()
+    
+    def body():
+        for _ in range(10):
+            yield b"x" * 512
+    
+    response = TestClient(app).post("/audio/upload", content=body())
+    
+    assert response.status_code == 413
+    assert received == []
+
+
+async def test_streamed_body_stops_reading_after_limit():
+    """上限を超えた後はクライアントからのボディを読まないこと"""
+    received_messages = []
+    sent = []
+    
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect" or not message.get("more_body"):
+                break
+    
+    async def receive():
+        received_messages.append(1)
+        return {"type": "http.request", "body": b"x" * 512, "more_body": True}
+    
+    async def send(message):
+        sent.append(message)
+    
+    middleware = UploadSizeLimitMiddleware(app, max_body_size=MAX_BODY_SIZE, path_prefixes=("/audio/",))
+    await middleware({"type": "http", "path": "/audio/upload", "headers": []}, receive, send)
+    
+    assert len(received_messages) == 3
+    assert sent[0]["status"] == 413
+
+
+def test_body_under_limit_passes_through():
+    """上限以下のボディはそのままアプリに渡ること"""
+    app, received = _create_app()
+    
+    response = TestClient(app).post("/audio/upload", content=b"x" * MAX_BODY_SIZE)
+    
+    assert response.status_code == 200
+    assert received == [MAX_BODY_SIZE]
+
+
+def test_other_paths_are_not_limited():
+    """対象外のパスには制限をかけないこと"""
+    app, _ = _create_app()
+    
+    response = TestClient(app).post("/other", content=b"x" * (MAX_BODY_SIZE * 2))
+    
+    assert response.status_code == 200
+    assert response.json() == {"size": MAX_BODY_SIZE * 2}
@@ -0,0 +1,150 @@
+"""
+ヘルスチェックのユニットテスト
+"""
+import asyncio
+import pytest
+
+from infrastructure.azure.azure_health_check import AzureOpenAIHealthCheck
+from shared.monitoring.health import (
+    CachedHealthCheck,
+    HealthCheckResult,
+    HealthCheckService,
+    HealthStatus,
+    IHealthCheck,
+    SimpleHealthCheck
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingHealthCheck(IHealthCheck):
+    """呼び出し回数を数えるヘルスチェック"""
+    
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+    
+    async def check(self) -> HealthCheckResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("probe failed")
+        return HealthCheckResult(
+            name="azure_openai",
+            status=HealthStatus.HEALTHY,
+            message=f"probe {self.calls}",
+            response_time_ms=1.0
+        )
+
+
+@pytest.mark.asyncio
+class TestCachedHealthCheck:
+    """キャッシュ付きヘルスチェックのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+    
+    async def test_concurrent_callers_share_one_probe(self):
+        """同時の呼び出しが1件の確認結果を共有すること"""
+        inner = CountingHealthCheck(delay=0.01)
+        cached = CachedHealthCheck(inner, ttl_seconds=10, clock=self.clock)
+        
+        results = await asyncio.gather(*[cached.check() for _ in range(10)])
+        
+        assert inner.calls == 1
+        assert {result.message for result in results} == {"probe 1"}
+    
+    async def test_result_is_cached_until_ttl(self):
+        """TTL内はキャッシュを返し、期限切れ後は古い結果を返しつつ更新すること"""
+        inner = CountingHealthCheck()
+        cached = CachedHealthCheck(inner, ttl_seconds=10, stale_seconds=30, clock=self.clock)
+        
+        await cached.check()
+        self.clock.now = 5
+        assert (await cached.check()).message == "probe 1"
+        
+        self.clock.now = 15
+        assert (await cached.check()).message == "probe 1"
+        await asyncio.sleep(0.01)
+        assert inner.calls == 2
+        assert (await cached.check()).message == "probe 2"
+        
+        self.clock.now = 100
+        assert (await cached.check()).message == "probe 3"
+    
+    async def test_failures_are_reported_as_unhealthy(self):
+        """例外・タイムアウトは unhealthy として返ること"""
+        cached = CachedHealthCheck(CountingHealthCheck(fail=True), clock=self.clock)
+        timed_out = CachedHealthCheck(CountingHealthCheck(delay=1.0), timeout_seconds=0.01, clock=self.clock)
+        
+        assert (await cached.check()).status == HealthStatus.UNHEALTHY
+        assert (await timed_out.check()).status == HealthStatus.UNHEALTHY
+    
+    async def test_background_refresh(self):
+        """バックグラウンドで定期的に更新されること"""
+        inner = CountingHealthCheck()
+        cached = CachedHealthCheck(inner, ttl_seconds=10, refresh_interval=0.01)
+        
+        await cached.start()
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            await cached.close()
+        
+        assert inner.calls >= 2
+        assert (await cached.check()).status == HealthStatus.HEALTHY
+    
+    async def test_failure_status_and_name_come_from_wrapped_check(self):
+        """タイムアウト時は対象のヘルスチェックの名前と failure_status で報告されること"""
+        inner = CountingHealthCheck(delay=1.0)
+        inner._name = "azure_openai"
+        inner.failure_status = HealthStatus.DEGRADED
+        cached = CachedHealthCheck(inner, timeout_seconds=0.01, clock=self.clock)
+        
+        result = await cached.check()
+        
+        assert result.name == "azure_openai"
+        assert result.status == HealthStatus.DEGRADED
+
+
+@pytest.mark.asyncio
+async def test_azure_timeout_degrades_instead_of_failing_health():
+    """Azure OpenAI の確認がタイムアウトしても全体は degraded（unhealthy ではない）になること"""
+    class SlowClient:
+        async def health_check(self):
+            await asyncio.sleep(1.0)
+            return {"status": "healthy"}
+    
+    service = HealthCheckService([
+        SimpleHealthCheck(name="api"),
+        CachedHealthCheck(AzureOpenAIHealthCheck(lambda: SlowClient()), timeout_seconds=0.01)
+    ])
+    
+    result = await service.check_all()
+    
+    assert result["status"] == "degraded"
+    assert result["checks"]["azure_openai"]["status"] == "degraded"
+    assert result["checks"]["api"]["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_uncached_check_failure_uses_failure_status():
+    """キャッシュなしのヘルスチェックの例外も failure_status で報告されること"""
+    class FailingClient:
+        async def health_check(self):
+            raise RuntimeError("connection reset")
+    
+    service = HealthCheckService([AzureOpenAIHealthCheck(lambda: FailingClient())])
+    
+    result = await service.check_all()
+    
+    assert result["status"] == "degraded"
+    assert result["checks"]["azure_openai"]["status"] == "degraded"
@@ -0,0 +1,116 @@
+"""
+ログ設定のユニットテスト
+"""
+import io
+import json
+import logging
+import pytest
+
+from shared.utils.logging import (
+    CorrelationIdFilter,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    request_id_var,
+    session_id_var,
+    set_log_context,
+    setup_logging,
+    shutdown_logging
+)
+
+
+def make_record(message: str, *args, level: int = logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, __file__, 1, message, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter:
+    """JSON形式のテスト"""
+    
+    def test_message_with_quotes_is_valid_json(self):
+        """引用符・改行を含むメッセージも正しいJSONになること"""
+        record = make_record('said "hello"\n%s', "again", request_id="req-1", user="alice")
+        
+        entry = json.loads(JsonFormatter().format(record))
+        
+        assert entry["message"] == 'said "hello"\nagain'
+        assert entry["request_id"] == "req-1"
+        assert entry["user"] == "alice"
+        assert entry["level"] == "INFO"
+    
+    def test_correlation_ids_from_context(self):
+        """コンテキストの相関IDがレコードに付与されること"""
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(CorrelationIdFilter())
+        logger = logging.getLogger("test_correlation")
+        logger.addHandler(handler)
+        logger.propagate = False
+        
+        request_token = request_id_var.set("req-42")
+        session_token = session_id_var.set(None)
+        try:
+            set_log_context(session_id="sess-1")
+            logger.warning("hello")
+        finally:
+            request_id_var.reset(request_token)
+            session_id_var.reset(session_token)
+        
+        entry = json.loads(stream.getvalue())
+        assert (entry["request_id"], entry["session_id"]) == ("req-42", "sess-1")
+
+
+class TestSamplingFilter:
+    """サンプリングのテスト"""
+    
+    def test_sampling_is_per_request(self):
+        """同じリクエストのログは全て残るか全て破棄され、WARNING 以上は常に残ること"""
+        sampling = SamplingFilter(0.5)
+        kept = [
+            sampling.filter(make_record("info", request_id=f"req-{i}")) for i in range(200)
+        ]
+        
+        assert 50 < sum(kept) < 150
+        assert all(
+            sampling.filter(make_record("again", request_id=f"req-{i}")) == kept[i] for i in range(200)
+        )
+        assert sampling.filter(make_record("warn", level=logging.WARNING, request_id="req-0"))
+        assert sampling.filter(make_record("startup", request_id=None))
+
+
+class TestShutdownLogging:
+    """非同期出力の停止のテスト"""
+    
+    @pytest.fixture(autouse=True)
+    def restore_root_logger(self):
+        root_logger = logging.getLogger()
+        handlers, level = list(root_logger.handlers), root_logger.level
+        yield
+        shutdown_logging()
+        root_logger.handlers[:] = handlers
+        root_logger.setLevel(level)
+    
+    def test_logs_after_shutdown_are_written(self, capsys):
+        """停止後のログもキューに溜まらず同期的に書き出されること"""
+        setup_logging(format_type="json", async_handler=True)
+        logging.getLogger("test_shutdown").warning("before shutdown")
+        
+        shutdown_logging()
+        logging.getLogger("test_shutdown").warning("after shutdown")
+        
+        root_logger = logging.getLogger()
+        assert not any(isinstance(handler, NonBlockingQueueHandler) for handler in root_logger.handlers)
+        messages = [json.loads(line)["message"] for line in capsys.readouterr().out.splitlines()]
+        assert messages == ["before shutdown", "after shutdown"]
+    
+    def test_shutdown_is_idempotent(self):
+        """停止を繰り返し呼んでもハンドラーが重複しないこと"""
+        setup_logging(async_handler=True)
+        
+        shutdown_logging()
+        shutdown_logging()
+        
+        assert len(logging.getLogger().handlers) == 1
@@ -0,0 +1,59 @@
+"""
+メトリクス収集のユニットテスト
+"""
+import pytest
+
+from shared.monitoring.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """メトリクスレジストリのテスト"""
+    
+    def setup_method(self):
+        """テストセットアップ"""
+        self.registry = MetricsRegistry()
+    
+    def test_counter_and_gauge(self):
+        """カウンター・ゲージがラベルごとに出力されること"""
+        counter = self.registry.counter("responses_total", "Responses", ["status"])
+        gauge = self.registry.gauge("in_flight", "In flight")
+        counter.inc(status="200")
+        counter.inc(2, status="502")
+        with gauge.track_inprogress():
+            assert gauge.get() == 1
+        
+        text = self.registry.render()
+        
+        assert '# TYPE responses_total counter' in text
+        assert 'responses_total{status="200"} 1' in text
+        assert 'responses_total{status="502"} 2' in text
+        assert 'in_flight 0' in text
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """ヒストグラムのバケットが累積で出力されること"""
+        histogram = self.registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        
+        text = self.registry.render()
+        
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'latency_seconds_sum 3.65' in text
+        assert 'latency_seconds_count 4' in text
+    
+    def test_register_returns_existing_metric(self):
+        """同じ名前の再登録で既存のメトリクスが返り、種類が違う場合は拒否されること"""
+        first = self.registry.counter("requests_total", "Requests")
+        
+        assert self.registry.counter("requests_total", "Requests") is first
+        with pytest.raises(ValueError):
+            self.registry.gauge("requests_total", "Requests")
+    
+    def test_label_values_are_escaped(self):
+        """ラベル値の引用符・改行がエスケープされること"""
+        counter = self.registry.counter("errors_total", "Errors", ["reason"])
+        counter.inc(reason='bad "quote"\n')
+        
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1' in self.registry.render()